@@ -0,0 +1 @@
+"""Бенчмарки запросов API на тестовой БД (db_for_tests)."""
@@ -0,0 +1,105 @@
+"""Бенчмарк сжатия ответов: время CPU против сэкономленных байт.
+
+Списки блюд разного размера (JSON, как в ответе GET-ручки) сжимаются gzip
+на нескольких уровнях и, если установлен пакет zstandard, zstd. Для каждого
+сочетания выводятся размер ответа, размер после сжатия, доля сэкономленных байт
+и время CPU одного сжатия. Сжатые копии ответов из кэша платят это время один раз
+на запись кэша, остальные ответы — на каждый запрос.
+
+Запуск из каталога restaurant_menu (БД не нужна):
+
+    python -m benchmarks.compression --dishes 100 1000 10000 --repeat 20
+"""
+
+import argparse
+import gzip
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+import orjson
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def dishes_payload(dishes: int) -> bytes:
+    """JSON списка блюд в формате ответа GET-ручки."""
+
+    return orjson.dumps([
+        {
+            'id': str(uuid.uuid4()),
+            'title': f'Блюдо {i}',
+            'description': f'Описание блюда {i}: состав, граммовка и способ подачи',
+            'price': f'{100 + i % 900}.{i % 100:02d}',
+        }
+        for i in range(dishes)
+    ])
+
+
+def compressors() -> List[Tuple[str, Callable[[bytes], bytes]]]:
+    """Кодировки и уровни сжатия для сравнения."""
+
+    result: List[Tuple[str, Callable[[bytes], bytes]]] = [
+        (f'gzip-{level}', lambda body, level=level: gzip.compress(body, level, mtime=0))
+        for level in (1, 6, 9)
+    ]
+    if zstandard is not None:
+        result += [
+            (f'zstd-{level}', zstandard.ZstdCompressor(level=level).compress)
+            for level in (1, 3, 10)
+        ]
+    return result
+
+
+def run(sizes: List[int], repeat: int) -> List[Dict]:
+    """Выполняем бенчмарк для каждого размера списка и каждой кодировки.
+
+    Args:
+        - sizes (List[int]): Количество блюд в списках.
+        - repeat (int): Количество сжатий для замера времени.
+
+    Returns:
+        - List[Dict]: Кодировка, размеры до и после сжатия, экономия и время CPU.
+    """
+
+    results: List[Dict] = []
+    for dishes in sizes:
+        body = dishes_payload(dishes)
+        for name, compress in compressors():
+            compressed = compress(body)
+            started = time.process_time()
+            for _ in range(repeat):
+                compress(body)
+            cpu_ms = (time.process_time() - started) * 1000 / repeat
+            results.append({
+                'encoding': name,
+                'dishes': dishes,
+                'bytes': len(body),
+                'compressed_bytes': len(compressed),
+                'saved_percent': 100 * (1 - len(compressed) / len(body)),
+                'cpu_ms': cpu_ms,
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dishes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='Блюд в списках.')
+    parser.add_argument('--repeat', type=int, default=20, help='Сжатий для замера времени.')
+    args = parser.parse_args()
+
+    results = run(args.dishes, args.repeat)
+    print(f'{"кодировка":>10} {"блюд":>6} {"байт":>9} {"сжато":>8} '
+          f'{"экономия, %":>12} {"CPU, мс":>8}')
+    for row in results:
+        print(f'{row["encoding"]:>10} {row["dishes"]:>6} {row["bytes"]:>9} '
+              f'{row["compressed_bytes"]:>8} {row["saved_percent"]:>12.1f} '
+              f'{row["cpu_ms"]:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
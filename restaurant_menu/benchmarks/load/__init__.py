@@ -0,0 +1,6 @@
+"""Нагрузочный бенчмарк ручек меню, подменю и блюд на тестовой БД (db_for_tests).
+
+    - seed: быстрое заполнение каталога через COPY;
+    - workload: смесь запросов чтения и записи по всем ручкам;
+    - run: генератор нагрузки и отчёт по маршрутам в JSON.
+"""
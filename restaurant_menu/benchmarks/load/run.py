@@ -0,0 +1,252 @@
+"""Нагрузочный бенчмарк ручек меню, подменю и блюд.
+
+Каталог (по умолчанию 1 000 меню × 20 подменю × 50 блюд) загружается через COPY
+(benchmarks.load.seed), после чего --concurrency воркеров в течение --duration секунд
+выполняют смесь запросов чтения и записи по всем ручкам (benchmarks.load.workload).
+Запросы первых --warmup секунд не учитываются. Для каждого маршрута в JSON-файл
+--output записываются количество запросов, ошибки, пропускная способность
+и задержки p50/p95/p99 в миллисекундах.
+
+Без --url запросы идут в приложение через httpx + ASGI (без сети, в том же цикле
+событий), с пулом соединений к тестовой БД. С --url нагрузка подаётся на запущенный
+сервер, который должен работать с той же БД (DB_HOST=db_for_tests).
+
+Запуск из каталога restaurant_menu (БД берётся из DB_HOST_TEST, DB_PORT, DB_NAME):
+
+    python -m benchmarks.load.run --concurrency 32 --duration 60 --output load.json
+
+Таблицы тестовой БД пересоздаются; с --keep каталог остаётся для запусков с --no-seed.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
+                                    create_async_engine)
+from sqlalchemy.orm import sessionmaker
+from src import cache
+from src.configs import DB_MAX_OVERFLOW, DB_POOL_SIZE
+from src.database import (Base, get_primary_read_session_factory,
+                          get_session_factory)
+from src.main import app
+
+from ..menu_counts import DATABASE_URL_TEST
+from .seed import seed_catalog
+from .workload import WORKLOAD, Catalog, uncovered_routes
+
+WEIGHTS = [weight for _, _, weight, _ in WORKLOAD]
+
+
+class RouteStats:
+    """Задержки и статусы ответов одного маршрута."""
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors = 0
+
+    def record(self, latency: float, status: Optional[int]) -> None:
+        self.latencies.append(latency)
+        self.statuses[str(status) if status is not None else 'exception'] += 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу для отсортированного списка."""
+
+    if not values:
+        return 0.0
+    rank = max(int(-(-q * len(values) // 100)), 1)
+    return values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """Сводка маршрута: запросы, ошибки, пропускная способность и задержки в мс."""
+
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3) if latencies else 0.0,
+    }
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    catalog: Catalog,
+    stats: Dict[str, RouteStats],
+    measure_from: float,
+    deadline: float,
+) -> None:
+    """Выполняем случайные операции смеси до окончания бенчмарка."""
+
+    while time.perf_counter() < deadline:
+        method, route, _, operation = random.choices(WORKLOAD, WEIGHTS)[0]
+        started = time.perf_counter()
+        try:
+            response = await operation(client, catalog)
+        except httpx.HTTPError:
+            status: Optional[int] = None
+        else:
+            if response is None:
+                # Удалять пока нечего: созданных бенчмарком объектов нет.
+                continue
+            status = response.status_code
+        if started >= measure_from:
+            stats[f'{method} {route}'].record((time.perf_counter() - started) * 1000, status)
+
+
+async def generate_load(
+    client: httpx.AsyncClient,
+    catalog: Catalog,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> Dict[str, Any]:
+    """Подаём нагрузку и собираем отчёт по маршрутам.
+
+    Args:
+        - client (AsyncClient): Клиент приложения.
+        - catalog (Catalog): id объектов каталога.
+        - concurrency (int): Количество одновременных воркеров.
+        - duration (float): Длительность измерения в секундах.
+        - warmup (float): Длительность прогрева в секундах (не учитывается).
+
+    Returns:
+        - Dict: Сводка по всем запросам («total») и по маршрутам («routes»).
+    """
+
+    stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+    measure_from = time.perf_counter() + warmup
+    await asyncio.gather(*(
+        worker(client, catalog, stats, measure_from, measure_from + duration)
+        for _ in range(concurrency)
+    ))
+    # Пропускная способность — по окну измерения: долгие запросы (полное дерево
+    # меню), которые завершились после него, не растягивают окно.
+    elapsed = duration
+
+    routes: Dict[str, Any] = {}
+    for method, route, _, _ in WORKLOAD:
+        route_stats = stats[f'{method} {route}']
+        routes[f'{method} {route}'] = {
+            **summarize(route_stats.latencies, route_stats.errors, elapsed),
+            'statuses': dict(route_stats.statuses),
+        }
+    return {
+        'duration_s': round(elapsed, 3),
+        'total': summarize(
+            [latency for route_stats in stats.values() for latency in route_stats.latencies],
+            sum(route_stats.errors for route_stats in stats.values()),
+            elapsed,
+        ),
+        'routes': routes,
+    }
+
+
+def app_client(engine: AsyncEngine) -> httpx.AsyncClient:
+    """Клиент приложения в том же процессе, с сессиями тестовой БД."""
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    app.dependency_overrides.update({
+        get_session_factory: lambda: session_factory,
+        get_primary_read_session_factory: lambda: session_factory,
+    })
+    return httpx.AsyncClient(app=app, base_url='http://test', timeout=None)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Загружаем каталог, подаём нагрузку и возвращаем отчёт."""
+
+    missing = uncovered_routes()
+    if missing:
+        raise RuntimeError(f'Нет операций для ручек: {", ".join(missing)}')
+
+    engine = create_async_engine(
+        DATABASE_URL_TEST,
+        pool_size=max(DB_POOL_SIZE, args.concurrency),
+        max_overflow=DB_MAX_OVERFLOW,
+    )
+    try:
+        if not args.no_seed:
+            started = time.perf_counter()
+            await seed_catalog(engine, args.menus, args.submenus, args.dishes)
+            print(f'Каталог загружен за {time.perf_counter() - started:.1f} с')
+        catalog = await Catalog.load(engine, args.sample)
+
+        if args.url:
+            client = httpx.AsyncClient(
+                base_url=args.url,
+                timeout=30,
+                limits=httpx.Limits(max_connections=args.concurrency),
+            )
+        else:
+            if args.no_cache:
+                cache.backend = cache.NullCache()
+            client = app_client(engine)
+        async with client:
+            report = await generate_load(
+                client, catalog, args.concurrency, args.duration, args.warmup
+            )
+    finally:
+        if not args.keep:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+    return {
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        **report,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--menus', type=int, default=1000, help='Количество меню.')
+    parser.add_argument('--submenus', type=int, default=20, help='Подменю в каждом меню.')
+    parser.add_argument('--dishes', type=int, default=50, help='Блюд в каждом подменю.')
+    parser.add_argument('--no-seed', action='store_true',
+                        help='Не загружать каталог, использовать данные в БД.')
+    parser.add_argument('--keep', action='store_true',
+                        help='Не удалять таблицы после бенчмарка.')
+    parser.add_argument('--sample', type=int, default=10000,
+                        help='Подменю и блюд, по которым идут запросы.')
+    parser.add_argument('--concurrency', type=int, default=32,
+                        help='Одновременных запросов.')
+    parser.add_argument('--duration', type=float, default=60, help='Длительность, с.')
+    parser.add_argument('--warmup', type=float, default=5, help='Прогрев, с.')
+    parser.add_argument('--url', help='Адрес запущенного сервера, без него — ASGI.')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Без кэша ответов (только без --url).')
+    parser.add_argument('--output', default='load.json', help='Файл отчёта JSON.')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    with open(args.output, 'w') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+    print(f'{"маршрут":<72} {"запросов":>9} {"ошибок":>7} {"rps":>8} '
+          f'{"p50, мс":>8} {"p95, мс":>8} {"p99, мс":>8}')
+    for name, row in (*report['routes'].items(), ('всего', report['total'])):
+        print(f'{name:<72} {row["requests"]:>9} {row["errors"]:>7} '
+              f'{row["throughput_rps"]:>8.1f} {row["p50_ms"]:>8.2f} '
+              f'{row["p95_ms"]:>8.2f} {row["p99_ms"]:>8.2f}')
+    print(f'Отчёт: {args.output}')
+
+
+if __name__ == '__main__':
+    main()
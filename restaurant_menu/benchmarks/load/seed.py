@@ -0,0 +1,142 @@
+"""Заполнение тестовой БД каталогом для нагрузочного бенчмарка.
+
+Меню, подменю и блюда загружаются через COPY порциями по --batch меню, счётчики
+подменю и блюд заполняются сразу, после загрузки обновляются представление
+menu_stats и статистика планировщика.
+
+Запуск из каталога restaurant_menu (БД берётся из DB_HOST_TEST, DB_PORT, DB_NAME):
+
+    python -m benchmarks.load.seed --menus 1000 --submenus 20 --dishes 50
+
+Таблицы тестовой БД пересоздаются; данные остаются для benchmarks.load.run --no-seed.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from src import models
+from src.database import Base
+
+from ..menu_counts import DATABASE_URL_TEST
+
+# Меню в одной порции COPY: 100 меню × 20 подменю × 50 блюд — 100 000 строк блюд.
+BATCH_MENUS = 100
+
+
+def catalog_rows(
+    first_menu: int,
+    menus_count: int,
+    submenus_per_menu: int,
+    dishes_per_submenu: int,
+) -> Dict[str, List[Tuple]]:
+    """Строки таблиц для порции меню (в порядке столбцов без «version»).
+
+    Args:
+        - first_menu (int): Номер первого меню порции (для уникальных названий).
+        - menus_count (int): Количество меню в порции.
+        - submenus_per_menu (int): Количество подменю в меню.
+        - dishes_per_submenu (int): Количество блюд в подменю.
+
+    Returns:
+        - Dict[str, List[Tuple]]: Строки по имени таблицы.
+    """
+
+    rows: Dict[str, List[Tuple]] = {'menus': [], 'submenus': [], 'dishes': []}
+    for m in range(first_menu, first_menu + menus_count):
+        menu_id = uuid.uuid4()
+        rows['menus'].append((
+            menu_id, f'Меню {m}', f'Описание меню {m}',
+            submenus_per_menu, submenus_per_menu * dishes_per_submenu,
+        ))
+        for s in range(submenus_per_menu):
+            submenu_id = uuid.uuid4()
+            rows['submenus'].append((
+                submenu_id, menu_id, f'Подменю {m}-{s}', f'Описание подменю {m}-{s}',
+                dishes_per_submenu,
+            ))
+            rows['dishes'].extend(
+                (uuid.uuid4(), submenu_id, f'Блюдо {m}-{s}-{d}', f'Описание блюда {m}-{s}-{d}',
+                 round(100 + d * 10.5, 2))
+                for d in range(dishes_per_submenu)
+            )
+    return rows
+
+
+async def seed_catalog(
+    engine: AsyncEngine,
+    menus_count: int,
+    submenus_per_menu: int,
+    dishes_per_submenu: int,
+    batch: int = BATCH_MENUS,
+) -> None:
+    """Пересоздаём таблицы и заполняем каталог через COPY.
+
+    Args:
+        - engine (AsyncEngine): Движок тестовой БД.
+        - menus_count (int): Количество меню.
+        - submenus_per_menu (int): Количество подменю в меню.
+        - dishes_per_submenu (int): Количество блюд в подменю.
+        - batch (int): Количество меню в одной порции COPY.
+    """
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+    tables = (models.Menu, models.SubMenu, models.Dish)
+    # Версии строк выдаёт последовательность (server_default).
+    columns: Dict[str, List[str]] = {
+        model.__tablename__: [
+            column.name for column in model.__table__.columns if column.name != 'version'
+        ]
+        for model in tables
+    }
+    for first_menu in range(0, menus_count, batch):
+        rows = catalog_rows(
+            first_menu, min(batch, menus_count - first_menu),
+            submenus_per_menu, dishes_per_submenu,
+        )
+        async with engine.begin() as connection:
+            raw = (await connection.get_raw_connection()).driver_connection
+            for model in tables:
+                await raw.copy_records_to_table(
+                    model.__tablename__,
+                    records=rows[model.__tablename__],
+                    columns=columns[model.__tablename__],
+                )
+
+    async with engine.begin() as connection:
+        await connection.execute(text('REFRESH MATERIALIZED VIEW menu_stats'))
+        await connection.execute(text('ANALYZE menus, submenus, dishes, menu_stats'))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--menus', type=int, default=1000, help='Количество меню.')
+    parser.add_argument('--submenus', type=int, default=20, help='Подменю в каждом меню.')
+    parser.add_argument('--dishes', type=int, default=50, help='Блюд в каждом подменю.')
+    parser.add_argument('--batch', type=int, default=BATCH_MENUS,
+                        help='Меню в одной порции COPY.')
+    args = parser.parse_args()
+
+    async def seed() -> None:
+        engine = create_async_engine(DATABASE_URL_TEST, poolclass=NullPool)
+        try:
+            await seed_catalog(engine, args.menus, args.submenus, args.dishes, args.batch)
+        finally:
+            await engine.dispose()
+
+    started = time.perf_counter()
+    asyncio.run(seed())
+    print(f'Каталог {args.menus} × {args.submenus} × {args.dishes} '
+          f'загружен за {time.perf_counter() - started:.1f} с')
+
+
+if __name__ == '__main__':
+    main()
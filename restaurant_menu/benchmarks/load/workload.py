@@ -0,0 +1,267 @@
+"""Смесь запросов нагрузочного бенчмарка по ручкам меню, подменю и блюд.
+
+Каждая операция выполняет один запрос к своей ручке. Чтения идут по случайным
+объектам загруженного каталога, изменения — по объектам каталога с новыми
+уникальными названиями. Удаляются только объекты, созданные во время
+бенчмарка, поэтому запросы разных воркеров не мешают друг другу.
+"""
+
+import random
+import uuid
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from httpx import AsyncClient, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src import models
+from src.dishes.routers import dish_router
+from src.menus.routers import menu_router
+from src.submenus.routers import submenu_router
+
+MENUS = '/api/v1/menus'
+MENU = '/api/v1/menus/{menu_id}'
+SUBMENUS = '/api/v1/menus/{menu_id}/submenus'
+SUBMENU = '/api/v1/menus/{menu_id}/submenus/{submenu_id}'
+DISHES = '/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes'
+DISH = '/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}'
+
+# Количество объектов в одном запросе массового создания.
+BULK_SIZE = 10
+
+
+class Catalog:
+    """id объектов каталога, по которым идут запросы, и созданных бенчмарком.
+
+    Args:
+        - menus (List[UUID]): id меню.
+        - submenus (List[Tuple]): Пары (id меню, id подменю).
+        - dishes (List[Tuple]): Тройки (id меню, id подменю, id блюда).
+    """
+
+    def __init__(
+        self,
+        menus: List[uuid.UUID],
+        submenus: List[Tuple[uuid.UUID, uuid.UUID]],
+        dishes: List[Tuple[uuid.UUID, uuid.UUID, uuid.UUID]],
+    ) -> None:
+        self.menus = menus
+        self.submenus = submenus
+        self.dishes = dishes
+        self.created_menus: List[uuid.UUID] = []
+        self.created_submenus: List[Tuple[uuid.UUID, uuid.UUID]] = []
+        self.created_dishes: List[Tuple[uuid.UUID, uuid.UUID, uuid.UUID]] = []
+
+    @classmethod
+    async def load(cls, engine: AsyncEngine, sample: int) -> 'Catalog':
+        """Загружаем из БД все меню и случайную выборку подменю и блюд.
+
+        Args:
+            - engine (AsyncEngine): Движок БД с каталогом.
+            - sample (int): Размер выборки подменю и блюд.
+
+        Returns:
+            - Catalog: id объектов каталога.
+        """
+
+        async with engine.connect() as connection:
+            menus = (await connection.scalars(select(models.Menu.id))).all()
+            submenus = (await connection.execute(
+                select(models.SubMenu.menu_id, models.SubMenu.id)
+                .order_by(func.random()).limit(sample)
+            )).all()
+            dishes = (await connection.execute(
+                select(models.SubMenu.menu_id, models.SubMenu.id, models.Dish.id)
+                .join(models.Dish)
+                .order_by(func.random()).limit(sample)
+            )).all()
+        if not menus or not submenus or not dishes:
+            raise RuntimeError('Каталог пуст: запустите бенчмарк без --no-seed')
+        return cls(
+            list(menus), [tuple(row) for row in submenus], [tuple(row) for row in dishes]
+        )
+
+
+def _title(kind: str) -> str:
+    return f'{kind} {uuid.uuid4()}'
+
+
+def _pop(objects: List) -> Optional[Any]:
+    return objects.pop(random.randrange(len(objects))) if objects else None
+
+
+async def get_menus(client: AsyncClient, catalog: Catalog) -> Response:
+    return await client.get(MENUS)
+
+
+async def get_menu(client: AsyncClient, catalog: Catalog) -> Response:
+    return await client.get(MENU.format(menu_id=random.choice(catalog.menus)))
+
+
+async def post_menu(client: AsyncClient, catalog: Catalog) -> Response:
+    response = await client.post(MENUS, json={'title': _title('Меню'), 'description': ''})
+    if response.status_code == 201:
+        catalog.created_menus.append(response.json()['id'])
+    return response
+
+
+async def patch_menu(client: AsyncClient, catalog: Catalog) -> Response:
+    return await client.patch(
+        MENU.format(menu_id=random.choice(catalog.menus)),
+        json={'title': _title('Меню'), 'description': 'Изменённое меню'},
+    )
+
+
+async def delete_menu(client: AsyncClient, catalog: Catalog) -> Optional[Response]:
+    menu_id = _pop(catalog.created_menus)
+    if menu_id is None:
+        return None
+    return await client.delete(MENU.format(menu_id=menu_id))
+
+
+async def get_tree(client: AsyncClient, catalog: Catalog) -> Response:
+    return await client.get('/api/v1/tree')
+
+
+async def get_menu_tree(client: AsyncClient, catalog: Catalog) -> Response:
+    return await client.get(f'{MENU}/tree'.format(menu_id=random.choice(catalog.menus)))
+
+
+async def get_submenus(client: AsyncClient, catalog: Catalog) -> Response:
+    return await client.get(SUBMENUS.format(menu_id=random.choice(catalog.menus)))
+
+
+async def get_submenu(client: AsyncClient, catalog: Catalog) -> Response:
+    menu_id, submenu_id = random.choice(catalog.submenus)
+    return await client.get(SUBMENU.format(menu_id=menu_id, submenu_id=submenu_id))
+
+
+async def post_submenu(client: AsyncClient, catalog: Catalog) -> Response:
+    menu_id = random.choice(catalog.menus)
+    response = await client.post(
+        SUBMENUS.format(menu_id=menu_id), json={'title': _title('Подменю'), 'description': ''}
+    )
+    if response.status_code == 201:
+        catalog.created_submenus.append((menu_id, response.json()['id']))
+    return response
+
+
+async def post_submenus(client: AsyncClient, catalog: Catalog) -> Response:
+    menu_id = random.choice(catalog.menus)
+    response = await client.post(f'{SUBMENUS}/bulk'.format(menu_id=menu_id), json=[
+        {'title': _title('Подменю'), 'description': ''} for _ in range(BULK_SIZE)
+    ])
+    if response.status_code == 201:
+        catalog.created_submenus.extend(
+            (menu_id, submenu['id']) for submenu in response.json()['created']
+        )
+    return response
+
+
+async def patch_submenu(client: AsyncClient, catalog: Catalog) -> Response:
+    menu_id, submenu_id = random.choice(catalog.submenus)
+    return await client.patch(
+        SUBMENU.format(menu_id=menu_id, submenu_id=submenu_id),
+        json={'title': _title('Подменю'), 'description': 'Изменённое подменю'},
+    )
+
+
+async def delete_submenu(client: AsyncClient, catalog: Catalog) -> Optional[Response]:
+    ids = _pop(catalog.created_submenus)
+    if ids is None:
+        return None
+    return await client.delete(SUBMENU.format(menu_id=ids[0], submenu_id=ids[1]))
+
+
+async def get_dishes(client: AsyncClient, catalog: Catalog) -> Response:
+    menu_id, submenu_id = random.choice(catalog.submenus)
+    return await client.get(DISHES.format(menu_id=menu_id, submenu_id=submenu_id))
+
+
+async def get_dish(client: AsyncClient, catalog: Catalog) -> Response:
+    menu_id, submenu_id, dish_id = random.choice(catalog.dishes)
+    return await client.get(
+        DISH.format(menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id)
+    )
+
+
+async def post_dish(client: AsyncClient, catalog: Catalog) -> Response:
+    menu_id, submenu_id = random.choice(catalog.submenus)
+    response = await client.post(
+        DISHES.format(menu_id=menu_id, submenu_id=submenu_id),
+        json={'title': _title('Блюдо'), 'description': '', 'price': 199.99},
+    )
+    if response.status_code == 201:
+        catalog.created_dishes.append((menu_id, submenu_id, response.json()['id']))
+    return response
+
+
+async def post_dishes(client: AsyncClient, catalog: Catalog) -> Response:
+    menu_id, submenu_id = random.choice(catalog.submenus)
+    response = await client.post(
+        f'{DISHES}/bulk'.format(menu_id=menu_id, submenu_id=submenu_id),
+        json=[
+            {'title': _title('Блюдо'), 'description': '', 'price': 99.5 + i}
+            for i in range(BULK_SIZE)
+        ],
+    )
+    if response.status_code == 201:
+        catalog.created_dishes.extend(
+            (menu_id, submenu_id, dish['id']) for dish in response.json()['created']
+        )
+    return response
+
+
+async def patch_dish(client: AsyncClient, catalog: Catalog) -> Response:
+    menu_id, submenu_id, dish_id = random.choice(catalog.dishes)
+    return await client.patch(
+        DISH.format(menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id),
+        json={'title': _title('Блюдо'), 'description': 'Изменённое блюдо', 'price': 250},
+    )
+
+
+async def delete_dish(client: AsyncClient, catalog: Catalog) -> Optional[Response]:
+    ids = _pop(catalog.created_dishes)
+    if ids is None:
+        return None
+    return await client.delete(DISH.format(menu_id=ids[0], submenu_id=ids[1], dish_id=ids[2]))
+
+
+Operation = Callable[[AsyncClient, Catalog], Awaitable[Optional[Response]]]
+
+# (метод, шаблон маршрута, вес, операция): около 90 % запросов — чтение.
+# Полное дерево меню — самый тяжёлый ответ, его снимок пересобирается после
+# каждого изменения меню, поэтому вес у него небольшой.
+WORKLOAD: Tuple[Tuple[str, str, float, Operation], ...] = (
+    ('GET', MENUS, 6, get_menus),
+    ('GET', MENU, 12, get_menu),
+    ('GET', '/api/v1/tree', 0.2, get_tree),
+    ('GET', '/api/v1/menus/{menu_id}/tree', 3, get_menu_tree),
+    ('POST', MENUS, 0.5, post_menu),
+    ('PATCH', MENU, 0.5, patch_menu),
+    ('DELETE', MENU, 0.5, delete_menu),
+    ('GET', SUBMENUS, 10, get_submenus),
+    ('GET', SUBMENU, 12, get_submenu),
+    ('POST', SUBMENUS, 1, post_submenu),
+    ('POST', f'{SUBMENUS}/bulk', 0.3, post_submenus),
+    ('PATCH', SUBMENU, 1, patch_submenu),
+    ('DELETE', SUBMENU, 1, delete_submenu),
+    ('GET', DISHES, 15, get_dishes),
+    ('GET', DISH, 25, get_dish),
+    ('POST', DISHES, 2, post_dish),
+    ('POST', f'{DISHES}/bulk', 0.5, post_dishes),
+    ('PATCH', DISH, 2, patch_dish),
+    ('DELETE', DISH, 2, delete_dish),
+)
+
+
+def uncovered_routes() -> List[str]:
+    """Ручки роутеров меню, подменю и блюд, которых нет в WORKLOAD."""
+
+    routes = {
+        (method, route.path)
+        for router in (menu_router, submenu_router, dish_router)
+        for route in router.routes
+        for method in route.methods
+    }
+    covered = {(method, route) for method, route, _, _ in WORKLOAD}
+    return sorted(f'{method} {route}' for method, route in routes - covered)
@@ -0,0 +1,191 @@
+"""Бенчмарк источников количества подменю и блюд в меню (MENU_COUNTS_STRATEGY).
+
+Для каждого объёма (10, 1 000 и 100 000 блюд в меню) каталог заполняется через COPY,
+после чего измеряется среднее время запроса меню по «id» и списка меню для каждого
+источника, а также для прежнего запроса с COUNT(DISTINCT) по соединению таблиц.
+Для представления отдельно измеряется обновление при записи.
+
+Запуск из каталога restaurant_menu (БД берётся из DB_HOST_TEST, DB_PORT, DB_NAME):
+
+    python -m benchmarks.menu_counts --menus 10 --repeat 20
+
+Бенчмарк создаёт и удаляет таблицы в тестовой БД, как и тесты.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from src import models
+from src.configs import (DB_HOST_TEST, DB_NAME, DB_PORT, POSTGRES_PASSWORD,
+                         POSTGRES_USER)
+from src.database import Base
+from src.menus import queries
+
+DATABASE_URL_TEST = (
+    f'postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@'
+    f'{DB_HOST_TEST}:{DB_PORT}/{DB_NAME}'
+)
+
+DISHES_PER_MENU = (10, 1000, 100000)
+SUBMENUS_PER_MENU = 10
+STRATEGIES = ('join', 'stored', 'subquery', 'view')
+
+
+def select_menu_with_join(menu_id: Optional[uuid.UUID] = None) -> Select:
+    """Прежний запрос: COUNT(DISTINCT) по соединению меню, подменю и блюд."""
+
+    query = (
+        select(
+            models.Menu.id,
+            models.Menu.title,
+            models.Menu.description,
+            func.count(models.SubMenu.id.distinct()).label('submenus_count'),
+            func.count(models.Dish.id.distinct()).label('dishes_count')
+        )
+        .select_from(models.Menu).outerjoin(models.SubMenu).outerjoin(models.Dish)
+        .group_by(models.Menu.id)
+    )
+    if menu_id is None:
+        return query
+    return query.where(models.Menu.id == menu_id)
+
+
+def select_menus(strategy: str, menu_id: Optional[uuid.UUID] = None) -> Select:
+    """Запрос меню (всех или одного) с количеством подменю и блюд для источника."""
+
+    if strategy == 'join':
+        return select_menu_with_join(menu_id)
+    queries.MENU_COUNTS_STRATEGY = strategy
+    return queries.select_all_menus(menu_id)
+
+
+async def seed(engine: AsyncEngine, menus_count: int, dishes_per_menu: int) -> List[uuid.UUID]:
+    """Заполняем каталог через COPY и обновляем статистику и представление.
+
+    Args:
+        - engine (AsyncEngine): Движок тестовой БД.
+        - menus_count (int): Количество меню.
+        - dishes_per_menu (int): Количество блюд в каждом меню.
+
+    Returns:
+        - List[UUID]: id созданных меню.
+    """
+
+    dishes_per_submenu = max(dishes_per_menu // SUBMENUS_PER_MENU, 1)
+    menus: List[Tuple] = []
+    submenus: List[Tuple] = []
+    dishes: List[Tuple] = []
+    for m in range(menus_count):
+        menu_id = uuid.uuid4()
+        menus.append((
+            menu_id, f'Меню {m}', '', SUBMENUS_PER_MENU, SUBMENUS_PER_MENU * dishes_per_submenu
+        ))
+        for s in range(SUBMENUS_PER_MENU):
+            submenu_id = uuid.uuid4()
+            submenus.append((submenu_id, menu_id, f'Подменю {m}-{s}', '', dishes_per_submenu))
+            dishes.extend(
+                (uuid.uuid4(), submenu_id, f'Блюдо {m}-{s}-{d}', '', d)
+                for d in range(dishes_per_submenu)
+            )
+
+    async with engine.begin() as connection:
+        raw = (await connection.get_raw_connection()).driver_connection
+        for model, rows in ((models.Menu, menus), (models.SubMenu, submenus),
+                            (models.Dish, dishes)):
+            await raw.copy_records_to_table(
+                model.__tablename__, records=rows,
+                # Версии строк выдаёт последовательность (server_default).
+                columns=[
+                    column.name for column in model.__table__.columns
+                    if column.name != 'version'
+                ],
+            )
+        await connection.execute(text('REFRESH MATERIALIZED VIEW menu_stats'))
+        await connection.execute(text('ANALYZE menus, submenus, dishes, menu_stats'))
+
+    return [menu[0] for menu in menus]
+
+
+async def measure(engine: AsyncEngine, query: Select, repeat: int) -> float:
+    """Среднее время выполнения запроса в миллисекундах (после одного прогрева)."""
+
+    async with engine.connect() as connection:
+        await connection.execute(query)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            (await connection.execute(query)).all()
+        return (time.perf_counter() - started) * 1000 / repeat
+
+
+async def measure_refresh(engine: AsyncEngine, repeat: int) -> float:
+    """Среднее время REFRESH MATERIALIZED VIEW CONCURRENTLY в миллисекундах."""
+
+    async with engine.begin() as connection:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await connection.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY menu_stats'))
+        return (time.perf_counter() - started) * 1000 / repeat
+
+
+async def run(menus_count: int, repeat: int) -> List[Dict]:
+    """Выполняем бенчмарк для всех объёмов и источников.
+
+    Args:
+        - menus_count (int): Количество меню в каталоге.
+        - repeat (int): Количество повторов каждого запроса.
+
+    Returns:
+        - List[Dict]: Результаты: объём, источник и время запросов в миллисекундах.
+    """
+
+    engine = create_async_engine(DATABASE_URL_TEST, poolclass=NullPool)
+    results: List[Dict] = []
+    try:
+        for dishes_per_menu in DISHES_PER_MENU:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.drop_all)
+                await connection.run_sync(Base.metadata.create_all)
+            menu_ids = await seed(engine, menus_count, dishes_per_menu)
+            menu_id = menu_ids[len(menu_ids) // 2]
+
+            for strategy in STRATEGIES:
+                results.append({
+                    'dishes_per_menu': dishes_per_menu,
+                    'strategy': strategy,
+                    'detail_ms': await measure(
+                        engine, select_menus(strategy, menu_id), repeat
+                    ),
+                    'list_ms': await measure(engine, select_menus(strategy), repeat),
+                    'refresh_ms': (
+                        await measure_refresh(engine, repeat) if strategy == 'view' else 0.0
+                    ),
+                })
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--menus', type=int, default=10, help='Количество меню.')
+    parser.add_argument('--repeat', type=int, default=20, help='Повторов каждого запроса.')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.menus, args.repeat))
+    print(f'{"блюд в меню":>12} {"источник":>10} {"по id, мс":>10} '
+          f'{"список, мс":>11} {"обновление, мс":>15}')
+    for row in results:
+        print(f'{row["dishes_per_menu"]:>12} {row["strategy"]:>10} {row["detail_ms"]:>10.2f} '
+              f'{row["list_ms"]:>11.2f} {row["refresh_ms"]:>15.2f}')
+
+
+if __name__ == '__main__':
+    main()
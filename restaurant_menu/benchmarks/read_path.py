@@ -0,0 +1,146 @@
+"""Бенчмарк памяти чтения: ORM объекты и строки SQLAlchemy Core (queries.py).
+
+Подменю с заданным количеством блюд заполняется через COPY, после чего список блюд
+читается и сериализуется двумя способами: прежним запросом ORM объектов
+(select(Dish)) и запросом колонок ответа из src.dishes.queries.
+Для каждого способа выводятся память и количество блоков загруженного списка,
+пик памяти с сериализацией (tracemalloc) и среднее время одного чтения.
+
+Запуск из каталога restaurant_menu (БД берётся из DB_HOST_TEST, DB_PORT, DB_NAME):
+
+    python -m benchmarks.read_path --dishes 10000 --repeat 10
+
+Бенчмарк создаёт и удаляет таблицы в тестовой БД, как и тесты.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from src import models, schemas
+from src.database import Base
+from src.dishes import queries
+
+from .menu_counts import DATABASE_URL_TEST, SUBMENUS_PER_MENU, seed
+
+
+async def load_orm(db: AsyncSession, menu_id: Any, submenu_id: Any) -> List[Any]:
+    """Прежнее чтение: ORM объекты блюд в identity map сессии."""
+
+    dishes = await db.execute(
+        select(models.Dish)
+        .where(models.Dish.submenu_id == submenu_id)
+        .order_by(models.Dish.id)
+    )
+    return dishes.scalars().all()
+
+
+async def load_core(db: AsyncSession, menu_id: Any, submenu_id: Any) -> List[Any]:
+    """Новое чтение: строки с колонками ответа."""
+
+    return await queries.get_all_dishes(db=db, menu_id=menu_id, submenu_id=submenu_id)
+
+
+async def measure(
+        session_factory: Callable[[], AsyncSession],
+        loader: Callable,
+        menu_id: Any,
+        submenu_id: Any,
+        repeat: int,
+) -> Dict[str, float]:
+    """Память загруженного списка и пик памяти чтения с сериализацией, среднее время.
+
+    Память списка (loaded_kib, loaded_blocks) замеряется сразу после запроса, пока
+    сессия открыта: это объекты, которые запрос держит до конца обработки.
+    """
+
+    schema = List[schemas.DetailedDishInfoPyd]
+
+    async def read(traced: bool = False) -> Dict[str, float]:
+        async with session_factory() as db:
+            if traced:
+                tracemalloc.start()
+            items = await loader(db, menu_id, submenu_id)
+            if not traced:
+                schemas.dump_json(items, schema)
+                return {}
+            loaded, _ = tracemalloc.get_traced_memory()
+            blocks = sum(
+                stat.count for stat in tracemalloc.take_snapshot().statistics('filename')
+            )
+            schemas.dump_json(items, schema)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return {
+                'loaded_kib': loaded / 1024, 'loaded_blocks': blocks, 'peak_kib': peak / 1024
+            }
+
+    await read()
+    memory = await read(traced=True)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await read()
+    elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+
+    return {**memory, 'time_ms': elapsed_ms}
+
+
+async def run(dishes_per_submenu: int, repeat: int) -> List[Dict]:
+    """Выполняем бенчмарк для чтения ORM объектов и строк Core.
+
+    Args:
+        - dishes_per_submenu (int): Количество блюд в списке.
+        - repeat (int): Количество чтений для замера времени.
+
+    Returns:
+        - List[Dict]: Способ чтения, память, блоки и время.
+    """
+
+    engine = create_async_engine(DATABASE_URL_TEST)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    results: List[Dict] = []
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+        menu_id = (await seed(engine, 1, dishes_per_submenu * SUBMENUS_PER_MENU))[0]
+        async with session_factory() as db:
+            submenu_id = await db.scalar(
+                select(models.SubMenu.id).where(models.SubMenu.menu_id == menu_id).limit(1)
+            )
+
+        for name, loader in (('orm', load_orm), ('core', load_core)):
+            results.append({
+                'read_path': name,
+                'dishes': dishes_per_submenu,
+                **await measure(session_factory, loader, menu_id, submenu_id, repeat),
+            })
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dishes', type=int, default=10000, help='Блюд в списке.')
+    parser.add_argument('--repeat', type=int, default=10, help='Чтений для замера времени.')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dishes, args.repeat))
+    print(f'{"чтение":>7} {"блюд":>6} {"список, КиБ":>12} {"блоков":>8} '
+          f'{"пик, КиБ":>10} {"время, мс":>10}')
+    for row in results:
+        print(f'{row["read_path"]:>7} {row["dishes"]:>6} {row["loaded_kib"]:>12.0f} '
+              f'{row["loaded_blocks"]:>8} {row["peak_kib"]:>10.0f} {row["time_ms"]:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
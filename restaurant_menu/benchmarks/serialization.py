@@ -0,0 +1,108 @@
+"""Бенчмарк сериализации ответов: Pydantic и быстрый режим (FAST_SERIALIZATION).
+
+Каталог с одним меню заполняется через COPY, после чего список блюд подменю
+запрашивается через приложение (httpx + ASGI, без сети и без кэша) в обоих режимах.
+Выводится количество запросов в секунду и время одной сериализации списка.
+
+Запуск из каталога restaurant_menu (БД берётся из DB_HOST_TEST, DB_PORT, DB_NAME):
+
+    python -m benchmarks.serialization --dishes 1000 --requests 200
+
+Бенчмарк создаёт и удаляет таблицы в тестовой БД, как и тесты.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from src import cache, models, schemas
+from src.database import (Base, get_primary_read_session_factory,
+                          get_session_factory)
+from src.main import app
+
+from .menu_counts import DATABASE_URL_TEST, SUBMENUS_PER_MENU, seed
+
+
+async def run(dishes_per_submenu: int, requests: int) -> List[Dict]:
+    """Выполняем бенчмарк в обоих режимах сериализации.
+
+    Args:
+        - dishes_per_submenu (int): Количество блюд в списке.
+        - requests (int): Количество запросов списка в каждом режиме.
+
+    Returns:
+        - List[Dict]: Режим, запросов в секунду и время сериализации в миллисекундах.
+    """
+
+    engine = create_async_engine(DATABASE_URL_TEST)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    app.dependency_overrides.update({
+        get_session_factory: lambda: session_factory,
+        get_primary_read_session_factory: lambda: session_factory,
+    })
+    cache.backend = cache.NullCache()
+    results: List[Dict] = []
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+        menu_id = (await seed(engine, 1, dishes_per_submenu * SUBMENUS_PER_MENU))[0]
+        async with session_factory() as session:
+            submenu_id = await session.scalar(
+                select(models.SubMenu.id).where(models.SubMenu.menu_id == menu_id).limit(1)
+            )
+            dishes = (await session.scalars(
+                select(models.Dish).where(models.Dish.submenu_id == submenu_id)
+            )).all()
+        url = f'/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes'
+        schema = List[schemas.DetailedDishInfoPyd]
+
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            for fast in (False, True):
+                schemas.FAST_SERIALIZATION = fast
+                await client.get(url)
+
+                started = time.perf_counter()
+                for _ in range(requests):
+                    response = await client.get(url)
+                    assert response.status_code == 200
+                elapsed = time.perf_counter() - started
+
+                dump_started = time.perf_counter()
+                for _ in range(requests):
+                    schemas.dump_json(dishes, schema)
+                dump_ms = (time.perf_counter() - dump_started) * 1000 / requests
+
+                results.append({
+                    'mode': 'orjson' if fast else 'pydantic',
+                    'dishes': len(dishes),
+                    'requests_per_second': requests / elapsed,
+                    'dump_json_ms': dump_ms,
+                })
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dishes', type=int, default=1000, help='Блюд в списке.')
+    parser.add_argument('--requests', type=int, default=200, help='Запросов в каждом режиме.')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dishes, args.requests))
+    print(f'{"режим":>10} {"блюд":>6} {"запросов/с":>11} {"dump_json, мс":>14}')
+    for row in results:
+        print(f'{row["mode"]:>10} {row["dishes"]:>6} {row["requests_per_second"]:>11.1f} '
+              f'{row["dump_json_ms"]:>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Fix indexes: drop redundant id indexes, index foreign keys
+
+Revision ID: 3f1c2b7d9a54
+Revises: e8ce68090ee4
+Create Date: 2026-10-17 10:00:00.000000
+
+Индексы ix_*_id дублируют индексы первичных ключей. Внешние ключи
+submenus.menu_id и dishes.submenu_id не были проиндексированы, хотя по ним
+выбираются списки подменю и блюд (с сортировкой по id для постраничного вывода),
+соединяются таблицы при подсчёте блюд и удаляются строки по ON DELETE CASCADE.
+
+Индексы создаются и удаляются CONCURRENTLY, без блокировки записи в таблицы,
+поэтому каждая операция выполняется вне транзакции (autocommit_block).
+IF [NOT] EXISTS позволяет повторить миграцию, если она была прервана.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2b7d9a54'
+down_revision: Union[str, None] = 'e8ce68090ee4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_submenus_menu_id', 'submenus', ['menu_id', 'id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_dishes_submenu_id', 'dishes', ['submenu_id', 'id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        for table in ('menus', 'submenus', 'dishes'):
+            op.drop_index(
+                f'ix_{table}_id', table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in ('menus', 'submenus', 'dishes'):
+            op.create_index(
+                f'ix_{table}_id', table, ['id'],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+        op.drop_index(
+            'ix_dishes_submenu_id', table_name='dishes',
+            postgresql_concurrently=True, if_exists=True,
+        )
+        op.drop_index(
+            'ix_submenus_menu_id', table_name='submenus',
+            postgresql_concurrently=True, if_exists=True,
+        )
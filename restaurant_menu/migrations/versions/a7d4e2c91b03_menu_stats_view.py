@@ -0,0 +1,33 @@
+"""Add menu_stats materialized view
+
+Revision ID: a7d4e2c91b03
+Revises: 3f1c2b7d9a54
+Create Date: 2026-10-17 12:00:00.000000
+
+Количество подменю и блюд для каждого меню (MENU_COUNTS_STRATEGY=view).
+Уникальный индекс нужен для REFRESH MATERIALIZED VIEW CONCURRENTLY.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d4e2c91b03'
+down_revision: Union[str, None] = '3f1c2b7d9a54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        'CREATE MATERIALIZED VIEW menu_stats AS '
+        'SELECT submenus.menu_id, count(DISTINCT submenus.id) AS submenus_count, '
+        'count(dishes.id) AS dishes_count '
+        'FROM submenus LEFT OUTER JOIN dishes ON dishes.submenu_id = submenus.id '
+        'GROUP BY submenus.menu_id'
+    )
+    op.create_index('ix_menu_stats_menu_id', 'menu_stats', ['menu_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.execute('DROP MATERIALIZED VIEW menu_stats')
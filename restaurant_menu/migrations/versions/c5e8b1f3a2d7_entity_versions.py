@@ -0,0 +1,78 @@
+"""Add version columns to menus, submenus and dishes
+
+Revision ID: c5e8b1f3a2d7
+Revises: a7d4e2c91b03
+Create Date: 2026-10-17 15:00:00.000000
+
+Версии строк для ETag выдаёт общая последовательность entity_version_seq.
+
+Колонка с вычисляемым значением по умолчанию (nextval) и NOT NULL перезаписала бы
+таблицу под блокировкой ACCESS EXCLUSIVE. Поэтому колонка добавляется без значения
+по умолчанию и без NOT NULL (изменяется только каталог), затем ей назначается
+значение по умолчанию — новые строки сразу получают версии, — а существующие строки
+заполняются порциями по BATCH_SIZE, каждая в своей транзакции. NOT NULL
+устанавливается после проверки ограничения CHECK (version IS NOT NULL), созданного
+как NOT VALID: VALIDATE не блокирует запись, а SET NOT NULL с проверенным
+ограничением не сканирует таблицу.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8b1f3a2d7'
+down_revision: Union[str, None] = 'a7d4e2c91b03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('menus', 'submenus', 'dishes')
+
+# Количество строк, которые получают версии в одной транзакции.
+BATCH_SIZE = 10000
+
+
+def backfill(table: str) -> None:
+    """Заполняем версии существующих строк порциями, по возрастанию id."""
+
+    after = '00000000-0000-0000-0000-000000000000'
+    while True:
+        ids = op.get_bind().execute(sa.text(
+            f'WITH batch AS ('
+            f'  SELECT id FROM {table}'
+            f'  WHERE id > CAST(:after AS uuid) AND version IS NULL'
+            f'  ORDER BY id LIMIT :size'
+            f') '
+            f"UPDATE {table} SET version = nextval('entity_version_seq') "
+            f'FROM batch WHERE {table}.id = batch.id '
+            f'RETURNING {table}.id'
+        ), {'after': after, 'size': BATCH_SIZE}).scalars().all()
+        if not ids:
+            break
+        after = str(max(ids))
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('entity_version_seq')))
+    for table in TABLES:
+        op.add_column(table, sa.Column('version', sa.BigInteger(), nullable=True))
+        op.alter_column(
+            table, 'version', server_default=sa.text("nextval('entity_version_seq')")
+        )
+
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            backfill(table)
+            constraint = f'ck_{table}_version_not_null'
+            op.create_check_constraint(
+                constraint, table, 'version IS NOT NULL', postgresql_not_valid=True
+            )
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}')
+            op.alter_column(table, 'version', nullable=False)
+            op.drop_constraint(constraint, table, type_='check')
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, 'version')
+    op.execute(sa.schema.DropSequence(sa.Sequence('entity_version_seq')))
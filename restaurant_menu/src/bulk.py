@@ -0,0 +1,79 @@
+"""Массовое создание подменю и блюд.
+
+Объекты вставляются многострочным «INSERT ... ON CONFLICT (title) DO NOTHING RETURNING»
+частями по BULK_INSERT_CHUNK_SIZE строк (ограничение количества параметров запроса).
+Объекты, которые не вернул INSERT, и повторы названий внутри запроса
+возвращаются клиенту как конфликты, остальные объекты создаются.
+"""
+
+import uuid
+from typing import Any, Dict, List, Sequence, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.configs import BULK_INSERT_CHUNK_SIZE
+
+
+async def insert_ignoring_conflicts(
+        db: AsyncSession,
+        model: Any,
+        rows: List[Dict[str, Any]],
+) -> List[Any]:
+    """Вставляем строки, пропуская строки с уже существующим названием, без коммита.
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - model (Base): Модель SQLAlchemy с уникальным полем «title».
+        - rows (List[Dict]): Значения колонок для каждой строки.
+
+    Returns:
+        - List[Base]: Созданные объекты.
+    """
+
+    created: List[Any] = []
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        chunk = [
+            {'id': uuid.uuid4(), **row} for row in rows[start:start + BULK_INSERT_CHUNK_SIZE]
+        ]
+        result = await db.scalars(
+            insert(model)
+            .values(chunk)
+            .on_conflict_do_nothing(index_elements=[model.title])
+            .returning(model)
+        )
+        created.extend(result.all())
+
+    return created
+
+
+def split_created(
+        items: Sequence[BaseModel],
+        created: List[Any],
+        detail: str,
+) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    """Сопоставляем объекты запроса с созданными объектами по названию.
+
+    Первый объект с данным названием считается созданным, если INSERT его вернул,
+    остальные объекты с тем же названием — конфликтами.
+
+    Args:
+        - items (Sequence[BaseModel]): Объекты запроса.
+        - created (List[Base]): Объекты, которые вернул INSERT.
+        - detail (str): Описание конфликта.
+
+    Returns:
+        - Tuple[List[Base], List[Dict]]: Созданные объекты в порядке запроса и конфликты.
+    """
+
+    by_title: Dict[str, Any] = {obj.title: obj for obj in created}
+    ordered: List[Any] = []
+    conflicts: List[Dict[str, Any]] = []
+    for index, item in enumerate(items):
+        obj = by_title.pop(item.title, None)
+        if obj is None:
+            conflicts.append({'index': index, 'title': item.title, 'detail': detail})
+        else:
+            ordered.append(obj)
+
+    return ordered, conflicts
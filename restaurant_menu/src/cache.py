@@ -0,0 +1,470 @@
+"""Кэширование ответов GET-ручек.
+
+Кэш хранит готовые JSON-ответы (bytes). Ключи строятся иерархически, от меню к блюду,
+поэтому удаление меню или подменю сбрасывает все вложенные ключи одним префиксом.
+Снимки дерева меню (tree) сбрасываются при изменениях и хранятся дольше остальных
+ответов (CACHE_SNAPSHOT_TTL): если сброс потерян, устаревший снимок не живёт вечно.
+Варианты ответа — сжатые копии (src.compression) и ETag (src.etags) — хранятся
+под ключами «{ключ}|{вариант}» и удаляются вместе с ответом.
+
+Каждый сброс увеличивает поколение кэша (BaseCache.generation). Ответ, прочитанный
+из БД до сброса, в кэш не записывается: запись проверяет, что поколение не изменилось
+с начала запроса (иначе запись, которая завершилась между чтением и записью в кэш,
+оставила бы в нём старый ответ).
+
+Ответы, прочитанные с реплики БД (src.replicas.replica_read), отдаются клиенту,
+но в кэш не записываются: кэш заполняют только чтения с основной БД.
+
+
+    menus
+    tree
+    menu:{menu_id}
+    menu:{menu_id}:tree
+    menu:{menu_id}:submenus
+    menu:{menu_id}:submenu:{submenu_id}
+    menu:{menu_id}:submenu:{submenu_id}:dishes
+    menu:{menu_id}:submenu:{submenu_id}:dish:{dish_id}
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import Response
+from src import compression, etags, metrics, replicas
+from src.configs import (CACHE_BACKEND, CACHE_MAXSIZE, CACHE_SNAPSHOT_TTL,
+                         CACHE_TTL, DB_REPLICA_URLS, REDIS_URL)
+from src.schemas import dump_json
+
+
+class BaseCache:
+    """Интерфейс бэкенда кэша.
+
+    set с generation записывает значение, только если с момента получения
+    поколения (generation) не было сброса (delete, delete_prefix, clear).
+    """
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def generation(self) -> int:
+        raise NotImplementedError
+
+    async def set(
+        self, key: str, value: bytes, expire: bool = True, generation: Optional[int] = None
+    ) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+
+class NullCache(BaseCache):
+    """Кэш отключён: ничего не хранит."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def generation(self) -> int:
+        return 0
+
+    async def set(
+        self, key: str, value: bytes, expire: bool = True, generation: Optional[int] = None
+    ) -> None:
+        return None
+
+    async def delete(self, *keys: str) -> None:
+        return None
+
+    async def delete_prefix(self, prefix: str) -> None:
+        return None
+
+    async def clear(self) -> None:
+        return None
+
+
+class LRUCache(BaseCache):
+    """LRU-кэш в памяти процесса, с ограничением по размеру и времени жизни записей.
+
+    Args:
+        - maxsize (int): Максимальное количество записей.
+        - ttl (float): Время жизни записи в секундах.
+        - snapshot_ttl (float): Время жизни снимков (expire=False) в секундах.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = CACHE_MAXSIZE,
+        ttl: float = CACHE_TTL,
+        snapshot_ttl: float = CACHE_SNAPSHOT_TTL,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.snapshot_ttl = snapshot_ttl
+        self._data: 'OrderedDict[str, Tuple[float, bytes]]' = OrderedDict()
+        self._generation = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def set(
+        self, key: str, value: bytes, expire: bool = True, generation: Optional[int] = None
+    ) -> None:
+        if generation is not None and generation != self._generation:
+            return
+        expires_at = time.monotonic() + (self.ttl if expire else self.snapshot_ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        self._generation += 1
+        for key in keys:
+            for variant in variant_keys(key):
+                self._data.pop(variant, None)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        self._generation += 1
+        for key in [key for key in self._data if key.startswith(prefix)]:
+            del self._data[key]
+
+    async def clear(self) -> None:
+        self._generation += 1
+        self._data.clear()
+
+
+class RedisCache(BaseCache):
+    """Кэш в Redis (или любом сервере, совместимом с протоколом Redis).
+
+    Args:
+        - client (redis.asyncio.Redis): Асинхронный клиент Redis.
+        - ttl (int): Время жизни записи в секундах.
+        - namespace (str): Префикс всех ключей приложения.
+        - snapshot_ttl (int): Время жизни снимков (expire=False) в секундах.
+
+    Поколение хранится в ключе «generation:{namespace}» (вне префикса приложения,
+    чтобы clear его не удалял) и общее для всех процессов. Сброс увеличивает его
+    в одной транзакции с удалением ключей, запись с поколением идёт через
+    WATCH/MULTI.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl: int = CACHE_TTL,
+        namespace: str = 'restaurant_menu:',
+        snapshot_ttl: int = CACHE_SNAPSHOT_TTL,
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.namespace = namespace
+        self.snapshot_ttl = snapshot_ttl
+        self.generation_key = f'generation:{namespace}'
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.namespace + key)
+
+    async def generation(self) -> int:
+        return int(await self.client.get(self.generation_key) or 0)
+
+    async def set(
+        self, key: str, value: bytes, expire: bool = True, generation: Optional[int] = None
+    ) -> None:
+        ttl = self.ttl if expire else self.snapshot_ttl
+        if generation is None:
+            await self.client.set(self.namespace + key, value, ex=ttl)
+            return
+
+        from redis.exceptions import WatchError
+
+        async with self.client.pipeline() as pipe:
+            try:
+                await pipe.watch(self.generation_key)
+                if int(await pipe.get(self.generation_key) or 0) != generation:
+                    return
+                pipe.multi()
+                pipe.set(self.namespace + key, value, ex=ttl)
+                await pipe.execute()
+            except WatchError:
+                # Сброс между проверкой поколения и записью: ответ не записываем.
+                return
+
+    async def _invalidate(self, keys: List[str]) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(self.generation_key)
+            if keys:
+                pipe.delete(*keys)
+            await pipe.execute()
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._invalidate([
+                self.namespace + variant
+                for key in keys
+                for variant in variant_keys(key)
+            ])
+
+    async def delete_prefix(self, prefix: str) -> None:
+        keys = [key async for key in self.client.scan_iter(match=f'{self.namespace}{prefix}*')]
+        await self._invalidate(keys)
+
+    async def clear(self) -> None:
+        await self.delete_prefix('')
+
+
+def create_cache(name: str = CACHE_BACKEND) -> BaseCache:
+    """Создаём бэкенд кэша по его названию (memory, redis или none).
+
+    С репликами (DB_REPLICA_URLS) кэш в памяти процесса не подходит: запись через
+    один процесс не сбрасывает кэш других, и они отдают ответы старше реплики.
+    """
+
+    if name == 'memory' and DB_REPLICA_URLS:
+        raise ValueError('С репликами БД (DB_REPLICA_URLS) нужен CACHE_BACKEND=redis')
+    if name == 'memory':
+        return LRUCache()
+    if name == 'redis':
+        from redis import asyncio as aioredis
+
+        return RedisCache(aioredis.from_url(REDIS_URL))
+    if name == 'none':
+        return NullCache()
+    raise ValueError(f'Неизвестный бэкенд кэша: {name}')
+
+
+backend: BaseCache = create_cache()
+
+
+# --- Ключи кэша ---
+# Вариант записи с ETag ответа.
+ETAG_VARIANT = 'etag'
+
+
+def variant_key(key: str, variant: str) -> str:
+    """Ключ варианта ответа: сжатой копии (кодировка) или ETag."""
+
+    return f'{key}|{variant}'
+
+
+def variant_keys(key: str) -> List[str]:
+    """Ключ ответа и ключи всех его вариантов (для удаления из кэша)."""
+
+    return [
+        key, *(variant_key(key, variant)
+               for variant in (*compression.SUPPORTED_ENCODINGS, ETAG_VARIANT))
+    ]
+
+
+def menus_key() -> str:
+    return 'menus'
+
+
+def tree_key() -> str:
+    return 'tree'
+
+
+def menu_key(menu_id: UUID) -> str:
+    return f'menu:{menu_id}'
+
+
+def menu_tree_key(menu_id: UUID) -> str:
+    return f'{menu_key(menu_id)}:tree'
+
+
+def tree_keys(menu_id: UUID) -> List[str]:
+    """Ключи снимков дерева, которые нужно сбросить при любом изменении в меню."""
+
+    return [tree_key(), menu_tree_key(menu_id)]
+
+
+def submenus_key(menu_id: UUID) -> str:
+    return f'{menu_key(menu_id)}:submenus'
+
+
+def submenu_key(menu_id: UUID, submenu_id: UUID) -> str:
+    return f'{menu_key(menu_id)}:submenu:{submenu_id}'
+
+
+def dishes_key(menu_id: UUID, submenu_id: UUID) -> str:
+    return f'{submenu_key(menu_id, submenu_id)}:dishes'
+
+
+def dish_key(menu_id: UUID, submenu_id: UUID, dish_id: UUID) -> str:
+    return f'{submenu_key(menu_id, submenu_id)}:dish:{dish_id}'
+
+
+async def cached_response(
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        schema: Any,
+        expire: bool = True,
+        etag_loader: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+        if_none_match: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> Response:
+    """Отдаём JSON-ответ из кэша, а при промахе получаем данные из БД и кэшируем их.
+
+    Если клиент принимает сжатые ответы (compression.accepted_encoding), отдаём сжатую
+    копию из кэша; её нет — сжимаем JSON-ответ один раз и кэшируем с тем же сроком.
+
+    С etag_loader ответ получает ETag (etags.etag_of), который кэшируется вместе
+    с ответом. На If-None-Match с актуальным ETag отвечаем 304: ETag берётся из кэша,
+    а если его там нет — из дешёвого запроса etag_loader, без загрузки данных.
+
+    Ответы с выборочными полями (fields) не кэшируются, см. _fields_response.
+
+    Args:
+        - key (str): Ключ кэша.
+        - loader (Callable): Корутина-функция, которая получает данные из БД.
+        - schema (Any): Pydantic модель ответа (или List[модель]).
+        - expire (bool): False — снимок дерева меню, хранится CACHE_SNAPSHOT_TTL секунд.
+        - etag_loader (Callable | None): Корутина-функция, которая получает ETag из БД
+          (None, если объекта нет). Без неё ответ отдаётся без ETag.
+        - if_none_match (str | None): Заголовок «If-None-Match».
+        - fields (Tuple[str] | None): Поля ответа, None — все поля.
+
+    Returns:
+        - Response: JSON-ответ или ответ 304.
+    """
+
+    if fields is not None:
+        return await _fields_response(loader, schema, fields, etag_loader, if_none_match)
+
+    # Поколение до чтения кэша и БД: сброс после этого момента отменяет запись в кэш.
+    generation: int = await backend.generation()
+    encoding: Optional[str] = compression.accepted_encoding.get()
+    headers: Dict[str, str] = {}
+    use_cache = True
+
+    if etag_loader is not None:
+        cached_etag: Optional[bytes] = await backend.get(variant_key(key, ETAG_VARIANT))
+        etag: Optional[str] = cached_etag.decode() if cached_etag is not None else None
+        if etag is None and if_none_match:
+            etag = await etag_loader()
+        matched: Optional[str] = (
+            etags.matching_etag(if_none_match, etag) if etag is not None else None
+        )
+        if matched is not None:
+            metrics.CACHE_REQUESTS.inc('hit' if cached_etag is not None else 'miss')
+            return etags.not_modified(matched)
+        if cached_etag is None:
+            # ETag из БД может не совпадать с ответом в кэше: получаем ответ заново.
+            use_cache = False
+        else:
+            headers['ETag'] = etag
+
+    if use_cache and encoding is not None:
+        compressed: Optional[bytes] = await backend.get(variant_key(key, encoding))
+        if compressed is not None:
+            metrics.CACHE_REQUESTS.inc('hit')
+            return Response(
+                content=compressed,
+                media_type='application/json',
+                headers=compression.encoded_headers(encoding, headers),
+            )
+
+    content: Optional[bytes] = await backend.get(key) if use_cache else None
+
+    metrics.CACHE_REQUESTS.inc('miss' if content is None else 'hit')
+    if content is None:
+        data = await loader()
+        content = dump_json(data, schema)
+        await _fill(key, content, expire, generation)
+        if etag_loader is not None:
+            # ETag записывается после ответа: кто прочитал ETag, найдёт и его ответ.
+            headers['ETag'] = etags.etag_of(data)
+            await _fill(
+                variant_key(key, ETAG_VARIANT), headers['ETag'].encode(), expire, generation
+            )
+
+    return await _encoded_response(key, content, encoding, headers, expire, generation)
+
+
+async def _fill(key: str, value: bytes, expire: bool, generation: int) -> None:
+    """Записываем ответ в кэш, если он прочитан с основной БД, а не с реплики."""
+
+    if not replicas.replica_read.get():
+        await backend.set(key, value, expire=expire, generation=generation)
+
+
+async def _encoded_response(
+        key: str,
+        content: bytes,
+        encoding: Optional[str],
+        headers: Dict[str, str],
+        expire: bool,
+        generation: int,
+) -> Response:
+    """Сжимаем JSON-ответ, если клиент это принимает, и кэшируем сжатую копию."""
+
+    if encoding is None or not compression.should_compress(content):
+        return Response(content=content, media_type='application/json', headers=headers)
+
+    compressed = compression.compress(content, encoding)
+    await _fill(variant_key(key, encoding), compressed, expire, generation)
+    return Response(
+        content=compressed,
+        media_type='application/json',
+        headers=compression.encoded_headers(encoding, headers),
+    )
+
+
+async def _fields_response(
+        loader: Callable[[], Awaitable[Any]],
+        schema: Any,
+        fields: Tuple[str, ...],
+        etag_loader: Optional[Callable[[], Awaitable[Optional[str]]]],
+        if_none_match: Optional[str],
+) -> Response:
+    """Отдаём JSON-ответ с выборочными полями, минуя кэш.
+
+    Наборов полей слишком много, чтобы кэшировать и сбрасывать каждый из них, а данные
+    такого ответа и так выбираются узким запросом. ETag зависит от набора полей
+    (etags.fields_etag), поэтому 304 по-прежнему отдаётся без основного запроса.
+
+    Args:
+        - loader (Callable): Корутина-функция, которая получает данные из БД.
+        - schema (Any): Pydantic модель ответа (или List[модель]).
+        - fields (Tuple[str]): Поля ответа.
+        - etag_loader (Callable | None): Корутина-функция, которая получает ETag из БД.
+        - if_none_match (str | None): Заголовок «If-None-Match».
+
+    Returns:
+        - Response: JSON-ответ или ответ 304.
+    """
+
+    headers: Dict[str, str] = {}
+    metrics.CACHE_REQUESTS.inc('bypass')
+
+    if etag_loader is not None and if_none_match:
+        etag: Optional[str] = await etag_loader()
+        if etag is not None:
+            matched = etags.matching_etag(if_none_match, etags.fields_etag(etag, fields))
+            if matched is not None:
+                return etags.not_modified(matched)
+
+    data = await loader()
+    if etag_loader is not None:
+        headers['ETag'] = etags.fields_etag(etags.etag_of(data), fields)
+    return Response(
+        content=dump_json(data, schema, fields), media_type='application/json', headers=headers
+    )
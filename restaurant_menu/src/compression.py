@@ -0,0 +1,211 @@
+"""Сжатие ответов (gzip и, если установлен пакет zstandard, zstd).
+
+Кодировка выбирается по заголовку «Accept-Encoding» клиента в порядке
+COMPRESSION_ENCODINGS. Ответы короче COMPRESSION_MIN_SIZE байт не сжимаются:
+заголовки и CPU обходятся дороже сэкономленных байт.
+
+Ответы из кэша (cache.cached_response) сжимаются один раз: сжатая копия хранится
+в кэше рядом с JSON-ответом (cache.variant_key) и сбрасывается вместе с ним.
+Остальные ответы, в том числе потоковые, сжимает CompressionMiddleware.
+"""
+
+import gzip
+import zlib
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from src.configs import (COMPRESSION_ENCODINGS, COMPRESSION_GZIP_LEVEL,
+                         COMPRESSION_MIN_SIZE, COMPRESSION_ZSTD_LEVEL)
+from src.etags import coded_etag
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Все кодировки, которые знает модуль (zstd — только с пакетом zstandard).
+SUPPORTED_ENCODINGS = ('gzip', 'zstd')
+
+# Типы ответов, которые имеет смысл сжимать.
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+# Кодировка, выбранная для текущего запроса (устанавливает CompressionMiddleware).
+accepted_encoding: ContextVar[Optional[str]] = ContextVar('accepted_encoding', default=None)
+
+
+def _gzip_compressobj() -> Any:
+    return zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def _zstd_compressobj() -> Any:
+    return zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compressobj()
+
+
+_compressors: Dict[str, Callable[[bytes], bytes]] = {
+    'gzip': lambda body: gzip.compress(body, COMPRESSION_GZIP_LEVEL, mtime=0),
+}
+_compressobjs: Dict[str, Callable[[], Any]] = {'gzip': _gzip_compressobj}
+# Режим сброса части потокового ответа: клиент может распаковать её сразу.
+_flush_modes: Dict[str, int] = {'gzip': zlib.Z_SYNC_FLUSH}
+if zstandard is not None:
+    _compressors['zstd'] = zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compress
+    _compressobjs['zstd'] = _zstd_compressobj
+    _flush_modes['zstd'] = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+
+# Доступные кодировки в порядке предпочтения.
+ENCODINGS: List[str] = [
+    encoding for encoding in COMPRESSION_ENCODINGS if encoding in _compressors
+]
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Выбираем кодировку по заголовку «Accept-Encoding».
+
+    Args:
+        - accept_encoding (str): Значение заголовка, например «gzip, zstd;q=0.5».
+
+    Returns:
+        - str | None: Первая из ENCODINGS, которую принимает клиент (q > 0), или None.
+    """
+
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+
+def should_compress(body: bytes) -> bool:
+    """Сжимаем только ответы не короче COMPRESSION_MIN_SIZE байт."""
+
+    return len(body) >= COMPRESSION_MIN_SIZE
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Сжимаем тело ответа выбранной кодировкой."""
+
+    return _compressors[encoding](body)
+
+
+def encoded_headers(encoding: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Заголовки сжатого ответа: к заголовкам headers добавляется кодировка.
+
+    ETag сжатого ответа получает суффикс кодировки (etags.coded_etag).
+    """
+
+    headers = {**(headers or {}), 'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'}
+    if 'ETag' in headers:
+        headers['ETag'] = coded_etag(headers['ETag'], encoding)
+    return headers
+
+
+class CompressionMiddleware:
+    """ASGI middleware: сжимаем ответы по «Accept-Encoding».
+
+    Ответы, у которых уже есть «Content-Encoding» (сжатые копии из кэша), и ответы
+    других типов передаются без изменений. Потоковые ответы сжимаются по частям:
+    каждая часть сбрасывается (Z_SYNC_FLUSH для gzip, COMPRESSOBJ_FLUSH_BLOCK
+    для zstd), и клиент получает её сразу.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        token = accepted_encoding.set(encoding)
+        try:
+            if encoding is None:
+                await self.app(scope, receive, send)
+            else:
+                await self.app(scope, receive, _CompressingSend(send, encoding))
+        finally:
+            accepted_encoding.reset(token)
+
+
+class _CompressingSend:
+    """Обёртка над send, которая сжимает тело ответа."""
+
+    def __init__(self, send: Send, encoding: str) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.start: Optional[Message] = None
+        self.compressobj: Any = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            self.start = message
+            headers = Headers(raw=message['headers'])
+            content_type = headers.get('content-type', '')
+            self.passthrough = 'content-encoding' in headers or not content_type.startswith(
+                COMPRESSIBLE_TYPES
+            )
+            return
+
+        if message['type'] != 'http.response.body' or self.passthrough:
+            await self._send_start()
+            await self.send(message)
+            return
+
+        body: bytes = message.get('body', b'')
+        more_body: bool = message.get('more_body', False)
+
+        if self.compressobj is None and not more_body:
+            # Ответ целиком в одном сообщении.
+            headers = MutableHeaders(raw=self.start['headers'])
+            headers.add_vary_header('Accept-Encoding')
+            if should_compress(body):
+                body = compress(body, self.encoding)
+                self._set_encoding(headers)
+                headers['Content-Length'] = str(len(body))
+            await self._send_start()
+            await self.send({'type': 'http.response.body', 'body': body})
+            return
+
+        if self.compressobj is None:
+            # Потоковый ответ: длина заранее неизвестна.
+            self.compressobj = _compressobjs[self.encoding]()
+            headers = MutableHeaders(raw=self.start['headers'])
+            headers.add_vary_header('Accept-Encoding')
+            self._set_encoding(headers)
+            del headers['Content-Length']
+            await self._send_start()
+
+        if more_body:
+            body = (
+                self.compressobj.compress(body)
+                + self.compressobj.flush(_flush_modes[self.encoding])
+            )
+        else:
+            body = self.compressobj.compress(body) + self.compressobj.flush()
+        await self.send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+    def _set_encoding(self, headers: MutableHeaders) -> None:
+        """Кодировка ответа и ETag сжатого ответа (etags.coded_etag)."""
+
+        headers['Content-Encoding'] = self.encoding
+        if 'etag' in headers:
+            headers['ETag'] = coded_etag(headers['etag'], self.encoding)
+
+    async def _send_start(self) -> None:
+        if self.start is not None:
+            await self.send(self.start)
+            self.start = None
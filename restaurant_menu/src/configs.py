@@ -14,3 +14,106 @@ DB_NAME = os.environ.get('DB_NAME')
 
 # data db for tests
 DB_HOST_TEST = os.environ.get('DB_HOST_TEST')
+# Вторая БД (реплика) для тестов чтения с реплик, по умолчанию — та же БД.
+DB_REPLICA_HOST_TEST = os.environ.get('DB_REPLICA_HOST_TEST', DB_HOST_TEST)
+DB_REPLICA_PORT_TEST = os.environ.get('DB_REPLICA_PORT_TEST', DB_PORT)
+
+# cache
+# Бэкенд кэша GET-ручек: memory (LRU в памяти процесса), redis или none.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+CACHE_TTL = int(os.environ.get('CACHE_TTL', 60))
+CACHE_MAXSIZE = int(os.environ.get('CACHE_MAXSIZE', 10000))
+# Время жизни снимков дерева меню в секундах (сбрасываются и при изменениях).
+CACHE_SNAPSHOT_TTL = int(os.environ.get('CACHE_SNAPSHOT_TTL', 3600))
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+# serialization
+# Быстрая сериализация ответов (orjson, без повторной проверки данных из БД).
+FAST_SERIALIZATION = os.environ.get('FAST_SERIALIZATION', 'true').lower() == 'true'
+
+# compression
+# Кодировки сжатия ответов в порядке предпочтения, пусто — без сжатия.
+# zstd используется, только если установлен пакет zstandard.
+COMPRESSION_ENCODINGS = [
+    encoding.strip()
+    for encoding in os.environ.get('COMPRESSION_ENCODINGS', 'zstd,gzip').split(',')
+    if encoding.strip()
+]
+# Ответы короче этого размера в байтах отдаются без сжатия.
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_ZSTD_LEVEL = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))
+
+# instrumentation
+# Статистика SQL-запросов каждого запроса: заголовок «Server-Timing» и строка в логе.
+SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'false').lower() == 'true'
+
+# metrics
+# Метрики Prometheus в памяти процесса (ручка /metrics).
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+
+# slow queries
+# Запросы дольше порога (мс) записываются в журнал медленных запросов, 0 — выключено.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 0))
+SLOW_QUERY_LOG_SIZE = int(os.environ.get('SLOW_QUERY_LOG_SIZE', 100))
+# Повторное выполнение медленных SELECT под EXPLAIN (ANALYZE, BUFFERS): доля
+# запросов и минимальная пауза между EXPLAIN в секундах.
+SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'false').lower() == 'true'
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0.1))
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL', 60))
+
+# profiling
+# Ключ подписи заголовка «X-Profile», пусто — профилирование выключено.
+PROFILING_SECRET = os.environ.get('PROFILING_SECRET', '')
+# Каталог для файлов профилей, пусто — профиль возвращается вместо ответа.
+PROFILING_DIR = os.environ.get('PROFILING_DIR', '')
+# Интервал выборки стеков в секундах (формат collapsed).
+PROFILING_SAMPLE_INTERVAL = float(os.environ.get('PROFILING_SAMPLE_INTERVAL', 0.001))
+
+# service routes
+# Токен служебных ручек (/metrics, /api/v1/pool, /api/v1/slow-queries) в заголовке
+# «Authorization: Bearer <токен>», пусто — служебные ручки выключены.
+SERVICE_TOKEN = os.environ.get('SERVICE_TOKEN', '')
+
+# pagination
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', 100))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 1000))
+
+# streaming
+# Количество строк, которое читается из серверного курсора за один раз.
+STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE', 500))
+
+# bulk creation
+# Максимальное количество объектов в одном запросе и строк в одном INSERT.
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 10000))
+BULK_INSERT_CHUNK_SIZE = int(os.environ.get('BULK_INSERT_CHUNK_SIZE', 1000))
+
+# database pool
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+# Время жизни соединения в секундах, -1 — без ограничения.
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+# Количество соединений, которые открываются при запуске приложения.
+DB_POOL_WARMUP = int(os.environ.get('DB_POOL_WARMUP', DB_POOL_SIZE))
+
+# read replicas
+# Адреса реплик для чтения через запятую (postgresql+asyncpg://...), пусто — без реплик.
+DB_REPLICA_URLS = [url for url in os.environ.get('DB_REPLICA_URLS', '').split(',') if url]
+# Сколько секунд после записи клиент читает с основной БД (read-your-writes).
+READ_YOUR_WRITES_WINDOW = float(os.environ.get('READ_YOUR_WRITES_WINDOW', 5))
+REPLICA_HEALTH_CHECK_INTERVAL = float(os.environ.get('REPLICA_HEALTH_CHECK_INTERVAL', 10))
+REPLICA_HEALTH_CHECK_TIMEOUT = float(os.environ.get('REPLICA_HEALTH_CHECK_TIMEOUT', 2))
+
+# menu counts
+# Источник количества подменю и блюд в меню: stored (счётчики в таблице menus),
+# subquery (подсчёт сгруппированными подзапросами) или view (материализованное
+# представление menu_stats, обновляемое при записи).
+MENU_COUNTS_STRATEGY = os.environ.get('MENU_COUNTS_STRATEGY', 'stored')
+
+# counters reconciliation
+# Пауза между сверками счётчиков в секундах, 0 — сверка в приложении выключена.
+RECONCILE_INTERVAL = float(os.environ.get('RECONCILE_INTERVAL', 0))
+# Количество подменю или меню, которые сверяются в одной транзакции.
+RECONCILE_BATCH_SIZE = int(os.environ.get('RECONCILE_BATCH_SIZE', 1000))
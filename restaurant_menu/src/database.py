@@ -1,8 +1,19 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from fastapi import Depends, Request, Response
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
                                     create_async_engine)
 from sqlalchemy.orm import declarative_base, sessionmaker
-from src.configs import (DB_HOST, DB_NAME, DB_PORT, POSTGRES_PASSWORD,
-                         POSTGRES_USER)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from src.configs import (DB_HOST, DB_MAX_OVERFLOW, DB_NAME, DB_POOL_PRE_PING,
+                         DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT,
+                         DB_PORT, DB_REPLICA_URLS, POSTGRES_PASSWORD,
+                         POSTGRES_USER, READ_YOUR_WRITES_WINDOW)
+from src.instrumentation import instrument_engine
+from src.replicas import ReplicaSet, replica_read
 
 SQLALCHEMY_DATABASE_URL = (
     f'postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
@@ -10,7 +21,54 @@ SQLALCHEMY_DATABASE_URL = (
 
 Base = declarative_base()
 
-async_engine: AsyncEngine = create_async_engine(SQLALCHEMY_DATABASE_URL)
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, который считает выдачи соединений и время их ожидания."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        wait = time.perf_counter() - start
+        self.checkouts += 1
+        self.checkout_wait_total += wait
+        self.checkout_wait_max = max(self.checkout_wait_max, wait)
+        return connection
+
+
+def create_engine(url: str, **kwargs: Any) -> AsyncEngine:
+    """Создаём движок с пулом соединений, настроенным через src/configs.py.
+
+    Args:
+        - url (str): Адрес БД.
+        - kwargs (Any): Параметры create_async_engine, которые заменяют настройки.
+
+    Returns:
+        - AsyncEngine: Движок БД.
+    """
+
+    options: Dict[str, Any] = {
+        'poolclass': TimedQueuePool,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+    }
+    return create_async_engine(url, **{**options, **kwargs})
+
+
+async_engine: AsyncEngine = create_engine(SQLALCHEMY_DATABASE_URL)
 
 async_session_local = sessionmaker(
     bind=async_engine,
@@ -18,7 +76,177 @@ async_session_local = sessionmaker(
     expire_on_commit=False
 )
 
+# Сессии только для чтения: транзакции открываются как READ ONLY.
+async_session_readonly = sessionmaker(
+    bind=async_engine.execution_options(postgresql_readonly=True),
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+replicas = ReplicaSet([create_engine(url) for url in DB_REPLICA_URLS])
+
+# Обработчики событий только для включённых функций (src.instrumentation).
+for engine in (async_engine, *replicas.engines):
+    instrument_engine(engine)
+
+# Cookie со временем (unix), до которого клиент читает с основной БД после записи.
+READ_PRIMARY_COOKIE = 'read_primary_until'
+
+
+class LazySession:
+    """Сессия, которая создаётся при первом обращении к ней.
+
+    Обработчик получает объект сразу, но сессия (и соединение из пула) появляется,
+    только когда CRUD-функция действительно обращается к БД. Ответы из кэша
+    и запросы, отклонённые до обращения к БД, не занимают соединения пула.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]) -> None:
+        self._session_factory = session_factory
+        self._session: Optional[AsyncSession] = None
+
+    @property
+    def started(self) -> bool:
+        """Создана ли сессия."""
+
+        return self._session is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._session_factory()
+        return getattr(self._session, name)
+
+    async def close(self) -> None:
+        """Закрываем сессию, если она была создана."""
+
+        if self._session is not None:
+            await self._session.close()
+
+
+def get_session_factory() -> sessionmaker:
+    """Фабрика сессий для чтения и записи (в тестах подменяется).
+
+    Зависимости с yield (get_db) закрываются до отправки ответа, поэтому потоковые
+    ответы открывают собственную сессию уже во время отправки.
+    """
+
+    return async_session_local
 
-async def get_db():
-    async with async_session_local() as session:
+
+def get_primary_read_session_factory() -> sessionmaker:
+    """Фабрика сессий только для чтения с основной БД (в тестах подменяется)."""
+
+    return async_session_readonly
+
+
+def get_read_session_factory(
+    request: Request,
+    primary: sessionmaker = Depends(get_primary_read_session_factory),
+) -> sessionmaker:
+    """Фабрика сессий только для чтения: реплика или основная БД.
+
+    Клиент читает с основной БД, если нет доступных реплик или если он недавно
+    что-то изменил (cookie READ_PRIMARY_COOKIE), чтобы увидеть свои изменения
+    до того, как они дойдут до реплик.
+    """
+
+    try:
+        sticky = float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        sticky = False
+
+    if sticky:
+        return primary
+    return replicas.session_factory() or primary
+
+
+async def get_db(
+    response: Response,
+    session_factory: sessionmaker = Depends(get_session_factory),
+) -> AsyncIterator[LazySession]:
+    """Зависимость FastAPI: ленивая сессия для чтения и записи.
+
+    Клиент, который пишет в БД, следующие READ_YOUR_WRITES_WINDOW секунд
+    читает с основной БД.
+    """
+
+    if replicas.engines:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            str(time.time() + READ_YOUR_WRITES_WINDOW),
+            max_age=int(READ_YOUR_WRITES_WINDOW) + 1,
+            httponly=True,
+        )
+
+    session = LazySession(session_factory)
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def get_read_db(
+    session_factory: sessionmaker = Depends(get_read_session_factory),
+    primary: sessionmaker = Depends(get_primary_read_session_factory),
+) -> AsyncIterator[LazySession]:
+    """Зависимость FastAPI: ленивая сессия только для чтения, для GET-ручек.
+
+    Пока идёт запрос, replica_read показывает, читает ли он с реплики.
+    """
+
+    token = replica_read.set(session_factory is not primary)
+    session = LazySession(session_factory)
+    try:
         yield session
+    finally:
+        await session.close()
+        replica_read.reset(token)
+
+
+def get_engine() -> AsyncEngine:
+    """Движок БД приложения (в тестах подменяется)."""
+
+    return async_engine
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int) -> None:
+    """Открываем соединения заранее, чтобы первые запросы не ждали подключения к БД.
+
+    Args:
+        - engine (AsyncEngine): Движок БД.
+        - connections (int): Количество соединений (не больше размера пула).
+
+    Returns:
+        - None
+    """
+
+    connections = min(connections, engine.pool.size())
+    opened = await asyncio.gather(*(engine.connect() for _ in range(connections)))
+    await asyncio.gather(*(connection.close() for connection in opened))
+
+
+def pool_status(engine: AsyncEngine) -> Dict[str, Any]:
+    """Состояние пула соединений.
+
+    Args:
+        - engine (AsyncEngine): Движок БД.
+
+    Returns:
+        - Dict[str, Any]: Размер пула, занятые, свободные и сверхлимитные соединения,
+          количество выдач соединений и время их ожидания.
+    """
+
+    pool = engine.pool
+    checkouts = getattr(pool, 'checkouts', 0)
+    wait_total = getattr(pool, 'checkout_wait_total', 0.0)
+    return {
+        'pool_size': pool.size(),
+        'max_overflow': pool._max_overflow,
+        'checked_out': pool.checkedout(),
+        'idle': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'checkouts': checkouts,
+        'checkout_timeouts': getattr(pool, 'checkout_timeouts', 0),
+        'checkout_wait_avg_ms': wait_total / checkouts * 1000 if checkouts else 0.0,
+        'checkout_wait_max_ms': getattr(pool, 'checkout_wait_max', 0.0) * 1000,
+    }
@@ -1,15 +1,85 @@
 """CRUD-functions."""
 
-from typing import Optional
+from typing import Any, Dict, List, Optional, Union
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import delete, select
+from sqlalchemy import ColumnElement, delete, exists, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from src import models
-from src.menus.crud import get_menu_by_id
-from src.submenus.crud import get_submenu_by_id
+from src import bulk, cache, models, schemas
+from src.dishes.queries import get_dish
+from src.menus.crud import get_menu_by_id, refresh_menu_stats
+from src.submenus.queries import get_submenu
+
+
+def _dish_counters_keys(menu_id: UUID, submenu_id: UUID) -> List[str]:
+    """Ключи кэша, которые зависят от количества блюд в подменю."""
+
+    return [
+        cache.menus_key(),
+        cache.menu_key(menu_id),
+        cache.submenus_key(menu_id),
+        cache.submenu_key(menu_id, submenu_id),
+        cache.dishes_key(menu_id, submenu_id),
+        *cache.tree_keys(menu_id),
+    ]
+
+
+def _submenu_in_menu(menu_id: UUID, submenu_id: UUID) -> ColumnElement[bool]:
+    """Условие EXISTS: подменю существует и принадлежит меню."""
+
+    return exists().where(
+        models.SubMenu.id == submenu_id, models.SubMenu.menu_id == menu_id
+    )
+
+
+async def change_dish_counters(
+        db: AsyncSession,
+        menu_id: UUID,
+        submenu_id: UUID,
+        dishes: int,
+) -> bool:
+    """Атомарно меняем счётчики блюд в подменю и меню одним запросом, без коммита.
+
+    Подменю обновляется в CTE (UPDATE ... RETURNING), меню — по его результату,
+    поэтому запрос заодно проверяет, что подменю принадлежит меню.
+    Версии подменю и меню тоже меняются: от счётчиков зависят их ответы (ETag).
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
+        - submenu_id (UUID): id подменю.
+        - dishes (int): На сколько изменить количество блюд.
+
+    Returns:
+        - bool: True, если подменю найдено в меню и счётчики изменены.
+    """
+
+    updated_submenu = (
+        update(models.SubMenu)
+        .where(models.SubMenu.id == submenu_id, models.SubMenu.menu_id == menu_id)
+        .values(
+            dishes_count=models.SubMenu.dishes_count + dishes,
+            version=models.entity_version.next_value(),
+        )
+        .returning(models.SubMenu.menu_id)
+        .cte('updated_submenu')
+    )
+    updated = await db.execute(
+        update(models.Menu)
+        .where(
+            models.Menu.id == menu_id,
+            models.Menu.id.in_(select(updated_submenu.c.menu_id)),
+        )
+        .values(
+            dishes_count=models.Menu.dishes_count + dishes,
+            version=models.entity_version.next_value(),
+        )
+        .returning(models.Menu.id)
+        .execution_options(synchronize_session=False)
+    )
+    return updated.scalar_one_or_none() is not None
 
 
 async def create_dish(
@@ -22,6 +92,10 @@ async def create_dish(
 ) -> models.Dish:
     """Создаём новое блюдо, для определённого, по полю «id», подменю.
 
+    Блюдо и счётчики блюд в меню и подменю сохраняются в одной транзакции.
+    Меню и подменю проверяются запросом, меняющим счётчики. Если он ничего
+    не изменил, причину ошибки 404 выясняем отдельными запросами.
+
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
         - menu_id (UUID): id меню.
@@ -34,8 +108,11 @@ async def create_dish(
         - Dish: Объект блюда, если нет ошибок при создании.
     """
 
-    menu = await get_menu_by_id(db=db, menu_id=menu_id)
-    submenu = await get_submenu_by_id(db=db, menu_id=menu_id, submenu_id=submenu_id)
+    if not await change_dish_counters(
+        db=db, menu_id=menu_id, submenu_id=submenu_id, dishes=1
+    ):
+        await get_menu_by_id(db=db, menu_id=menu_id)
+        await get_submenu(db=db, menu_id=menu_id, submenu_id=submenu_id)
 
     new_dish = models.Dish(
         submenu_id=submenu_id,
@@ -46,69 +123,98 @@ async def create_dish(
 
     try:
         db.add(new_dish)
-        await db.commit()
-        await db.refresh(new_dish)
+        await db.flush()
     except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Такое блюдо уже зарегестрировано.'
         )
 
-    submenu.dishes_count += 1
-    menu.dishes_count += 1
+    await refresh_menu_stats(db)
     await db.commit()
 
+    await cache.backend.delete(*_dish_counters_keys(menu_id, submenu_id))
+
     return new_dish
 
 
-async def get_dish_by_id(
+async def create_dishes(
         db: AsyncSession,
+        menu_id: UUID,
         submenu_id: UUID,
-        dish_id: UUID,
-) -> Optional[models.Dish]:
-    """Получаем один объект из модели «Dish» по полю «id».
+        dishes: List[schemas.BaseDishPyd],
+) -> Dict[str, List[Any]]:
+    """Создаём несколько блюд для определённого подменю.
 
-    - Проверяем блюдо на существование.
-    - Проверяем принадлежит ли блюдо, к переданному id подменю.
+    Блюда вставляются многострочным INSERT, счётчики блюд в меню и подменю
+    меняются один раз на весь запрос (этим же запросом проверяются меню и подменю).
+    Блюда с уже существующим названием не создаются и возвращаются как конфликты,
+    остальные сохраняются в одной транзакции.
 
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
         - submenu_id (UUID): id подменю.
-        - dish_id (UUID): id блюда.
+        - dishes (List[BaseDishPyd]): Блюда для создания.
 
     Returns:
-        - Dish | None: Объект блюда, если найден.
+        - Dict[str, List]: Созданные блюда (created) и конфликты (conflicts).
     """
 
-    dish = await db.execute(select(models.Dish).where(models.Dish.id == dish_id))
-    dish = dish.scalars().one_or_none()
-
-    if dish is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='dish not found',
-        )
-    if dish.submenu_id != submenu_id:
+    try:
+        created = await bulk.insert_ignoring_conflicts(db, models.Dish, [
+            {**dish.model_dump(), 'submenu_id': submenu_id} for dish in dishes
+        ])
+    except IntegrityError:
+        # Внешний ключ: подменю не существует.
+        await db.rollback()
+        await get_menu_by_id(db=db, menu_id=menu_id)
+        await get_submenu(db=db, menu_id=menu_id, submenu_id=submenu_id)
+        # Подменю могло появиться после INSERT: блюда всё равно не созданы.
         raise HTTPException(
-            status_code=404,
-            detail=f'Блюдо с id {dish_id} не принадлежит к подменю с id {submenu_id}.'
+            status_code=status.HTTP_409_CONFLICT,
+            detail='Блюда не созданы, повторите запрос.',
         )
 
-    return dish
+    if not await change_dish_counters(
+        db=db, menu_id=menu_id, submenu_id=submenu_id, dishes=len(created)
+    ):
+        # Блюда, вставленные в подменю другого меню, откатятся при закрытии сессии.
+        await get_menu_by_id(db=db, menu_id=menu_id)
+        await get_submenu(db=db, menu_id=menu_id, submenu_id=submenu_id)
+
+    created, conflicts = bulk.split_created(
+        dishes, created, detail='Такое блюдо уже зарегестрировано.'
+    )
+    await refresh_menu_stats(db)
+    await db.commit()
+
+    await cache.backend.delete(*_dish_counters_keys(menu_id, submenu_id))
+
+    return {'created': created, 'conflicts': conflicts}
 
 
 async def update_dish_by_id(
         db: AsyncSession,
-        dish: models.Dish,
+        menu_id: UUID,
+        submenu_id: UUID,
+        dish_id: UUID,
         title: Optional[str],
         description: Optional[str],
         price: Optional[float],
 ) -> models.Dish:
     """Обновляем объект модели «Dish» (название, описание или цену).
 
+    Проверка меню, подменю и блюда и обновление выполняются одним запросом
+    (UPDATE ... WHERE EXISTS ... RETURNING). Если блюдо не обновлено,
+    причину ошибки 404 выясняем отдельным запросом,
+    а если он её не нашёл — отвечаем «dish not found».
+
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
-        - dish (models.Dish): Объект блюда.
+        - menu_id (UUID): id меню.
+        - submenu_id (UUID): id подменю.
+        - dish_id (UUID): id блюда.
         - title (str | None): Новое название.
         - description (str | None): Новое описание.
         - price (float | None): Новая цена.
@@ -117,14 +223,17 @@ async def update_dish_by_id(
         - Dish : Объект блюда.
     """
 
-    if title or description or price:
-        if title:
-            dish.title = title
-        if description:
-            dish.description = description
-        if price:
-            dish.price = price
-    else:
+    values: Dict[str, Union[str, float]] = {}
+    if title:
+        values['title'] = title
+    if description:
+        values['description'] = description
+    if price:
+        values['price'] = price
+
+    if not values:
+        # Проверяем блюдо, чтобы сохранить порядок ошибок: сначала 404, потом 400.
+        await get_dish(db=db, menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=('Ни одно из значений (title, description, price) '
@@ -132,40 +241,81 @@ async def update_dish_by_id(
         )
 
     try:
+        updated = await db.execute(
+            update(models.Dish)
+            .where(
+                models.Dish.id == dish_id,
+                models.Dish.submenu_id == submenu_id,
+                _submenu_in_menu(menu_id, submenu_id),
+            )
+            .values(**values, version=models.entity_version.next_value())
+            .returning(models.Dish)
+        )
+        dish: Optional[models.Dish] = updated.scalar_one_or_none()
         await db.commit()
-        await db.refresh(dish)
     except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Такое блюдо уже зарегестрировано.'
         )
 
+    if dish is None:
+        await get_dish(db=db, menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id)
+        # Блюдо могло появиться после UPDATE: оно всё равно не обновлено.
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='dish not found',
+        )
+
+    await cache.backend.delete(
+        cache.dishes_key(menu_id, submenu_id),
+        cache.dish_key(menu_id, submenu_id, dish_id),
+        *cache.tree_keys(menu_id),
+    )
+
     return dish
 
 
 async def delete_dish_by_id(
         db: AsyncSession,
-        menu: models.Menu,
-        submenu: models.SubMenu,
+        menu_id: UUID,
+        submenu_id: UUID,
         dish_id: UUID,
 ) -> None:
     """Удаляем один объект из модели «Dish» по полю «id».
 
-    Меняем количество блюд в меню и подменю.
+    Меняем количество блюд в меню и подменю, в той же транзакции.
+    Если блюдо не найдено в подменю, счётчики не меняются, а меню и подменю
+    проверяются отдельными запросами (ошибка 404, если их нет).
 
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
-        - menu: Объект меню.
-        - submenu: Объект подменю.
+        - menu_id (UUID): id меню.
+        - submenu_id (UUID): id подменю.
         - dish_id (UUID): id блюда.
 
     Returns:
         - None
     """
 
-    await db.execute(delete(models.Dish).where(models.Dish.id == dish_id))
-    await db.commit()
+    deleted = await db.execute(
+        delete(models.Dish)
+        .where(
+            models.Dish.id == dish_id,
+            models.Dish.submenu_id == submenu_id,
+            _submenu_in_menu(menu_id, submenu_id),
+        )
+        .returning(models.Dish.id)
+    )
 
-    menu.dishes_count -= 1
-    submenu.dishes_count -= 1
+    if deleted.scalar_one_or_none() is not None:
+        await change_dish_counters(db=db, menu_id=menu_id, submenu_id=submenu_id, dishes=-1)
+        await refresh_menu_stats(db)
+    else:
+        await get_menu_by_id(db=db, menu_id=menu_id)
+        await get_submenu(db=db, menu_id=menu_id, submenu_id=submenu_id)
     await db.commit()
+
+    await cache.backend.delete(
+        *_dish_counters_keys(menu_id, submenu_id), cache.dish_key(menu_id, submenu_id, dish_id)
+    )
@@ -0,0 +1,185 @@
+"""Запросы чтения блюд для GET-ручек.
+
+Запросы выбирают только колонки ответа (SQLAlchemy Core) и возвращают строки (Row):
+ORM объекты, identity map и отслеживание изменений для чтения не нужны.
+"""
+
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import etags, fieldsets, models
+from src.pagination import PageParams, paginate
+
+# Колонки ответа DetailedDishInfoPyd и версия строки для ETag.
+DISH_COLUMNS = (
+    models.Dish.id,
+    models.Dish.title,
+    models.Dish.description,
+    models.Dish.price,
+    models.Dish.version,
+)
+
+
+def _in_submenu(query: Select, menu_id: UUID, submenu_id: UUID) -> Select:
+    """Ограничиваем запрос блюдами подменю, если подменю принадлежит меню."""
+
+    return (
+        query
+        .join(models.SubMenu, models.SubMenu.id == models.Dish.submenu_id)
+        .where(models.SubMenu.id == submenu_id, models.SubMenu.menu_id == menu_id)
+    )
+
+
+def select_all_dishes(
+        menu_id: UUID,
+        submenu_id: UUID,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> Select:
+    """Запрос всех блюд определённого подменю (колонки полей fields), без сортировки."""
+
+    return _in_submenu(
+        select(*fieldsets.select_columns(DISH_COLUMNS, fields)), menu_id, submenu_id
+    )
+
+
+async def get_all_dishes(
+        db: AsyncSession,
+        menu_id: UUID,
+        submenu_id: UUID,
+        page: Optional[PageParams] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> List[Row]:
+    """Получаем все блюда определённого подменю, или одну страницу.
+
+    Если подменю не существует или принадлежит другому меню, возвращаем пустой список.
+    Блюда отсортированы по «id».
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
+        - submenu_id (UUID): id подменю.
+        - page (PageParams | None): Параметры страницы (до limit + 1 объектов).
+        - fields (Tuple[str] | None): Поля ответа, None — все поля.
+
+    Returns:
+        - List[Row]: Строки блюд.
+    """
+
+    dishes = await db.execute(
+        paginate(select_all_dishes(menu_id, submenu_id, fields), models.Dish.id, page)
+    )
+    return dishes.all()
+
+
+async def get_dishes_etag(db: AsyncSession, menu_id: UUID, submenu_id: UUID) -> str:
+    """Получаем ETag списка блюд подменю агрегатным запросом по версиям блюд.
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
+        - submenu_id (UUID): id подменю.
+
+    Returns:
+        - str: ETag списка (для несуществующего или чужого подменю — ETag пустого списка).
+    """
+
+    versions: Row = (await db.execute(_in_submenu(
+        select(*etags.version_aggregates(models.Dish.version)).select_from(models.Dish),
+        menu_id, submenu_id,
+    ))).one()
+    return etags.make_etag(*versions)
+
+
+async def get_dish_etag(
+        db: AsyncSession,
+        menu_id: UUID,
+        submenu_id: UUID,
+        dish_id: UUID,
+) -> Optional[str]:
+    """Получаем ETag блюда по его версии.
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
+        - submenu_id (UUID): id подменю.
+        - dish_id (UUID): id блюда.
+
+    Returns:
+        - str | None: ETag блюда, None — блюда нет в подменю этого меню.
+    """
+
+    version: Optional[int] = await db.scalar(
+        select(models.Dish.version)
+        .join(models.SubMenu, models.SubMenu.id == models.Dish.submenu_id)
+        .where(
+            models.Dish.id == dish_id,
+            models.Dish.submenu_id == submenu_id,
+            models.SubMenu.menu_id == menu_id,
+        )
+    )
+    return etags.version_etag(version)
+
+
+async def get_dish(
+        db: AsyncSession,
+        menu_id: UUID,
+        submenu_id: UUID,
+        dish_id: UUID,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> Row:
+    """Получаем блюдо по «id».
+
+    Подменю и блюдо выбираются одним запросом (подменю LEFT JOIN блюдо).
+
+    - Проверяем подменю на существование.
+    - Проверяем принадлежит ли подменю, к переданному id родителя(меню).
+    - Проверяем блюдо на существование.
+    - Проверяем принадлежит ли блюдо, к переданному id подменю.
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
+        - submenu_id (UUID): id подменю.
+        - dish_id (UUID): id блюда.
+        - fields (Tuple[str] | None): Поля ответа, None — все поля.
+
+    Returns:
+        - Row: Строка блюда, если найдено.
+    """
+
+    dish: Optional[Row] = (await db.execute(
+        select(
+            models.SubMenu.menu_id,
+            models.Dish.submenu_id,
+            *fieldsets.select_columns(DISH_COLUMNS, fields),
+        )
+        .select_from(models.SubMenu)
+        .outerjoin(models.Dish, models.Dish.id == dish_id)
+        .where(models.SubMenu.id == submenu_id)
+    )).one_or_none()
+
+    if dish is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='submenu not found',
+        )
+    if dish.menu_id != menu_id:
+        raise HTTPException(
+            status_code=404,
+            detail=f'Подменю с id {submenu_id} не принадлежит к меню с id {menu_id}.'
+        )
+    if dish.id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='dish not found',
+        )
+    if dish.submenu_id != submenu_id:
+        raise HTTPException(
+            status_code=404,
+            detail=f'Блюдо с id {dish_id} не принадлежит к подменю с id {submenu_id}.'
+        )
+
+    return dish
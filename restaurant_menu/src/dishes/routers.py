@@ -1,12 +1,13 @@
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Path
-from sqlalchemy import select
+from fastapi import APIRouter, Body, Depends, Path, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from src import models, schemas
-from src.database import get_db
-from src.dishes import crud
+from sqlalchemy.orm import sessionmaker
+from src import cache, etags, fieldsets, models, pagination, schemas, streaming
+from src.configs import BULK_MAX_ITEMS
+from src.database import get_db, get_read_db, get_read_session_factory
+from src.dishes import crud, queries
 
 dish_router = APIRouter()
 
@@ -27,24 +28,72 @@ async def new_dish(
     return await crud.create_dish(db=db, menu_id=menu_id, submenu_id=submenu_id, **dish_data)
 
 
+@dish_router.post('/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/bulk',
+                  response_model=schemas.BulkDishesPyd,
+                  status_code=201, summary='Создать несколько блюд', tags=['Блюдо'])
+async def new_dishes(
+    dishes: List[schemas.BaseDishPyd] = Body(..., min_length=1, max_length=BULK_MAX_ITEMS),
+    menu_id: UUID = Path(..., description='id меню'),
+    submenu_id: UUID = Path(..., description='id подменю'),
+    db: AsyncSession = Depends(get_db),
+) -> Dict[str, List]:
+    """Создаём несколько блюд, для определённого подменю. Повторы названий — конфликты."""
+
+    return await crud.create_dishes(
+        db=db, menu_id=menu_id, submenu_id=submenu_id, dishes=dishes
+    )
+
+
 @dish_router.get('/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes',
                  response_model=List[schemas.DetailedDishInfoPyd],
                  summary='Список блюд', tags=['Блюдо'])
 async def all_dishes(
     menu_id: UUID = Path(..., description='id меню'),
     submenu_id: UUID = Path(..., description='id подменю'),
-    db: AsyncSession = Depends(get_db),
-) -> List[Optional[models.Dish]]:
-    """Выводим список со всеми блюдами, для определённого подменю."""
+    page: Optional[pagination.PageParams] = Depends(pagination.get_page_params),
+    stream: Optional[str] = Depends(streaming.get_stream_format),
+    fields: Optional[Tuple[str, ...]] = Depends(
+        fieldsets.get_fields(schemas.DetailedDishInfoPyd)
+    ),
+    if_none_match: Optional[str] = Depends(etags.get_if_none_match),
+    session_factory: sessionmaker = Depends(get_read_session_factory),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """Выводим список со всеми блюдами подменю, одну страницу списка или поток."""
+
+    schema = List[schemas.DetailedDishInfoPyd]
+
+    if stream is not None:
+        return streaming.stream_response(
+            session_factory,
+            queries.select_all_dishes(menu_id, submenu_id, fields)
+            .order_by(models.Dish.id),
+            schemas.DetailedDishInfoPyd,
+            stream,
+            fields,
+        )
 
     # Не могу использовать get_submenu_by_id, так-как тесты в postman ожидают
     # получить пустой список, а мой метод возвращает ошибку 404 из-за отсутсвия подменю.
-    submenu = await db.execute(select(models.SubMenu).where(models.SubMenu.id == submenu_id))
-    submenu = submenu.scalars().one_or_none()
-
-    if not submenu:
-        return []
-    return submenu.dishes
+    # Подменю чужого меню тоже даёт пустой список, поэтому такой ключ кэша не устаревает.
+    if page is None:
+        return await cache.cached_response(
+            key=cache.dishes_key(menu_id, submenu_id),
+            loader=lambda: queries.get_all_dishes(
+                db=db, menu_id=menu_id, submenu_id=submenu_id, fields=fields
+            ),
+            schema=schema,
+            etag_loader=lambda: queries.get_dishes_etag(
+                db=db, menu_id=menu_id, submenu_id=submenu_id
+            ),
+            if_none_match=if_none_match,
+            fields=fields,
+        )
+
+    dishes = await queries.get_all_dishes(
+        db=db, menu_id=menu_id, submenu_id=submenu_id, page=page, fields=fields
+    )
+    return pagination.page_response(dishes, page, schema, fields)
 
 
 @dish_router.get('/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}',
@@ -54,14 +103,26 @@ async def get_dish(
     menu_id: UUID = Path(..., description='id меню'),
     submenu_id: UUID = Path(..., description='id подменю'),
     dish_id: UUID = Path(..., description='id блюда'),
-    db: AsyncSession = Depends(get_db),
-) -> Optional[models.Dish]:
+    fields: Optional[Tuple[str, ...]] = Depends(
+        fieldsets.get_fields(schemas.DetailedDishInfoPyd)
+    ),
+    if_none_match: Optional[str] = Depends(etags.get_if_none_match),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
     """Выводим определённое блюдо."""
 
-    # Получаем объект подменю, и проверяем его.
-    await crud.get_submenu_by_id(db=db, menu_id=menu_id, submenu_id=submenu_id)
-
-    return await crud.get_dish_by_id(db=db, submenu_id=submenu_id, dish_id=dish_id)
+    return await cache.cached_response(
+        key=cache.dish_key(menu_id, submenu_id, dish_id),
+        loader=lambda: queries.get_dish(
+            db=db, menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id, fields=fields
+        ),
+        schema=schemas.DetailedDishInfoPyd,
+        etag_loader=lambda: queries.get_dish_etag(
+            db=db, menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id
+        ),
+        if_none_match=if_none_match,
+        fields=fields,
+    )
 
 
 @dish_router.patch('/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}',
@@ -76,15 +137,11 @@ async def update_dish(
 ) -> models.Dish:
     """Обновляем информацию о блюде."""
 
-    # Получаем объект подменю, и проверяем его.
-    await crud.get_submenu_by_id(db=db, menu_id=menu_id, submenu_id=submenu_id)
-
-    dish: Optional[models.Dish] = await crud.get_dish_by_id(
-        db=db, submenu_id=submenu_id, dish_id=dish_id
+    return await crud.update_dish_by_id(
+        db=db, menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id,
+        **update_data.model_dump()
     )
 
-    return await crud.update_dish_by_id(db=db, dish=dish, **update_data.model_dump())
-
 
 @dish_router.delete('/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}',
                     response_model=schemas.DeleteObjPyd,
@@ -97,14 +154,8 @@ async def delete_dish(
 ) -> Dict[str, Union[bool, str]]:
     """Удалаяем блюдо."""
 
-    menu: Optional[models.Menu] = await crud.get_menu_by_id(
-        db=db, menu_id=menu_id
-    )
-
-    submenu: Optional[models.SubMenu] = await crud.get_submenu_by_id(
-        db=db, menu_id=menu_id, submenu_id=submenu_id
+    await crud.delete_dish_by_id(
+        db=db, menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id
     )
 
-    await crud.delete_dish_by_id(db=db, menu=menu, submenu=submenu, dish_id=dish_id)
-
     return {"status": True, "message": "The dish has been deleted"}
@@ -0,0 +1,140 @@
+"""Условные GET-запросы: ETag и If-None-Match.
+
+ETag ответа строится по версиям всех строк, которые в нём есть (колонка «version»
+меню, подменю и блюд, см. models.entity_version): количество, максимум и сумма
+версий. Любая запись выдаёт строке новую, большую всех прежних версию, а удаление
+уменьшает количество, поэтому ETag меняется при любом изменении ответа.
+
+Тот же ETag считается дешёвым агрегатным запросом по версиям (функции get_*_etag
+в queries.py), поэтому на If-None-Match с актуальным ETag отвечаем 304 без основного
+запроса и сериализации. Если ETag есть в кэше, 304 отдаётся вовсе без запросов в БД.
+
+Сжатый ответ побайтно отличается от несжатого, поэтому его сильный ETag получает
+суффикс кодировки: «"<tag>-gzip"» (coded_etag, src.compression). If-None-Match
+с таким ETag совпадает с ETag данных, а ответ 304 возвращает ETag из запроса.
+"""
+
+import re
+from hashlib import blake2b
+from typing import Any, List, Optional, Tuple
+
+from fastapi import Header, Response, status
+from sqlalchemy import func
+
+# Суффикс кодировки в ETag сжатого ответа (в самих ETag только шестнадцатеричные цифры).
+_CODING_SUFFIX = re.compile(r'-[a-z0-9]+"$')
+
+
+def version_aggregates(version: Any) -> List[Any]:
+    """Агрегаты по колонке версии: количество, максимум и сумма."""
+
+    return [
+        func.count(version).label('count'),
+        func.max(version).label('max_version'),
+        func.sum(version).label('sum_version'),
+    ]
+
+
+def make_etag(count: int, max_version: Optional[int], sum_version: Optional[int]) -> str:
+    """Сильный ETag по количеству, максимуму и сумме версий строк ответа."""
+
+    digest = blake2b(
+        f'{int(count)}:{int(max_version or 0)}:{int(sum_version or 0)}'.encode(),
+        digest_size=8,
+    )
+    return f'"{digest.hexdigest()}"'
+
+
+def version_etag(version: Optional[int]) -> Optional[str]:
+    """ETag одного объекта по его версии, None — объекта нет."""
+
+    if version is None:
+        return None
+    return make_etag(1, version, version)
+
+
+def _versions(data: Any) -> List[int]:
+    """Версии всех строк ответа: строки, словари дерева меню и списки."""
+
+    if isinstance(data, list):
+        return [version for item in data for version in _versions(item)]
+    if isinstance(data, dict):
+        return [data['version'], *(
+            version for value in data.values() if isinstance(value, list)
+            for version in _versions(value)
+        )]
+    return [data.version]
+
+
+def etag_of(data: Any) -> str:
+    """ETag данных ответа (строка, список строк или дерево меню).
+
+    Args:
+        - data (Any): Данные ответа с колонкой «version» у каждой строки.
+
+    Returns:
+        - str: ETag, равный ETag агрегатного запроса по тем же строкам.
+    """
+
+    versions: List[int] = _versions(data)
+    return make_etag(len(versions), max(versions, default=None), sum(versions))
+
+
+def fields_etag(etag: str, fields: Tuple[str, ...]) -> str:
+    """ETag ответа с выборочными полями: у каждого набора полей свой ETag."""
+
+    digest = blake2b(f'{etag}:{",".join(fields)}'.encode(), digest_size=8)
+    return f'"{digest.hexdigest()}"'
+
+
+def coded_etag(etag: str, encoding: str) -> str:
+    """ETag сжатого ответа: «"<tag>-<кодировка>"»."""
+
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """ETag из заголовка «If-None-Match», который совпадает с ETag данных.
+
+    Для If-None-Match используется слабое сравнение: префикс «W/» не учитывается,
+    суффикс кодировки сжатого ответа (coded_etag) — тоже.
+
+    Args:
+        - if_none_match (str | None): Заголовок «If-None-Match».
+        - etag (str): ETag данных.
+
+    Returns:
+        - str | None: Совпавший ETag (без «W/»), для «*» — etag; None — совпадений нет.
+    """
+
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == '*':
+        return etag
+    for tag in if_none_match.split(','):
+        tag = tag.strip().removeprefix('W/')
+        if tag == etag or _CODING_SUFFIX.sub('"', tag) == etag:
+            return tag
+    return None
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Совпадает ли ETag с одним из ETag заголовка «If-None-Match»."""
+
+    return matching_etag(if_none_match, etag) is not None
+
+
+def not_modified(etag: str) -> Response:
+    """Ответ 304 Not Modified."""
+
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+def get_if_none_match(
+    if_none_match: Optional[str] = Header(
+        None, description='ETag из прошлого ответа: если данные не изменились — ответ 304.'
+    ),
+) -> Optional[str]:
+    """Зависимость FastAPI: заголовок «If-None-Match»."""
+
+    return if_none_match
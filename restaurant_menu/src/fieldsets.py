@@ -0,0 +1,72 @@
+"""Выборочные поля ответа (параметр «fields», sparse fieldsets).
+
+«?fields=id,title,price» сужает и список колонок SELECT, и JSON-ответ.
+Поля проверяются по Pydantic модели ответа, неизвестное поле — ошибка 422.
+Для дерева меню поля относятся к меню; без «submenus» подменю и блюда не выбираются.
+
+Колонки «id» и «version» выбираются всегда: по ним строятся курсор страницы,
+дерево меню и ETag, в ответ они попадают, только если запрошены.
+"""
+
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, status
+
+# Колонки, которые выбираются при любом наборе полей.
+REQUIRED_COLUMNS = ('id', 'version')
+
+
+def get_fields(schema: Any) -> Callable[..., Optional[Tuple[str, ...]]]:
+    """Зависимость FastAPI для параметра «fields» ответа по Pydantic модели.
+
+    Args:
+        - schema (BaseModel): Pydantic модель одного объекта ответа.
+
+    Returns:
+        - Callable: Зависимость, которая возвращает поля в порядке модели
+          или None, если нужны все поля.
+    """
+
+    allowed: Tuple[str, ...] = tuple(schema.model_fields)
+
+    def fields_dependency(
+        fields: Optional[str] = Query(
+            None, description=f'Поля ответа через запятую: {",".join(allowed)}.',
+        ),
+    ) -> Optional[Tuple[str, ...]]:
+        if fields is None:
+            return None
+
+        requested = {name.strip() for name in fields.split(',') if name.strip()}
+        unknown = requested.difference(allowed)
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f'unknown fields: {",".join(sorted(unknown)) or "(empty)"}; '
+                       f'allowed: {",".join(allowed)}',
+            )
+
+        if len(requested) == len(allowed):
+            return None
+        return tuple(name for name in allowed if name in requested)
+
+    return fields_dependency
+
+
+def select_columns(columns: Sequence[Any], fields: Optional[Tuple[str, ...]]) -> Tuple:
+    """Колонки запроса для набора полей: запрошенные, «id» и «version».
+
+    Args:
+        - columns (Sequence[Column]): Все колонки ответа.
+        - fields (Tuple[str] | None): Поля ответа, None — все поля.
+
+    Returns:
+        - Tuple[Column]: Колонки для SELECT.
+    """
+
+    if fields is None:
+        return tuple(columns)
+    return tuple(
+        column for column in columns
+        if column.key in fields or column.key in REQUIRED_COLUMNS
+    )
@@ -0,0 +1,202 @@
+"""Статистика SQL-запросов одного HTTP-запроса.
+
+События движка (before/after_cursor_execute) считают запросы, строки и время в БД
+и записывают их в статистику текущего HTTP-запроса (contextvars: статистика видна
+и в задачах, запущенных обработчиком, например в потоковом ответе).
+InstrumentationMiddleware добавляет к ответу заголовок «Server-Timing» и пишет
+в лог строку с маршрутом, статусом, количеством запросов, временем в БД и общим
+временем запроса.
+
+Те же события передают время запросов в метрики (src.metrics) и журнал медленных
+запросов (src.slow_queries). Каждая из трёх функций включается отдельно
+(SQL_INSTRUMENTATION, METRICS_ENABLED, SLOW_QUERY_THRESHOLD_MS), и к движку
+подключаются только обработчики включённых функций. Если все выключены, движки
+работают без обработчиков событий, а middleware сразу передаёт запрос приложению.
+
+    Server-Timing: db;dur=3.42;desc="4 queries", app;dur=1.10, total;dur=4.52
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src import metrics, slow_queries
+from src.configs import (METRICS_ENABLED, SLOW_QUERY_THRESHOLD_MS,
+                         SQL_INSTRUMENTATION)
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """Статистика HTTP-запроса: SQL-запросы, строки и время (в секундах)."""
+
+    __slots__ = ('queries', 'rows', 'db_time', 'start')
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.start = time.perf_counter()
+
+    @property
+    def total_time(self) -> float:
+        """Время с начала запроса."""
+
+        return time.perf_counter() - self.start
+
+
+# Статистика текущего HTTP-запроса, None — вне запроса или инструментирование выключено.
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar('request_stats', default=None)
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _query_duration(context: Any) -> Optional[float]:
+    """Время выполнения запроса в секундах, None — начало запроса не записано."""
+
+    start: Optional[float] = getattr(context, '_query_start', None)
+    if start is None:
+        return None
+    return time.perf_counter() - start
+
+
+def _count_request_query(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    """Учитываем запрос в статистике текущего HTTP-запроса."""
+
+    stats: Optional[RequestStats] = request_stats.get()
+    duration: Optional[float] = _query_duration(context)
+    if stats is None or duration is None:
+        return
+    stats.db_time += duration
+    stats.queries += 1
+    stats.rows += max(cursor.rowcount, 0)
+
+
+def _observe_query_metrics(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    """Передаём время запроса в метрики."""
+
+    duration: Optional[float] = _query_duration(context)
+    if duration is not None:
+        metrics.observe_query(statement, duration)
+
+
+def _observe_slow_query(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    """Передаём запрос в журнал медленных запросов."""
+
+    duration: Optional[float] = _query_duration(context)
+    if duration is not None:
+        slow_queries.observe(conn, statement, parameters, executemany, duration)
+
+
+def _listen(engine: AsyncEngine, name: str, listener: Callable[..., None]) -> None:
+    if not event.contains(engine.sync_engine, name, listener):
+        event.listen(engine.sync_engine, name, listener)
+
+
+def instrument_engine(
+    engine: AsyncEngine,
+    request_statistics: bool = SQL_INSTRUMENTATION,
+    query_metrics: bool = METRICS_ENABLED,
+    slow_query_log: bool = bool(SLOW_QUERY_THRESHOLD_MS),
+) -> None:
+    """Подключаем к движку обработчики событий включённых функций.
+
+    Время запроса записывает обработчик before_cursor_execute, который подключается,
+    только если включена хотя бы одна функция. Повторный вызов не дублирует обработчики.
+
+    Args:
+        - engine (AsyncEngine): Движок БД.
+        - request_statistics (bool): Статистика HTTP-запроса (SQL_INSTRUMENTATION).
+        - query_metrics (bool): Метрики SQL-запросов (METRICS_ENABLED).
+        - slow_query_log (bool): Журнал медленных запросов (SLOW_QUERY_THRESHOLD_MS).
+    """
+
+    listeners: List[Callable[..., None]] = [
+        listener for enabled, listener in (
+            (request_statistics, _count_request_query),
+            (query_metrics, _observe_query_metrics),
+            (slow_query_log, _observe_slow_query),
+        ) if enabled
+    ]
+    if not listeners:
+        return
+    _listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    for listener in listeners:
+        _listen(engine, 'after_cursor_execute', listener)
+
+
+def server_timing(stats: RequestStats) -> str:
+    """Значение заголовка «Server-Timing» (время в миллисекундах)."""
+
+    total = stats.total_time * 1000
+    db = stats.db_time * 1000
+    return (
+        f'db;dur={db:.2f};desc="{stats.queries} queries", '
+        f'app;dur={max(total - db, 0):.2f}, total;dur={total:.2f}'
+    )
+
+
+def route_path(scope: Scope) -> str:
+    """Шаблон маршрута запроса («/api/v1/menus/{menu_id}») или путь, если маршрута нет."""
+
+    route: Any = scope.get('route')
+    return getattr(route, 'path', scope['path'])
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware: статистика SQL-запросов в «Server-Timing» и в логе.
+
+    Заголовок добавляется к началу ответа, поэтому запросы потокового ответа,
+    выполненные после отправки заголовков, учитываются только в логе.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not SQL_INSTRUMENTATION:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                MutableHeaders(raw=message['headers'])['Server-Timing'] = server_timing(stats)
+            await send(message)
+
+        token = request_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            record = {
+                'method': scope['method'],
+                'route': route_path(scope),
+                'status': status_code,
+                'queries': stats.queries,
+                'rows': stats.rows,
+                'db_ms': round(stats.db_time * 1000, 2),
+                'total_ms': round(stats.total_time * 1000, 2),
+            }
+            logger.info(' '.join(f'{name}=%s' for name in record), *record.values(),
+                        extra=record)
@@ -1,10 +1,72 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
+from sqlalchemy.exc import SQLAlchemyError
+from src.compression import CompressionMiddleware
+from src.configs import (DB_POOL_WARMUP, PROFILING_SECRET, RECONCILE_INTERVAL,
+                         REPLICA_HEALTH_CHECK_INTERVAL)
+from src.database import (async_engine, async_session_local, replicas,
+                          warm_up_pool)
 from src.dishes.routers import dish_router
+from src.instrumentation import InstrumentationMiddleware
 from src.menus.routers import menu_router
+from src.metrics import MetricsMiddleware
+from src.profiling import ProfilingMiddleware
+from src.reconciliation import run_reconciliation
+from src.service.routers import service_router
 from src.submenus.routers import submenu_router
 
-app = FastAPI(title='Restaurant Menu API', description='REST API по работе с меню ресторана.')
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Открываем соединения пула, запускаем проверку реплик и сверку счётчиков.
+
+    При остановке фоновые задачи отменяются, соединения закрываются.
+    """
+
+    try:
+        await warm_up_pool(async_engine, DB_POOL_WARMUP)
+    except (OSError, SQLAlchemyError) as error:
+        # БД ещё недоступна: приложение запускается, соединения откроются по запросам.
+        logger.warning('Не удалось прогреть пул соединений: %s', error)
+
+    health_checks = asyncio.create_task(
+        replicas.run_health_checks(REPLICA_HEALTH_CHECK_INTERVAL)
+    ) if replicas.engines else None
+    reconciliation = asyncio.create_task(
+        run_reconciliation(async_session_local, RECONCILE_INTERVAL)
+    ) if RECONCILE_INTERVAL > 0 else None
+
+    yield
+
+    for task in (health_checks, reconciliation):
+        if task is not None:
+            task.cancel()
+    await replicas.dispose()
+    await async_engine.dispose()
+
+
+app = FastAPI(
+    title='Restaurant Menu API',
+    description='REST API по работе с меню ресторана.',
+    lifespan=lifespan,
+)
+
+app.add_middleware(CompressionMiddleware)
+# Внешний middleware: время ответа включает сжатие.
+app.add_middleware(InstrumentationMiddleware)
+app.add_middleware(MetricsMiddleware)
+if PROFILING_SECRET:
+    # Без ключа профилирования middleware не подключается: обычные запросы
+    # не проходят через него.
+    app.add_middleware(ProfilingMiddleware)
 
 app.include_router(dish_router)
 app.include_router(menu_router)
+app.include_router(service_router)
 app.include_router(submenu_router)
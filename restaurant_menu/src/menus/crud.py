@@ -1,13 +1,14 @@
 """CRUD-functions."""
 
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import Row, delete, func, select
+from sqlalchemy import delete, select, text, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from src import models
+from src import cache, models
+from src.configs import MENU_COUNTS_STRATEGY
 
 
 async def create_menu(
@@ -38,21 +39,23 @@ async def create_menu(
             detail='Такое меню уже зарегестрировано.'
         )
 
+    await cache.backend.delete(cache.menus_key(), cache.tree_key())
+
     return new_menu
 
 
-async def get_all_menus(db: AsyncSession) -> List[Optional[models.Menu]]:
-    """Получаем все объекты из модели «Menu»
+async def refresh_menu_stats(db: AsyncSession) -> None:
+    """Обновляем представление «menu_stats» в текущей транзакции, если оно используется.
 
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
 
     Returns:
-        - List[Menu | None]: Список меню, если найдены, иначе None.
+        - None
     """
 
-    menus = await db.execute(select(models.Menu))
-    return menus.scalars().all()
+    if MENU_COUNTS_STRATEGY == 'view':
+        await db.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY menu_stats'))
 
 
 async def get_menu_by_id(
@@ -85,15 +88,17 @@ async def get_menu_by_id(
 
 async def update_menu_by_id(
         db: AsyncSession,
-        menu: models.Menu,
+        menu_id: UUID,
         title: Optional[str],
         description: Optional[str],
 ) -> models.Menu:
     """Обновляем объект модели «Menu» (название или описание).
 
+    Проверка меню и обновление выполняются одним запросом (UPDATE ... RETURNING).
+
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
-        - menu (models.Menu): Объект меню.
+        - menu_id (UUID): id меню.
         - title (str | None): Новое название.
         - description (str | None): Новое описание.
 
@@ -101,26 +106,45 @@ async def update_menu_by_id(
         - Menu : Объект меню.
     """
 
-    if title or description:
-        if title:
-            menu.title = title
-        if description:
-            menu.description = description
-    else:
+    values: Dict[str, str] = {}
+    if title:
+        values['title'] = title
+    if description:
+        values['description'] = description
+
+    if not values:
+        # Проверяем меню, чтобы сохранить порядок ошибок: сначала 404, потом 400.
+        await get_menu_by_id(db=db, menu_id=menu_id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Ни одно из значений (title, description) не предоставлено для обновления.'
         )
 
     try:
+        updated = await db.execute(
+            update(models.Menu)
+            .where(models.Menu.id == menu_id)
+            .values(**values, version=models.entity_version.next_value())
+            .returning(models.Menu)
+        )
+        menu: Optional[models.Menu] = updated.scalar_one_or_none()
         await db.commit()
-        await db.refresh(menu)
     except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Такое меню уже зарегестрировано.'
         )
 
+    if menu is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='menu not found',
+        )
+
+    await cache.backend.delete(
+        cache.menus_key(), cache.menu_key(menu_id), *cache.tree_keys(menu_id)
+    )
+
     return menu
 
 
@@ -130,6 +154,8 @@ async def delete_menu_by_id(
 ) -> None:
     """Удаляем один объект из модели «Menu» по полю «id».
 
+    Проверка меню и удаление выполняются одним запросом (DELETE ... RETURNING).
+
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
         - menu_id (UUID): id меню.
@@ -138,55 +164,51 @@ async def delete_menu_by_id(
         - None
     """
 
-    await db.execute(delete(models.Menu).where(models.Menu.id == menu_id))
+    deleted = await db.execute(
+        delete(models.Menu).where(models.Menu.id == menu_id).returning(models.Menu.id)
+    )
+    if deleted.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='menu not found',
+        )
     await db.commit()
 
+    # Сбрасываем меню вместе со всеми вложенными подменю и блюдами.
+    await cache.backend.delete(cache.menus_key(), cache.tree_key())
+    await cache.backend.delete_prefix(cache.menu_key(menu_id))
+
 
-async def get_menu_by_id_using_orm(
+async def change_menu_counters(
         db: AsyncSession,
-        menu_id: UUID
-) -> Dict[str, Union[UUID, str, int]]:
-    """
-    Получаем объект из модели «Menu» по полю «id», с использованием ORM запроса для
-    подсчёта количества подменю и количества блюд в меню.
+        menu_id: UUID,
+        submenus: int = 0,
+        dishes: int = 0,
+) -> None:
+    """Атомарно меняем счётчики подменю и блюд в меню.
+
+    Выполняется одним запросом «UPDATE ... SET x = x + n» в текущей транзакции,
+    без коммита, поэтому параллельные запросы не теряют изменения друг друга.
+    Версия меню тоже меняется: от счётчиков зависят ответы с меню (ETag).
 
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
         - menu_id (UUID): id меню.
+        - submenus (int): На сколько изменить количество подменю.
+        - dishes (int): На сколько изменить количество блюд.
 
     Returns:
-       - Возвращаем словарь, в котором ключами являются названия колонок из таблицы,
-         а значениями являются данные меню.
+        - None
     """
 
-    query = (
-        select(
-            models.Menu.id,
-            models.Menu.title,
-            models.Menu.description,
-            func.count(models.SubMenu.id.distinct()).label('submenus_count'),
-            func.count(models.Dish.id.distinct()).label('dishes_count')
-        )
+    await db.execute(
+        update(models.Menu)
         .where(models.Menu.id == menu_id)
-        .select_from(models.Menu).outerjoin(models.SubMenu).outerjoin(models.Dish)
-        .group_by(models.Menu.id)
-    )
-
-    result = await db.execute(query)
-    menu_info: Row[Tuple[UUID, str, str, int, int]] | None = result.fetchone()
-
-    if menu_info is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='menu not found',
+        .values(
+            submenus_count=models.Menu.submenus_count + submenus,
+            dishes_count=models.Menu.dishes_count + dishes,
+            version=models.entity_version.next_value(),
         )
-
-    menu_dict: Dict[str, Union[UUID, str, int]] = {
-        'id': menu_info[0],
-        'title': menu_info[1],
-        'description': menu_info[2],
-        'submenus_count': menu_info[3],
-        'dishes_count': menu_info[4]
-    }
-
-    return menu_dict
+        .execution_options(synchronize_session=False)
+    )
+    await refresh_menu_stats(db)
@@ -0,0 +1,290 @@
+"""Запросы чтения меню для GET-ручек.
+
+Запросы выбирают только колонки ответа (SQLAlchemy Core) и возвращают строки (Row):
+ORM объекты, identity map и отслеживание изменений для чтения не нужны.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row, Select, func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import etags, fieldsets, models
+from src.configs import MENU_COUNTS_STRATEGY
+from src.dishes.queries import DISH_COLUMNS
+from src.pagination import PageParams, paginate
+from src.submenus.queries import SUBMENU_COLUMNS
+
+# Поля ответа с количеством подменю и блюд.
+COUNT_FIELDS = ('submenus_count', 'dishes_count')
+
+
+def select_all_menus(
+        menu_id: Optional[UUID] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> Select:
+    """Запрос всех меню с количеством подменю и блюд, без сортировки и страниц.
+
+    Источник количества выбирается настройкой MENU_COUNTS_STRATEGY:
+        - stored: счётчики в таблице «menus», которые меняются при каждой записи;
+        - subquery: подзапросы, сгруппированные по меню (считаются при каждом чтении);
+        - view: материализованное представление «menu_stats», обновляемое при записи.
+
+    Количество подменю и блюд выбирается (и считается), только если оно есть в fields.
+
+    Args:
+        - menu_id (UUID | None): id меню, если нужно одно меню.
+        - fields (Tuple[str] | None): Поля ответа, None — все поля.
+
+    Returns:
+        - Select: Запрос строк (id, title, description, version,
+          submenus_count, dishes_count).
+    """
+
+    columns = fieldsets.select_columns(
+        (models.Menu.id, models.Menu.title, models.Menu.description, models.Menu.version),
+        fields,
+    )
+    counts = [name for name in COUNT_FIELDS if fields is None or name in fields]
+
+    if MENU_COUNTS_STRATEGY == 'subquery':
+        query = select(*columns)
+        if 'submenus_count' in counts:
+            submenus = select(models.SubMenu.menu_id, func.count().label('submenus_count'))
+            if menu_id is not None:
+                # PostgreSQL не переносит условие по меню внутрь сгруппированного
+                # подзапроса, поэтому для одного меню ограничиваем подзапросы явно.
+                submenus = submenus.where(models.SubMenu.menu_id == menu_id)
+            submenus = submenus.group_by(models.SubMenu.menu_id).subquery()
+            query = (
+                query.add_columns(
+                    func.coalesce(submenus.c.submenus_count, 0).label('submenus_count')
+                )
+                .outerjoin(submenus, submenus.c.menu_id == models.Menu.id)
+            )
+        if 'dishes_count' in counts:
+            dishes = (
+                select(models.SubMenu.menu_id, func.count().label('dishes_count'))
+                .join(models.Dish, models.Dish.submenu_id == models.SubMenu.id)
+            )
+            if menu_id is not None:
+                dishes = dishes.where(models.SubMenu.menu_id == menu_id)
+            dishes = dishes.group_by(models.SubMenu.menu_id).subquery()
+            query = (
+                query
+                .add_columns(func.coalesce(dishes.c.dishes_count, 0).label('dishes_count'))
+                .outerjoin(dishes, dishes.c.menu_id == models.Menu.id)
+            )
+    elif MENU_COUNTS_STRATEGY == 'view' and counts:
+        stats = models.menu_stats
+        query = (
+            select(*columns, *(
+                func.coalesce(stats.c[name], 0).label(name) for name in counts
+            ))
+            .outerjoin(stats, stats.c.menu_id == models.Menu.id)
+        )
+    else:
+        query = select(*columns, *(getattr(models.Menu, name) for name in counts))
+
+    if menu_id is None:
+        return query
+    return query.where(models.Menu.id == menu_id)
+
+
+async def get_all_menus(
+        db: AsyncSession,
+        page: Optional[PageParams] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> List[Row]:
+    """Получаем все меню, или одну страницу, отсортированные по «id».
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - page (PageParams | None): Параметры страницы (до limit + 1 объектов).
+        - fields (Tuple[str] | None): Поля ответа, None — все поля.
+
+    Returns:
+        - List[Row]: Строки меню с количеством подменю и блюд.
+    """
+
+    menus = await db.execute(
+        paginate(select_all_menus(fields=fields), models.Menu.id, page)
+    )
+    return menus.all()
+
+
+async def get_menu(
+        db: AsyncSession,
+        menu_id: UUID,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> Row:
+    """Получаем меню по «id» с количеством подменю и блюд в меню.
+
+    Количество берётся из того же источника, что и в списке меню (select_all_menus),
+    поэтому списки и меню по «id» всегда возвращают одинаковые числа.
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
+        - fields (Tuple[str] | None): Поля ответа, None — все поля.
+
+    Returns:
+        - Row: Строка меню с количеством подменю и блюд.
+    """
+
+    menu: Optional[Row] = (
+        await db.execute(select_all_menus(menu_id, fields))
+    ).one_or_none()
+
+    if menu is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='menu not found',
+        )
+
+    return menu
+
+
+async def get_menus_etag(db: AsyncSession) -> str:
+    """Получаем ETag списка меню агрегатным запросом по версиям меню.
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+
+    Returns:
+        - str: ETag списка меню.
+    """
+
+    versions: Row = (
+        await db.execute(select(*etags.version_aggregates(models.Menu.version)))
+    ).one()
+    return etags.make_etag(*versions)
+
+
+async def get_menu_etag(db: AsyncSession, menu_id: UUID) -> Optional[str]:
+    """Получаем ETag меню по его версии.
+
+    Версия меню меняется и при изменении счётчиков подменю и блюд.
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
+
+    Returns:
+        - str | None: ETag меню, None — меню не существует.
+    """
+
+    version: Optional[int] = await db.scalar(
+        select(models.Menu.version).where(models.Menu.id == menu_id)
+    )
+    return etags.version_etag(version)
+
+
+async def get_menus_tree_etag(
+        db: AsyncSession,
+        menu_id: Optional[UUID] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> Optional[str]:
+    """Получаем ETag дерева меню одним запросом: агрегаты версий меню, подменю и блюд.
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID | None): id меню; если не передан — дерево всех меню.
+        - fields (Tuple[str] | None): Поля меню; без «submenus» — только версии меню.
+
+    Returns:
+        - str | None: ETag дерева, None — меню не существует.
+    """
+
+    menus = select(
+        *etags.version_aggregates(models.Menu.version), func.count().label('menus')
+    )
+    submenus = select(*etags.version_aggregates(models.SubMenu.version), literal(0))
+    dishes = select(*etags.version_aggregates(models.Dish.version), literal(0))
+
+    if menu_id is not None:
+        menus = menus.where(models.Menu.id == menu_id)
+        submenus = submenus.where(models.SubMenu.menu_id == menu_id)
+        dishes = dishes.join(models.SubMenu).where(models.SubMenu.menu_id == menu_id)
+
+    versions = (
+        union_all(menus, submenus, dishes) if _with_submenus(fields) else menus
+    ).subquery()
+    count, max_version, sum_version, menus_count = (await db.execute(select(
+        func.sum(versions.c.count),
+        func.max(versions.c.max_version),
+        func.sum(versions.c.sum_version),
+        func.sum(versions.c.menus),
+    ))).one()
+
+    if menu_id is not None and not menus_count:
+        return None
+    return etags.make_etag(count, max_version, sum_version)
+
+
+def _with_submenus(fields: Optional[Tuple[str, ...]]) -> bool:
+    """Нужны ли в дереве меню подменю и блюда."""
+
+    return fields is None or 'submenus' in fields
+
+
+async def get_menus_tree(
+        db: AsyncSession,
+        menu_id: Optional[UUID] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> List[Dict[str, Any]]:
+    """Получаем меню с вложенными подменю и блюдами.
+
+    Дерево собирается тремя запросами (меню, подменю, блюда), независимо от его размера.
+    Если в fields нет «submenus», выбираются только меню.
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID | None): id меню; если не передан — все меню.
+        - fields (Tuple[str] | None): Поля меню, None — все поля.
+
+    Returns:
+        - Список словарей меню, у каждого меню есть ключ «submenus»,
+          у каждого подменю — ключ «dishes» (список строк блюд).
+    """
+
+    menus_query = select_all_menus(menu_id, fields).order_by(models.Menu.id)
+    submenus_query = (
+        select(models.SubMenu.menu_id, *SUBMENU_COLUMNS).order_by(models.SubMenu.id)
+    )
+    dishes_query = select(models.Dish.submenu_id, *DISH_COLUMNS).order_by(models.Dish.id)
+
+    if menu_id is not None:
+        submenus_query = submenus_query.where(models.SubMenu.menu_id == menu_id)
+        dishes_query = (
+            dishes_query.join(models.SubMenu).where(models.SubMenu.menu_id == menu_id)
+        )
+
+    menus = (await db.execute(menus_query)).all()
+
+    if menu_id is not None and not menus:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='menu not found',
+        )
+
+    tree: Dict[UUID, Dict[str, Any]] = {
+        menu.id: {**menu._mapping, 'submenus': []} for menu in menus
+    }
+    if not _with_submenus(fields):
+        return list(tree.values())
+
+    # Запросы выполняются по отдельности (READ COMMITTED): подменю и блюда,
+    # созданные после чтения родителя, в дерево не попадают.
+    submenus: Dict[UUID, Dict[str, Any]] = {}
+    for submenu in await db.execute(submenus_query):
+        if submenu.menu_id in tree:
+            submenus[submenu.id] = {**submenu._mapping, 'dishes': []}
+            tree[submenu.menu_id]['submenus'].append(submenus[submenu.id])
+
+    for dish in await db.execute(dishes_query):
+        if dish.submenu_id in submenus:
+            submenus[dish.submenu_id]['dishes'].append(dish)
+
+    return list(tree.values())
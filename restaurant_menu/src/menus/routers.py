@@ -1,11 +1,12 @@
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from src import models, schemas
-from src.database import get_db
-from src.menus import crud
+from sqlalchemy.orm import sessionmaker
+from src import cache, etags, fieldsets, models, pagination, schemas, streaming
+from src.database import get_db, get_read_db, get_read_session_factory
+from src.menus import crud, queries
 
 menu_router = APIRouter()
 
@@ -25,23 +26,63 @@ async def new_menu(
 
 @menu_router.get('/api/v1/menus', response_model=List[schemas.DetailedMenuInfoPyd],
                  summary='Список меню', tags=['Меню'])
-async def all_menus(db: AsyncSession = Depends(get_db)) -> List[Optional[models.Menu]]:
-    """Выводим список со всеми меню."""
-
-    return await crud.get_all_menus(db=db)
+async def all_menus(
+    page: Optional[pagination.PageParams] = Depends(pagination.get_page_params),
+    stream: Optional[str] = Depends(streaming.get_stream_format),
+    fields: Optional[Tuple[str, ...]] = Depends(
+        fieldsets.get_fields(schemas.DetailedMenuInfoPyd)
+    ),
+    if_none_match: Optional[str] = Depends(etags.get_if_none_match),
+    session_factory: sessionmaker = Depends(get_read_session_factory),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """Выводим список со всеми меню, одну страницу списка (limit, cursor) или поток."""
+
+    schema = List[schemas.DetailedMenuInfoPyd]
+
+    if stream is not None:
+        return streaming.stream_response(
+            session_factory,
+            queries.select_all_menus(fields=fields).order_by(models.Menu.id),
+            schemas.DetailedMenuInfoPyd,
+            stream,
+            fields,
+        )
+
+    if page is None:
+        return await cache.cached_response(
+            key=cache.menus_key(),
+            loader=lambda: queries.get_all_menus(db=db, fields=fields),
+            schema=schema,
+            etag_loader=lambda: queries.get_menus_etag(db=db),
+            if_none_match=if_none_match,
+            fields=fields,
+        )
+
+    menus = await queries.get_all_menus(db=db, page=page, fields=fields)
+    return pagination.page_response(menus, page, schema, fields)
 
 
 @menu_router.get('/api/v1/menus/{menu_id}', response_model=schemas.DetailedMenuInfoPyd,
                  summary='Определённое меню', tags=['Меню'])
 async def get_menu(
     menu_id: UUID = Path(..., description='id меню'),
-    db: AsyncSession = Depends(get_db),
-) -> Dict:
+    fields: Optional[Tuple[str, ...]] = Depends(
+        fieldsets.get_fields(schemas.DetailedMenuInfoPyd)
+    ),
+    if_none_match: Optional[str] = Depends(etags.get_if_none_match),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
     """Выводим определённое меню по его «id»."""
 
-    menu: Dict = await crud.get_menu_by_id_using_orm(db=db, menu_id=menu_id)
-
-    return menu
+    return await cache.cached_response(
+        key=cache.menu_key(menu_id),
+        loader=lambda: queries.get_menu(db=db, menu_id=menu_id, fields=fields),
+        schema=schemas.DetailedMenuInfoPyd,
+        etag_loader=lambda: queries.get_menu_etag(db=db, menu_id=menu_id),
+        if_none_match=if_none_match,
+        fields=fields,
+    )
 
 
 @menu_router.patch('/api/v1/menus/{menu_id}', response_model=schemas.DetailedMenuInfoPyd,
@@ -53,10 +94,8 @@ async def update_menu(
 ) -> models.Menu:
     """Обновляем информацию о меню."""
 
-    menu: Optional[models.Menu] = await crud.get_menu_by_id(db=db, menu_id=menu_id)
-
     updated_menu: models.Menu = await crud.update_menu_by_id(
-        db=db, menu=menu, **update_data.model_dump()
+        db=db, menu_id=menu_id, **update_data.model_dump()
     )
 
     return updated_menu
@@ -71,8 +110,60 @@ async def delete_menu(
 ) -> Dict[str, Union[bool, str]]:
     """Удалаяем меню."""
 
-    # Получаем объект меню, и проверяем его.
-    await crud.get_menu_by_id(db=db, menu_id=menu_id)
-
     await crud.delete_menu_by_id(db=db, menu_id=menu_id)
     return {"status": True, "message": "The menu has been deleted"}
+
+
+@menu_router.get('/api/v1/tree', response_model=List[schemas.MenuTreePyd],
+                 summary='Все меню с подменю и блюдами', tags=['Меню'])
+async def menus_tree(
+    fields: Optional[Tuple[str, ...]] = Depends(fieldsets.get_fields(schemas.MenuTreePyd)),
+    if_none_match: Optional[str] = Depends(etags.get_if_none_match),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """Выводим все меню с вложенными подменю и блюдами.
+
+    Ответ хранится как снимок и пересобирается только после изменений в меню.
+    """
+
+    return await cache.cached_response(
+        key=cache.tree_key(),
+        loader=lambda: queries.get_menus_tree(db=db, fields=fields),
+        schema=List[schemas.MenuTreePyd],
+        expire=False,
+        etag_loader=lambda: queries.get_menus_tree_etag(db=db, fields=fields),
+        if_none_match=if_none_match,
+        fields=fields,
+    )
+
+
+@menu_router.get('/api/v1/menus/{menu_id}/tree', response_model=schemas.MenuTreePyd,
+                 summary='Меню с подменю и блюдами', tags=['Меню'])
+async def menu_tree(
+    menu_id: UUID = Path(..., description='id меню'),
+    fields: Optional[Tuple[str, ...]] = Depends(fieldsets.get_fields(schemas.MenuTreePyd)),
+    if_none_match: Optional[str] = Depends(etags.get_if_none_match),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """Выводим определённое меню с вложенными подменю и блюдами.
+
+    Ответ хранится как снимок и пересобирается только после изменений в этом меню.
+    """
+
+    async def load_menu_tree() -> Dict:
+        menus: List[Dict] = await queries.get_menus_tree(
+            db=db, menu_id=menu_id, fields=fields
+        )
+        return menus[0]
+
+    return await cache.cached_response(
+        key=cache.menu_tree_key(menu_id),
+        loader=load_menu_tree,
+        schema=schemas.MenuTreePyd,
+        expire=False,
+        etag_loader=lambda: queries.get_menus_tree_etag(
+            db=db, menu_id=menu_id, fields=fields
+        ),
+        if_none_match=if_none_match,
+        fields=fields,
+    )
@@ -0,0 +1,283 @@
+"""Метрики приложения в текстовом формате Prometheus (ручка «/metrics»).
+
+Ручка доступна с токеном SERVICE_TOKEN (src.service.routers.check_service_token).
+Метрики хранятся в памяти процесса, внешние сервисы и пакеты не нужны:
+
+    - http_request_duration_seconds: гистограмма времени ответа по методу и маршруту;
+    - http_requests_total: количество ответов по методу, маршруту и статусу;
+    - http_requests_in_flight: запросы, которые обрабатываются сейчас;
+    - db_query_duration_seconds: гистограмма времени SQL-запросов по операции
+      (события движка, src.instrumentation);
+    - db_pool_*: состояние пулов соединений (считывается при запросе метрик);
+    - cache_requests_total: попадания и промахи кэша ответов (src.cache).
+
+В метках используются шаблоны маршрутов («/api/v1/menus/{menu_id}»), а не пути
+запросов, поэтому количество рядов метрик ограничено количеством ручек.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Sequence, Tuple, TypeVar
+
+from src.configs import METRICS_ENABLED
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Метка маршрута для запросов, которые не подошли ни к одной ручке.
+UNMATCHED_ROUTE = '<unmatched>'
+
+# Границы корзин гистограмм в секундах.
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+MetricT = TypeVar('MetricT', bound='Metric')
+
+# Операции SQL-запросов, остальные запросы считаются как «other».
+DB_OPERATIONS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Метрика с метками: значения хранятся по кортежу значений меток."""
+
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def _labels(self, labels: Tuple[str, ...], **extra: str) -> str:
+        pairs = [*zip(self.labelnames, labels), *extra.items()]
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + '}'
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in sorted(self.values.items()):
+            yield f'{self.name}{self._labels(labels)} {_format_value(value)}'
+
+    def render(self) -> str:
+        return '\n'.join((
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type_name}',
+            *self.samples(),
+        ))
+
+
+class Counter(Metric):
+    """Счётчик, который только растёт."""
+
+    type_name = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """Значение, которое может расти и уменьшаться."""
+
+    type_name = 'gauge'
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """Гистограмма: количество наблюдений по корзинам, их сумма и количество."""
+
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = HTTP_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Наблюдения по корзинам (не накопительно, последняя — +Inf) и сумма.
+        self.counts: Dict[Tuple[str, ...], List[int]] = {}
+        self.sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+            self.sums[labels] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def samples(self) -> Iterator[str]:
+        for labels, counts in sorted(self.counts.items()):
+            total = 0
+            for bound, count in zip((*self.buckets, float('inf')), counts):
+                total += count
+                le = self._labels(labels, le=_format_value(bound))
+                yield f'{self.name}_bucket{le} {total}'
+            yield f'{self.name}_sum{self._labels(labels)} {_format_value(self.sums[labels])}'
+            yield f'{self.name}_count{self._labels(labels)} {total}'
+
+
+class Registry:
+    """Набор метрик, которые выводятся ручкой «/metrics»."""
+
+    def __init__(self) -> None:
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: MetricT) -> MetricT:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return '\n'.join(metric.render() for metric in self.metrics) + '\n'
+
+
+registry = Registry()
+
+HTTP_REQUEST_DURATION: Histogram = registry.register(Histogram(
+    'http_request_duration_seconds', 'Время ответа на HTTP-запрос.', ('method', 'route'),
+))
+HTTP_REQUESTS: Counter = registry.register(Counter(
+    'http_requests_total', 'Количество ответов на HTTP-запросы.',
+    ('method', 'route', 'status'),
+))
+HTTP_REQUESTS_IN_FLIGHT: Gauge = registry.register(Gauge(
+    'http_requests_in_flight', 'HTTP-запросы, которые обрабатываются сейчас.',
+    ('method', 'route'),
+))
+DB_QUERY_DURATION: Histogram = registry.register(Histogram(
+    'db_query_duration_seconds', 'Время выполнения SQL-запроса.', ('operation',), DB_BUCKETS,
+))
+CACHE_REQUESTS: Counter = registry.register(Counter(
+    'cache_requests_total',
+    'Обращения к кэшу ответов: hit, miss или bypass (ответ с выборочными полями).',
+    ('result',),
+))
+
+# Состояние пулов соединений, метка engine — primary или replica{номер}.
+DB_POOL_SIZE: Gauge = registry.register(Gauge(
+    'db_pool_size', 'Размер пула соединений.', ('engine',),
+))
+DB_POOL_MAX_OVERFLOW: Gauge = registry.register(Gauge(
+    'db_pool_max_overflow', 'Соединений сверх размера пула, не больше.', ('engine',),
+))
+DB_POOL_CHECKED_OUT: Gauge = registry.register(Gauge(
+    'db_pool_checked_out', 'Занятые соединения пула.', ('engine',),
+))
+DB_POOL_IDLE: Gauge = registry.register(Gauge(
+    'db_pool_idle', 'Свободные соединения пула.', ('engine',),
+))
+DB_POOL_UTILIZATION: Gauge = registry.register(Gauge(
+    'db_pool_utilization', 'Доля занятых соединений от размера пула и лимита сверх него.',
+    ('engine',),
+))
+DB_POOL_CHECKOUTS: Gauge = registry.register(Gauge(
+    'db_pool_checkouts', 'Количество выдач соединений пулом.', ('engine',),
+))
+DB_POOL_CHECKOUT_TIMEOUTS: Gauge = registry.register(Gauge(
+    'db_pool_checkout_timeouts', 'Количество отказов в соединении по pool_timeout.',
+    ('engine',),
+))
+DB_POOL_CHECKOUT_WAIT_MAX: Gauge = registry.register(Gauge(
+    'db_pool_checkout_wait_max_seconds', 'Максимальное ожидание соединения.', ('engine',),
+))
+
+
+def observe_query(statement: str, duration: float) -> None:
+    """Учитываем время SQL-запроса.
+
+    Args:
+        - statement (str): Текст запроса.
+        - duration (float): Время выполнения в секундах.
+    """
+
+    operation = statement.lstrip()[:6].upper()
+    if operation not in DB_OPERATIONS:
+        operation = 'other'
+    DB_QUERY_DURATION.observe(duration, operation)
+
+
+def observe_pool(engine: str, status: Dict) -> None:
+    """Записываем состояние пула соединений (database.pool_status) в метрики.
+
+    Args:
+        - engine (str): Имя движка для метки engine.
+        - status (Dict): Состояние пула.
+    """
+
+    capacity = status['pool_size'] + status['max_overflow']
+    DB_POOL_SIZE.set(status['pool_size'], engine)
+    DB_POOL_MAX_OVERFLOW.set(status['max_overflow'], engine)
+    DB_POOL_CHECKED_OUT.set(status['checked_out'], engine)
+    DB_POOL_IDLE.set(status['idle'], engine)
+    DB_POOL_UTILIZATION.set(status['checked_out'] / capacity if capacity else 0.0, engine)
+    DB_POOL_CHECKOUTS.set(status['checkouts'], engine)
+    DB_POOL_CHECKOUT_TIMEOUTS.set(status['checkout_timeouts'], engine)
+    DB_POOL_CHECKOUT_WAIT_MAX.set(status['checkout_wait_max_ms'] / 1000, engine)
+
+
+def route_template(scope: Scope) -> str:
+    """Шаблон маршрута, к которому относится запрос, или UNMATCHED_ROUTE.
+
+    Маршрут ищется так же, как его ищет роутер (route.matches), до обработки запроса,
+    чтобы учесть запрос в http_requests_in_flight.
+    """
+
+    partial = None
+    for route in scope['app'].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware: время, статусы и количество обрабатываемых HTTP-запросов."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        labels = (scope['method'], route_template(scope))
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(*labels)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(*labels)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, *labels)
+            HTTP_REQUESTS.inc(*labels, str(status_code))
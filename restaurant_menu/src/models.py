@@ -2,25 +2,44 @@
 
 import uuid
 
-from sqlalchemy import Column, Float, ForeignKey, Integer, String
+from sqlalchemy import (DDL, BigInteger, Column, Float, ForeignKey, Index,
+                        Integer, MetaData, Sequence, String, Table, event,
+                        text)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from src.database import Base
 
+# Общая последовательность версий меню, подменю и блюд. Каждая запись (создание,
+# изменение, изменение счётчиков) получает новое, большее всех прежних значение,
+# поэтому количество, максимум и сумма версий меняются при любом изменении набора
+# строк (см. src.etags).
+entity_version = Sequence('entity_version_seq', metadata=Base.metadata)
+
+
+def version_column() -> Column:
+    """Колонка версии строки: новое значение из entity_version при каждой записи."""
+
+    return Column(
+        BigInteger, nullable=False, server_default=text("nextval('entity_version_seq')")
+    )
+
 
 class Menu(Base):
     """Таблица SQLAlchemy «Меню»."""
 
     __tablename__ = 'menus'
 
-    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, index=True, nullable=False, unique=True)
     description = Column(String, nullable=False)
     submenus_count = Column(Integer, default=0)
     dishes_count = Column(Integer, default=0)
+    version = version_column()
 
-    # Связь с таблицей SubMenu
-    submenus = relationship('SubMenu', back_populates='menus', lazy='selectin')
+    # Связь с таблицей SubMenu.
+    # Связи не загружаются по умолчанию (lazy='raise'): каждая CRUD-функция
+    # сама выбирает, какие данные ей нужны, через опции запроса (selectinload и т.д.).
+    submenus = relationship('SubMenu', back_populates='menus', lazy='raise')
 
 
 class SubMenu(Base):
@@ -28,7 +47,7 @@ class SubMenu(Base):
 
     __tablename__ = 'submenus'
 
-    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     menu_id = Column(
         UUID(as_uuid=True), ForeignKey('menus.id', ondelete='CASCADE'), nullable=False,
         comment='Внешний ключ, связывающий подменю с родительским меню (таблица «Menu»).'
@@ -36,10 +55,15 @@ class SubMenu(Base):
     title = Column(String, index=True, nullable=False, unique=True)
     description = Column(String, nullable=False)
     dishes_count = Column(Integer, default=0)
+    version = version_column()
+
+    # Индекс по внешнему ключу и id: список подменю меню с сортировкой по id
+    # (постраничный вывод), подсчёт блюд и ON DELETE CASCADE.
+    __table_args__ = (Index('ix_submenus_menu_id', 'menu_id', 'id'),)
 
     # Связь с таблицами «Menu» и «Dish»
-    menus = relationship('Menu', back_populates='submenus', lazy='selectin')
-    dishes = relationship('Dish', back_populates='submenus', lazy='selectin')
+    menus = relationship('Menu', back_populates='submenus', lazy='raise')
+    dishes = relationship('Dish', back_populates='submenus', lazy='raise')
 
 
 class Dish(Base):
@@ -47,7 +71,7 @@ class Dish(Base):
 
     __tablename__ = 'dishes'
 
-    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     submenu_id = Column(
         UUID(as_uuid=True), ForeignKey('submenus.id', ondelete='CASCADE'), nullable=False,
         comment='Внешний ключ, связывающий блюдо с подменю (таблица «SubMenu»).'
@@ -55,6 +79,34 @@ class Dish(Base):
     title = Column(String, index=True, nullable=False, unique=True)
     description = Column(String, nullable=False)
     price = Column(Float, nullable=False)
+    version = version_column()
+
+    # Индекс по внешнему ключу и id: список блюд подменю с сортировкой по id.
+    __table_args__ = (Index('ix_dishes_submenu_id', 'submenu_id', 'id'),)
 
     # Связь с таблицей SubMenu
-    submenus = relationship('SubMenu', back_populates='dishes', lazy='selectin')
+    submenus = relationship('SubMenu', back_populates='dishes', lazy='raise')
+
+
+# Материализованное представление со статистикой меню (MENU_COUNTS_STRATEGY=view).
+# Описано в отдельной MetaData, чтобы create_all не создал его как таблицу:
+# представление создаётся и удаляется вместе со схемой через DDL-события.
+menu_stats = Table(
+    'menu_stats', MetaData(),
+    Column('menu_id', UUID(as_uuid=True), primary_key=True),
+    Column('submenus_count', Integer),
+    Column('dishes_count', Integer),
+)
+
+event.listen(Base.metadata, 'after_create', DDL(
+    'CREATE MATERIALIZED VIEW menu_stats AS '
+    'SELECT submenus.menu_id, count(DISTINCT submenus.id) AS submenus_count, '
+    'count(dishes.id) AS dishes_count '
+    'FROM submenus LEFT OUTER JOIN dishes ON dishes.submenu_id = submenus.id '
+    'GROUP BY submenus.menu_id'
+))
+# Уникальный индекс нужен для REFRESH MATERIALIZED VIEW CONCURRENTLY.
+event.listen(Base.metadata, 'after_create', DDL(
+    'CREATE UNIQUE INDEX ix_menu_stats_menu_id ON menu_stats (menu_id)'
+))
+event.listen(Base.metadata, 'before_drop', DDL('DROP MATERIALIZED VIEW IF EXISTS menu_stats'))
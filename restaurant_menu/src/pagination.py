@@ -0,0 +1,120 @@
+"""Постраничный вывод списков по ключу (keyset/cursor pagination).
+
+Страница выбирается условием «id > id последнего объекта предыдущей страницы»
+с сортировкой по id, поэтому любая страница стоит столько же, сколько первая,
+в отличие от OFFSET. Курсор для клиента непрозрачен: это id в base64.
+"""
+
+import base64
+import binascii
+from typing import Any, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Select
+from src.configs import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.schemas import dump_json
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+class PageParams(NamedTuple):
+    """Параметры страницы.
+
+    Fields:
+        - limit: int
+        - after: UUID | None
+    """
+
+    limit: int
+    after: Optional[UUID]
+
+
+def encode_cursor(key: UUID) -> str:
+    """Кодируем id последнего объекта страницы в курсор."""
+
+    return base64.urlsafe_b64encode(key.bytes).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str) -> UUID:
+    """Декодируем курсор в id. Некорректный курсор — ошибка 422."""
+
+    try:
+        return UUID(bytes=base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='invalid cursor',
+        )
+
+
+def get_page_params(
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE,
+        description='Размер страницы. Без limit и cursor выводится весь список.',
+    ),
+    cursor: Optional[str] = Query(
+        None, description=f'Курсор следующей страницы, из заголовка {NEXT_CURSOR_HEADER}.',
+    ),
+) -> Optional[PageParams]:
+    """Зависимость FastAPI: параметры страницы или None, если список нужен целиком."""
+
+    if limit is None and cursor is None:
+        return None
+
+    return PageParams(
+        limit=limit or DEFAULT_PAGE_SIZE,
+        after=decode_cursor(cursor) if cursor else None,
+    )
+
+
+def paginate(query: Select, key: Any, page: Optional[PageParams]) -> Select:
+    """Добавляем к запросу сортировку по ключу и, если нужно, условие страницы.
+
+    Выбирается на один объект больше limit: так мы узнаём, есть ли следующая страница.
+
+    Args:
+        - query (Select): Запрос списка.
+        - key (Column): Уникальная колонка для сортировки (id).
+        - page (PageParams | None): Параметры страницы.
+
+    Returns:
+        - Select: Запрос страницы.
+    """
+
+    query = query.order_by(key)
+    if page is None:
+        return query
+    if page.after is not None:
+        query = query.where(key > page.after)
+    return query.limit(page.limit + 1)
+
+
+def page_response(
+        items: List[Any],
+        page: PageParams,
+        schema: Any,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> Response:
+    """Формируем JSON-ответ со страницей и курсором следующей страницы в заголовке.
+
+    Args:
+        - items (List): Объекты, выбранные запросом из paginate (до limit + 1).
+        - page (PageParams): Параметры страницы.
+        - schema (Any): Pydantic модель ответа (List[модель]).
+        - fields (Tuple[str] | None): Поля ответа, None — все поля.
+
+    Returns:
+        - Response: JSON-ответ.
+    """
+
+    headers = {}
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1].id)
+
+    return Response(
+        content=dump_json(items, schema, fields),
+        media_type='application/json',
+        headers=headers,
+    )
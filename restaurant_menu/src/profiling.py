@@ -0,0 +1,282 @@
+"""Профилирование одного запроса по подписанному заголовку.
+
+Запрос с заголовком «X-Profile» выполняется под профилировщиком, если заголовок
+подписан ключом PROFILING_SECRET (см. sign_token). Формат профиля задаётся
+заголовком «X-Profile-Format»:
+
+    - collapsed (по умолчанию): выборка стеков потока цикла событий каждые
+      PROFILING_SAMPLE_INTERVAL секунд, формат свёрнутых стеков для flamegraph
+      («кадр;кадр;кадр количество»);
+    - pstats: детерминированный профилировщик cProfile, файл для pstats.Stats
+      (и snakeviz, gprof2dot).
+
+Профиль охватывает обработчик FastAPI, сериализацию и проверку данных
+(src.schemas) и запросы SQLAlchemy, которые ожидает обработчик. Профилировщик
+работает для всего потока, поэтому в профиль попадают и запросы, которые
+выполняются в это же время.
+
+Если задан PROFILING_DIR, профиль записывается в файл, путь к нему возвращается
+в заголовке «X-Profile-Path», а клиент получает обычный ответ. Иначе вместо ответа
+возвращается профиль, статус ответа — в заголовке «X-Profile-Status».
+
+Без PROFILING_SECRET middleware не подключается к приложению (src.main),
+и обычные запросы не проходят через него вовсе.
+
+Заголовок для запроса создаётся командой (из каталога restaurant_menu):
+
+    python -m src.profiling GET /api/v1/menus --ttl 300
+"""
+
+import argparse
+import cProfile
+import hashlib
+import hmac
+import logging
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from src.configs import (PROFILING_DIR, PROFILING_SAMPLE_INTERVAL,
+                         PROFILING_SECRET)
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'x-profile'
+FORMAT_HEADER = 'x-profile-format'
+FORMATS = ('collapsed', 'pstats')
+
+# Тип ответа и расширение файла профиля по формату.
+MEDIA_TYPES = {'collapsed': 'text/plain; charset=utf-8', 'pstats': 'application/octet-stream'}
+EXTENSIONS = {'collapsed': 'collapsed', 'pstats': 'prof'}
+
+
+def _signature(secret: str, expires: int, method: str, path: str) -> str:
+    message = f'{expires}.{method.upper()}.{path}'.encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def sign_token(
+    method: str,
+    path: str,
+    ttl: int = 300,
+    secret: str = PROFILING_SECRET,
+) -> str:
+    """Подписываем значение заголовка «X-Profile» для одного метода и пути.
+
+    Args:
+        - method (str): Метод запроса.
+        - path (str): Путь запроса (без строки запроса).
+        - ttl (int): Срок действия подписи в секундах.
+        - secret (str): Ключ подписи.
+
+    Returns:
+        - str: Значение заголовка «{expires}.{signature}».
+    """
+
+    expires = int(time.time()) + ttl
+    return f'{expires}.{_signature(secret, expires, method, path)}'
+
+
+def verify_token(
+    token: str,
+    method: str,
+    path: str,
+    secret: str = PROFILING_SECRET,
+) -> bool:
+    """Проверяем подпись и срок действия заголовка «X-Profile»."""
+
+    expires, _, signature = token.partition('.')
+    if not secret or not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(secret, int(expires), method, path))
+
+
+def _frame_name(frame: FrameType) -> str:
+    return f'{frame.f_globals.get("__name__", "?")}.{frame.f_code.co_name}'
+
+
+class StackSampler:
+    """Выборочный профилировщик: стеки одного потока из отдельного потока."""
+
+    def __init__(self, thread_id: int, interval: float = PROFILING_SAMPLE_INTERVAL) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame: Optional[FrameType] = sys._current_frames().get(self.thread_id)
+            names: List[str] = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def collapsed(self) -> bytes:
+        """Свёрнутые стеки: «кадр;кадр;кадр количество» по строке на стек."""
+
+        return ''.join(
+            f'{stack} {count}\n' for stack, count in self.stacks.most_common()
+        ).encode()
+
+
+class _Profiler:
+    """Профилировщик одного запроса в выбранном формате."""
+
+    def __init__(self, profile_format: str) -> None:
+        self.format = profile_format
+        if profile_format == 'pstats':
+            self.profile: Any = cProfile.Profile()
+        else:
+            self.profile = StackSampler(threading.get_ident())
+
+    def start(self) -> None:
+        if self.format == 'pstats':
+            self.profile.enable()
+        else:
+            self.profile.start()
+
+    def stop(self) -> bytes:
+        if self.format == 'collapsed':
+            self.profile.stop()
+            return self.profile.collapsed()
+        self.profile.disable()
+        self.profile.create_stats()
+        # Тот же формат, что у cProfile.Profile.dump_stats.
+        return marshal.dumps(self.profile.stats)
+
+
+def profile_path(directory: str, scope: Scope, profile_format: str) -> str:
+    """Путь файла профиля: время, метод и маршрут запроса."""
+
+    route: Any = scope.get('route')
+    name = re.sub(r'[^A-Za-z0-9_.-]+', '_', getattr(route, 'path', scope['path'])).strip('_')
+    return os.path.join(
+        directory,
+        f'{time.strftime("%Y%m%dT%H%M%S")}-{time.time_ns() % 10**9:09d}-'
+        f'{scope["method"]}-{name}.{EXTENSIONS[profile_format]}',
+    )
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: профилирование запросов с подписанным заголовком «X-Profile»."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        secret: str = PROFILING_SECRET,
+        directory: str = PROFILING_DIR,
+    ) -> None:
+        self.app = app
+        self.secret = secret
+        self.directory = directory
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        token: Optional[str] = headers.get(PROFILE_HEADER)
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_format: str = headers.get(FORMAT_HEADER, 'collapsed')
+        if profile_format not in FORMATS or not verify_token(
+            token, scope['method'], scope['path'], self.secret
+        ):
+            logger.warning(
+                'Отклонён запрос профилирования %s %s', scope['method'], scope['path']
+            )
+            await self.app(scope, receive, send)
+            return
+
+        if self.directory:
+            await self._profile_to_file(scope, receive, send, profile_format)
+        else:
+            await self._profile_to_response(scope, receive, send, profile_format)
+
+    async def _profile_to_file(
+        self, scope: Scope, receive: Receive, send: Send, profile_format: str
+    ) -> None:
+        """Профиль — в файл PROFILING_DIR, клиенту — обычный ответ с путём к файлу."""
+
+        path: Optional[str] = None
+        profiler = _Profiler(profile_format)
+
+        async def send_with_path(message: Message) -> None:
+            nonlocal path
+            if message['type'] == 'http.response.start':
+                path = profile_path(self.directory, scope, profile_format)
+                MutableHeaders(raw=message['headers'])['X-Profile-Path'] = path
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_path)
+        finally:
+            profile: bytes = profiler.stop()
+            if path is not None:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(path, 'wb') as file:
+                    file.write(profile)
+                logger.info('Профиль запроса %s %s: %s', scope['method'], scope['path'], path)
+
+    async def _profile_to_response(
+        self, scope: Scope, receive: Receive, send: Send, profile_format: str
+    ) -> None:
+        """Профиль вместо ответа, статус ответа — в заголовке «X-Profile-Status»."""
+
+        start: Dict[str, Any] = {}
+
+        async def discard(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                start.update(message)
+
+        profiler = _Profiler(profile_format)
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profile: bytes = profiler.stop()
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', MEDIA_TYPES[profile_format].encode()),
+                (b'content-length', str(len(profile)).encode()),
+                (b'x-profile-status', str(start.get('status', 500)).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': profile})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Заголовок X-Profile для запроса.')
+    parser.add_argument('method', help='метод запроса, например GET')
+    parser.add_argument('path', help='путь запроса, например /api/v1/menus')
+    parser.add_argument('--ttl', type=int, default=300, help='срок действия в секундах')
+    args = parser.parse_args()
+    if not PROFILING_SECRET:
+        parser.error('PROFILING_SECRET не задан')
+    print(f'X-Profile: {sign_token(args.method, args.path, args.ttl)}')
@@ -0,0 +1,235 @@
+"""Сверка и исправление счётчиков подменю и блюд.
+
+Счётчики в таблицах «menus» и «submenus» меняются вместе с записью объектов, но
+могут разойтись с данными (например, после сбоя между запросами или правки БД
+вручную). Сверка пересчитывает их частями по RECONCILE_BATCH_SIZE строк:
+каждая часть выбирается по ключу («id > последний id»), считается по индексам
+ix_submenus_menu_id и ix_dishes_submenu_id и исправляется в своей короткой транзакции.
+
+Исправляются только расходящиеся строки, и только если счётчик не изменился
+с момента подсчёта («UPDATE ... WHERE count = прочитанное значение»): строки,
+которые параллельно поменял запрос API, не блокируются надолго и не портятся,
+а проверяются при следующей сверке.
+
+Запуск из каталога restaurant_menu:
+
+    python -m src.reconciliation --batch-size 1000
+
+или периодически в приложении (RECONCILE_INTERVAL > 0).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import cache, models
+from src.configs import RECONCILE_BATCH_SIZE
+from src.database import async_engine, async_session_local
+from src.menus.crud import refresh_menu_stats
+
+logger = logging.getLogger(__name__)
+
+
+def _submenus_batch(after: Optional[UUID], batch_size: int) -> Select:
+    """Запрос части подменю с сохранённым и фактическим количеством блюд."""
+
+    batch = select(models.SubMenu.id, models.SubMenu.menu_id, models.SubMenu.dishes_count)
+    if after is not None:
+        batch = batch.where(models.SubMenu.id > after)
+    batch = batch.order_by(models.SubMenu.id).limit(batch_size).subquery()
+
+    return (
+        select(
+            batch.c.id, batch.c.menu_id, batch.c.dishes_count,
+            func.count(models.Dish.id).label('actual_dishes_count'),
+        )
+        .outerjoin(models.Dish, models.Dish.submenu_id == batch.c.id)
+        .group_by(batch.c.id, batch.c.menu_id, batch.c.dishes_count)
+        .order_by(batch.c.id)
+    )
+
+
+def _menus_batch(after: Optional[UUID], batch_size: int) -> Select:
+    """Запрос части меню с сохранённым и фактическим количеством подменю и блюд."""
+
+    batch = select(
+        models.Menu.id, models.Menu.submenus_count, models.Menu.dishes_count
+    )
+    if after is not None:
+        batch = batch.where(models.Menu.id > after)
+    batch = batch.order_by(models.Menu.id).limit(batch_size).subquery()
+
+    # Количество блюд в меню — сумма счётчиков его подменю: к этому моменту они
+    # уже сверены с таблицей блюд, и таблица «dishes» второй раз не читается.
+    return (
+        select(
+            batch.c.id, batch.c.submenus_count, batch.c.dishes_count,
+            func.count(models.SubMenu.id).label('actual_submenus_count'),
+            func.coalesce(func.sum(models.SubMenu.dishes_count), 0)
+            .label('actual_dishes_count'),
+        )
+        .outerjoin(models.SubMenu, models.SubMenu.menu_id == batch.c.id)
+        .group_by(batch.c.id, batch.c.submenus_count, batch.c.dishes_count)
+        .order_by(batch.c.id)
+    )
+
+
+async def _reconcile_submenus(
+        db: AsyncSession,
+        rows: List[Any],
+        report: Dict[str, int],
+) -> List[UUID]:
+    """Исправляем количество блюд в подменю части, возвращаем id затронутых меню."""
+
+    menu_ids: List[UUID] = []
+    for row in rows:
+        if row.dishes_count == row.actual_dishes_count:
+            continue
+        fixed = await db.execute(
+            update(models.SubMenu)
+            .where(
+                models.SubMenu.id == row.id,
+                models.SubMenu.dishes_count == row.dishes_count,
+            )
+            .values(
+                dishes_count=row.actual_dishes_count,
+                version=models.entity_version.next_value(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if fixed.rowcount:
+            report['submenus_fixed'] += 1
+            report['submenu_dishes_drift'] += abs(row.dishes_count - row.actual_dishes_count)
+            menu_ids.append(row.menu_id)
+    return menu_ids
+
+
+async def _reconcile_menus(
+        db: AsyncSession,
+        rows: List[Any],
+        report: Dict[str, int],
+) -> List[UUID]:
+    """Исправляем количество подменю и блюд в меню части, возвращаем id исправленных меню."""
+
+    menu_ids: List[UUID] = []
+    for row in rows:
+        if (row.submenus_count, row.dishes_count) == (
+            row.actual_submenus_count, row.actual_dishes_count
+        ):
+            continue
+        fixed = await db.execute(
+            update(models.Menu)
+            .where(
+                models.Menu.id == row.id,
+                models.Menu.submenus_count == row.submenus_count,
+                models.Menu.dishes_count == row.dishes_count,
+            )
+            .values(
+                submenus_count=row.actual_submenus_count,
+                dishes_count=row.actual_dishes_count,
+                version=models.entity_version.next_value(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if fixed.rowcount:
+            report['menus_fixed'] += 1
+            report['menu_submenus_drift'] += abs(
+                row.submenus_count - row.actual_submenus_count
+            )
+            report['menu_dishes_drift'] += abs(row.dishes_count - row.actual_dishes_count)
+            menu_ids.append(row.id)
+    return menu_ids
+
+
+async def reconcile_counters(
+        session_factory: Callable[[], AsyncSession],
+        batch_size: int = RECONCILE_BATCH_SIZE,
+) -> Dict[str, int]:
+    """Сверяем и исправляем счётчики всех подменю, затем всех меню.
+
+    Args:
+        - session_factory (Callable): Фабрика сессий основной БД.
+        - batch_size (int): Количество подменю или меню в одной части.
+
+    Returns:
+        - Dict[str, int]: Отчёт: сколько строк проверено и исправлено и суммарное
+          расхождение счётчиков.
+    """
+
+    report: Dict[str, int] = dict.fromkeys((
+        'submenus_checked', 'submenus_fixed', 'submenu_dishes_drift',
+        'menus_checked', 'menus_fixed', 'menu_submenus_drift', 'menu_dishes_drift',
+    ), 0)
+
+    for batch_query, reconcile, checked in (
+        (_submenus_batch, _reconcile_submenus, 'submenus_checked'),
+        (_menus_batch, _reconcile_menus, 'menus_checked'),
+    ):
+        after: Optional[UUID] = None
+        while True:
+            async with session_factory() as db:
+                rows = (await db.execute(batch_query(after, batch_size))).all()
+                menu_ids = await reconcile(db, rows, report)
+                if menu_ids:
+                    await refresh_menu_stats(db)
+                await db.commit()
+
+            if menu_ids:
+                await cache.backend.delete(cache.menus_key(), cache.tree_key())
+                for menu_id in set(menu_ids):
+                    await cache.backend.delete_prefix(cache.menu_key(menu_id))
+
+            report[checked] += len(rows)
+            if len(rows) < batch_size:
+                break
+            after = rows[-1].id
+
+    logger.info('Сверка счётчиков: %s', report)
+    return report
+
+
+async def run_reconciliation(
+        session_factory: Callable[[], AsyncSession],
+        interval: float,
+) -> None:
+    """Фоновая задача: сверяем счётчики каждые «interval» секунд.
+
+    Args:
+        - session_factory (Callable): Фабрика сессий основной БД.
+        - interval (float): Пауза между сверками в секундах.
+
+    Returns:
+        - None
+    """
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reconcile_counters(session_factory)
+        except Exception:
+            # Сбой одной сверки не останавливает задачу: следующая повторит проверку.
+            logger.exception('Сверка счётчиков завершилась ошибкой')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Сверка и исправление счётчиков.')
+    parser.add_argument('--batch-size', type=int, default=RECONCILE_BATCH_SIZE,
+                        help='Количество подменю или меню в одной части.')
+    args = parser.parse_args()
+
+    async def reconcile() -> Dict[str, int]:
+        try:
+            return await reconcile_counters(async_session_local, args.batch_size)
+        finally:
+            await async_engine.dispose()
+
+    print(json.dumps(asyncio.run(reconcile()), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Реплики БД для чтения.
+
+GET-ручки читают с реплик по очереди (round robin). Реплики периодически
+проверяются запросом «SELECT 1»: недоступная реплика исключается из очереди
+и возвращается в неё после успешной проверки. Если доступных реплик нет,
+чтение идёт с основной БД.
+
+Ответы, прочитанные с реплики, не записываются в кэш (src.cache): реплика может
+отставать, и устаревший ответ остался бы в кэше после сброса. Кэш заполняют только
+чтения с основной БД, поэтому с репликами нужен общий для всех процессов кэш
+(CACHE_BACKEND=redis): сброс в кэше одного процесса не виден другим.
+"""
+
+import asyncio
+import itertools
+import logging
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from src.configs import REPLICA_HEALTH_CHECK_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Текущий запрос читает с реплики (устанавливает src.database.get_read_db).
+replica_read: ContextVar[bool] = ContextVar('replica_read', default=False)
+
+
+class ReplicaSet:
+    """Набор реплик с проверкой доступности."""
+
+    def __init__(self, engines: List[AsyncEngine]) -> None:
+        self.engines = engines
+        self.healthy: List[AsyncEngine] = list(engines)
+        self._session_factories: Dict[AsyncEngine, sessionmaker] = {
+            engine: sessionmaker(
+                bind=engine.execution_options(postgresql_readonly=True),
+                class_=AsyncSession,
+                expire_on_commit=False,
+            )
+            for engine in engines
+        }
+        self._counter = itertools.count()
+
+    def session_factory(self) -> Optional[sessionmaker]:
+        """Фабрика сессий следующей доступной реплики или None, если таких нет."""
+
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return self._session_factories[healthy[next(self._counter) % len(healthy)]]
+
+    async def is_alive(self, engine: AsyncEngine) -> bool:
+        """Проверяем реплику запросом «SELECT 1»."""
+
+        async def ping() -> None:
+            async with engine.connect() as connection:
+                await connection.execute(text('SELECT 1'))
+
+        try:
+            await asyncio.wait_for(ping(), REPLICA_HEALTH_CHECK_TIMEOUT)
+        except Exception as error:
+            logger.warning('Реплика %s недоступна: %r', engine.url, error)
+            return False
+        return True
+
+    async def check_health(self) -> None:
+        """Проверяем все реплики и обновляем очередь доступных."""
+
+        alive = await asyncio.gather(*(self.is_alive(engine) for engine in self.engines))
+        self.healthy = [engine for engine, ok in zip(self.engines, alive) if ok]
+
+    async def run_health_checks(self, interval: float) -> None:
+        """Проверяем реплики каждые interval секунд (фоновая задача приложения)."""
+
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        """Закрываем соединения всех реплик."""
+
+        await asyncio.gather(*(engine.dispose() for engine in self.engines))
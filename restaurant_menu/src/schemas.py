@@ -1,9 +1,15 @@
 """Pydantic models."""
 
-from typing import Optional, Union
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from typing import (Any, Callable, Dict, List, Optional, Tuple, Union,
+                    get_args, get_origin)
 from uuid import UUID
 
-from pydantic import BaseModel, Field, field_validator
+import orjson
+from pydantic import (BaseModel, Field, TypeAdapter, create_model,
+                      field_validator)
+from src.configs import FAST_SERIALIZATION
 
 
 class DeleteObjPyd(BaseModel):
@@ -123,3 +129,239 @@ class UpdateDishPyd(BaseModel):
     title: Optional[str] = Field(None, description='Название блюда')
     description: Optional[str] = Field(None, description='Описание блюда')
     price: Optional[float] = Field(None, description='Цена блюда')
+
+
+# --- Pydantic models for bulk creation ---
+class BulkConflictPyd(BaseModel):
+    """Pydantic модель объекта, который не создан из-за повтора названия.
+
+    Fields:
+        - index: int
+        - title: str
+        - detail: str
+    """
+
+    index: int = Field(description='Позиция объекта в запросе')
+    title: str = Field(description='Название объекта')
+    detail: str = Field(description='Причина конфликта')
+
+
+class BulkSubmenusPyd(BaseModel):
+    """Pydantic модель результата массового создания подменю.
+
+    Fields:
+        - created: List[DetailedSubmenuInfoPyd]
+        - conflicts: List[BulkConflictPyd]
+    """
+
+    created: List[DetailedSubmenuInfoPyd] = Field(description='Созданные подменю')
+    conflicts: List[BulkConflictPyd] = Field(description='Не созданные подменю')
+
+
+class BulkDishesPyd(BaseModel):
+    """Pydantic модель результата массового создания блюд.
+
+    Fields:
+        - created: List[DetailedDishInfoPyd]
+        - conflicts: List[BulkConflictPyd]
+    """
+
+    created: List[DetailedDishInfoPyd] = Field(description='Созданные блюда')
+    conflicts: List[BulkConflictPyd] = Field(description='Не созданные блюда')
+
+
+# --- Pydantic models for service endpoints ---
+class PoolStatusPyd(BaseModel):
+    """Pydantic модель состояния пула соединений с БД.
+
+    Fields:
+        - pool_size: int
+        - max_overflow: int
+        - checked_out: int
+        - idle: int
+        - overflow: int
+        - checkouts: int
+        - checkout_timeouts: int
+        - checkout_wait_avg_ms: float
+        - checkout_wait_max_ms: float
+    """
+
+    pool_size: int = Field(description='Размер пула')
+    max_overflow: int = Field(description='Максимум соединений сверх размера пула')
+    checked_out: int = Field(description='Выданные соединения')
+    idle: int = Field(description='Свободные соединения в пуле')
+    overflow: int = Field(description='Открытые соединения сверх размера пула')
+    checkouts: int = Field(description='Количество выдач соединений')
+    checkout_timeouts: int = Field(description='Количество ошибок ожидания соединения')
+    checkout_wait_avg_ms: float = Field(description='Среднее время ожидания соединения')
+    checkout_wait_max_ms: float = Field(description='Максимальное время ожидания соединения')
+
+
+class SlowQueryPyd(BaseModel):
+    """Pydantic модель записи журнала медленных SQL-запросов.
+
+    Fields:
+        - statement: str
+        - parameters: str
+        - duration_ms: float
+        - caller: str | None
+        - plan: str | None
+    """
+
+    statement: str = Field(description='Текст запроса')
+    parameters: str = Field(description='Типы параметров запроса (без значений)')
+    duration_ms: float = Field(description='Время выполнения запроса')
+    caller: Optional[str] = Field(description='Функция CRUD-слоя, выполнившая запрос')
+    plan: Optional[str] = Field(description='План EXPLAIN (ANALYZE, BUFFERS), если получен')
+
+
+# --- Pydantic models for Menu tree ---
+class SubmenuTreePyd(DetailedSubmenuInfoPyd):
+    """Pydantic модель подменю со списком блюд.
+
+    Fields:
+        - id: UUID
+        - title: str
+        - description: str
+        - dishes_count: int
+        - dishes: List[DetailedDishInfoPyd]
+    """
+
+    dishes: List[DetailedDishInfoPyd] = Field(description='Блюда подменю')
+
+
+class MenuTreePyd(DetailedMenuInfoPyd):
+    """Pydantic модель меню со списком подменю и блюд.
+
+    Fields:
+        - id: UUID
+        - title: str
+        - description: str
+        - submenus_count: int
+        - dishes_count: int
+        - submenus: List[SubmenuTreePyd]
+    """
+
+    submenus: List[SubmenuTreePyd] = Field(description='Подменю с блюдами')
+
+
+# --- Serialization ---
+@lru_cache
+def _type_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+@lru_cache
+def _partial_schema(schema: Any, fields: Tuple[str, ...]) -> Any:
+    """Модель, в которой поля не из fields необязательны (данные БД без этих колонок)."""
+
+    if get_origin(schema) is list:
+        return List[_partial_schema(get_args(schema)[0], fields)]
+
+    return create_model(f'{schema.__name__}Fields', __base__=schema, **{
+        name: (Optional[field.annotation], None)
+        for name, field in schema.model_fields.items() if name not in fields
+    })
+
+
+def _field_converter(model: Any, name: str, annotation: Any) -> Optional[Callable]:
+    """Преобразование значения поля без проверки: вложенная модель или валидаторы поля."""
+
+    if get_origin(annotation) is list or (
+        isinstance(annotation, type) and issubclass(annotation, BaseModel)
+    ):
+        return _serializer(annotation)
+
+    validators = [
+        decorator.func
+        for decorator in model.__pydantic_decorators__.field_validators.values()
+        if name in decorator.info.fields or '*' in decorator.info.fields
+    ]
+    if not validators:
+        return None
+    if len(validators) == 1:
+        return validators[0]
+
+    def convert(value: Any) -> Any:
+        for validator in validators:
+            value = validator(value)
+        return value
+
+    return convert
+
+
+@lru_cache
+def _serializer(
+        schema: Any,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> Callable[[Any], Any]:
+    """Собираем функцию, которая строит словари ответа по Pydantic модели.
+
+    Значения берутся из ORM объектов, строк SQL-запроса (Row) или словарей
+    без проверки типов: данные уже прошли проверку при записи в БД.
+    Поля выводятся в порядке модели, к ним применяются валидаторы поля
+    (например, check_price), поэтому JSON совпадает с JSON Pydantic.
+    Если переданы fields, выводятся только эти поля.
+    """
+
+    if get_origin(schema) is list:
+        serialize_item = _serializer(get_args(schema)[0], fields)
+        return lambda items: [serialize_item(item) for item in items]
+
+    names = tuple(name for name in schema.model_fields if fields is None or name in fields)
+    converters: List[Tuple[str, Callable]] = [
+        (name, converter) for name, field in schema.model_fields.items()
+        if name in names
+        and (converter := _field_converter(schema, name, field.annotation)) is not None
+    ]
+    # attrgetter и itemgetter читают все поля одним вызовом. Для одного поля они
+    # вернули бы значение, а не кортеж, поэтому поле повторяется (zip отбросит повтор).
+    get_attrs = attrgetter(*names, names[0]) if len(names) == 1 else attrgetter(*names)
+    get_items = itemgetter(*names, names[0]) if len(names) == 1 else itemgetter(*names)
+
+    def serialize(obj: Any) -> Dict[str, Any]:
+        values = dict(zip(names, get_items(obj) if isinstance(obj, dict) else get_attrs(obj)))
+        for name, convert in converters:
+            if values[name] is not None:
+                values[name] = convert(values[name])
+        return values
+
+    return serialize
+
+
+def _json_default(value: Any) -> str:
+    """Типы, которые orjson не сериализует сам (UUID драйвера asyncpg)."""
+
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f'Type is not JSON serializable: {type(value).__name__}')
+
+
+def dump_json(data: Any, schema: Any, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    """Сериализуем данные в JSON по Pydantic модели ответа.
+
+    При FAST_SERIALIZATION словари ответа строятся сразу из данных БД и
+    кодируются orjson, иначе данные проверяются Pydantic моделью.
+    JSON в обоих случаях одинаковый.
+
+    Args:
+        - data (Any): ORM объект, строка запроса, словарь или список таких объектов.
+        - schema (Any): Pydantic модель ответа (или List[модель]).
+        - fields (Tuple[str] | None): Поля ответа (src.fieldsets), None — все поля.
+
+    Returns:
+        - bytes: JSON, такой же, как формирует FastAPI по response_model.
+    """
+
+    if FAST_SERIALIZATION:
+        return orjson.dumps(_serializer(schema, fields)(data), default=_json_default)
+
+    if fields is None:
+        adapter = _type_adapter(schema)
+        return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+    adapter = _type_adapter(_partial_schema(schema, fields))
+    include = {'__all__': set(fields)} if get_origin(schema) is list else set(fields)
+    return adapter.dump_json(
+        adapter.validate_python(data, from_attributes=True), include=include
+    )
@@ -0,0 +1,59 @@
+import hmac
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src import metrics, schemas, slow_queries
+from src.configs import SERVICE_TOKEN
+from src.database import get_engine, pool_status, replicas
+
+
+def check_service_token(authorization: Optional[str] = Header(None)) -> None:
+    """Проверяем токен служебных ручек: «Authorization: Bearer <SERVICE_TOKEN>».
+
+    Без SERVICE_TOKEN служебные ручки выключены и отвечают 404.
+    """
+
+    if not SERVICE_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Not Found')
+
+    scheme, _, token = (authorization or '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(
+        token.encode(), SERVICE_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='service token required',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+
+
+service_router = APIRouter(dependencies=[Depends(check_service_token)])
+
+
+@service_router.get('/api/v1/pool', response_model=schemas.PoolStatusPyd,
+                    summary='Состояние пула соединений', tags=['Служебное'])
+async def get_pool_status(engine: AsyncEngine = Depends(get_engine)) -> Dict[str, Any]:
+    """Выводим занятые, свободные и сверхлимитные соединения и время ожидания соединения."""
+
+    return pool_status(engine)
+
+
+@service_router.get('/api/v1/slow-queries', response_model=List[schemas.SlowQueryPyd],
+                    summary='Медленные SQL-запросы', tags=['Служебное'])
+async def get_slow_queries() -> List[Dict[str, Any]]:
+    """Выводим последние медленные SQL-запросы, новые — первыми."""
+
+    return list(reversed(slow_queries.records))
+
+
+@service_router.get('/metrics', response_class=Response,
+                    summary='Метрики в формате Prometheus', tags=['Служебное'])
+async def get_metrics(engine: AsyncEngine = Depends(get_engine)) -> Response:
+    """Выводим метрики запросов, SQL-запросов, пулов соединений и кэша."""
+
+    metrics.observe_pool('primary', pool_status(engine))
+    for number, replica in enumerate(replicas.engines):
+        metrics.observe_pool(f'replica{number}', pool_status(replica))
+
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
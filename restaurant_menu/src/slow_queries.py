@@ -0,0 +1,228 @@
+"""Журнал медленных SQL-запросов и их планов.
+
+Запрос дольше SLOW_QUERY_THRESHOLD_MS записывается в лог: текст запроса, типы
+параметров (без значений), время и функция CRUD-слоя (crud.py или queries.py),
+которая его выполнила. Последние SLOW_QUERY_LOG_SIZE записей доступны
+по ручке «/api/v1/slow-queries» (с токеном SERVICE_TOKEN).
+
+При SLOW_QUERY_EXPLAIN медленный SELECT выполняется ещё раз под
+EXPLAIN (ANALYZE, BUFFERS) в отдельной фоновой задаче и отдельном соединении,
+план сохраняется в запись журнала. Значения в условиях плана (строки и числа
+в «Index Cond», «Filter» и т. п.) заменяются на «?» (strip_literals), а сам план
+в лог не пишется. EXPLAIN запускается для доли запросов
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE и не чаще раза в SLOW_QUERY_EXPLAIN_INTERVAL секунд.
+Запросы на запись повторно не выполняются: ANALYZE выполнил бы их по-настоящему.
+"""
+
+import asyncio
+import contextvars
+import logging
+import random
+import re
+import sys
+import time
+from collections import deque
+from types import FrameType
+from typing import Any, Deque, Dict, Iterator, Optional, Set
+
+import greenlet
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.configs import (SLOW_QUERY_EXPLAIN, SLOW_QUERY_EXPLAIN_INTERVAL,
+                         SLOW_QUERY_EXPLAIN_SAMPLE_RATE, SLOW_QUERY_LOG_SIZE,
+                         SLOW_QUERY_THRESHOLD_MS)
+
+logger = logging.getLogger(__name__)
+
+# Модули CRUD-слоя, функции которых указываются как источник запроса.
+CRUD_MODULES = ('crud', 'queries')
+
+# Последние медленные запросы, новые — в конце.
+records: Deque[Dict[str, Any]] = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+# Запущенные задачи EXPLAIN (ссылки держим, чтобы задачи не удалил сборщик мусора).
+explain_tasks: Set[asyncio.Task] = set()
+
+_last_explain = float('-inf')
+
+# Строка плана с условием: «Index Cond: ...», «Filter: ...», «Hash Cond: ...»
+# (но не счётчик «Rows Removed by Filter: 3»).
+_CONDITION_LINE = re.compile(
+    r'^(\s*(?:->\s*)?(?!\s|Rows Removed)[A-Za-z -]*(?:Cond|Filter|Key)): (.*)$'
+)
+# Строковые константы (кавычки внутри удваиваются) и числа вне имён и «$1».
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.$])-?\d+(?:\.\d+)?(?![\w.])')
+
+
+def _frames() -> Iterator[FrameType]:
+    """Кадры стека вызовов, включая корутину, которая ожидает запрос.
+
+    Асинхронный SQLAlchemy выполняет запрос в дочернем greenlet, поэтому стек
+    продолжается кадрами родительского greenlet.
+    """
+
+    frame: Optional[FrameType] = sys._getframe(1)
+    current: Optional[greenlet.greenlet] = greenlet.getcurrent()
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+        if frame is None and current is not None and current.parent is not None:
+            current = current.parent
+            frame = current.gr_frame
+
+
+def calling_function() -> Optional[str]:
+    """Функция CRUD-слоя, которая выполняет запрос («src.menus.crud.get_menu_by_id»).
+
+    Если запрос выполнен не из crud.py или queries.py, возвращается ближайшая
+    функция приложения (модули «src.»), иначе None.
+    """
+
+    fallback: Optional[str] = None
+    for frame in _frames():
+        module: str = frame.f_globals.get('__name__', '')
+        if not module.startswith('src.') or module == __name__:
+            continue
+        name = f'{module}.{frame.f_code.co_name}'
+        if module.rsplit('.', 1)[-1] in CRUD_MODULES:
+            return name
+        if fallback is None and module != 'src.instrumentation':
+            fallback = name
+    return fallback
+
+
+def _shape(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return f'[{", ".join(_shape(item) for item in value)}]'
+    if isinstance(value, dict):
+        return '{' + ', '.join(f'{key}: {_shape(item)}' for key, item in value.items()) + '}'
+    return type(value).__name__
+
+
+def parameter_shapes(parameters: Any, executemany: bool = False) -> str:
+    """Типы параметров запроса без значений: «(UUID, str, int)».
+
+    Args:
+        - parameters (Any): Параметры запроса (кортеж, словарь или их список).
+        - executemany (bool): Запрос выполнен для списка наборов параметров.
+
+    Returns:
+        - str: Типы параметров; для executemany — количество наборов и типы первого.
+    """
+
+    if executemany:
+        parameters = list(parameters)
+        if not parameters:
+            return '0 x ()'
+        return f'{len(parameters)} x ({_shape(parameters[0])[1:-1]})'
+    if isinstance(parameters, (list, tuple)):
+        return f'({_shape(parameters)[1:-1]})'
+    return _shape(parameters)
+
+
+def _should_explain(statement: str) -> bool:
+    """Выборка и ограничение частоты EXPLAIN: только SELECT."""
+
+    global _last_explain
+
+    if not SLOW_QUERY_EXPLAIN or statement.lstrip()[:6].upper() != 'SELECT':
+        return False
+    now = time.monotonic()
+    if now - _last_explain < SLOW_QUERY_EXPLAIN_INTERVAL:
+        return False
+    if random.random() >= SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+        return False
+    _last_explain = now
+    return True
+
+
+def strip_literals(plan: str) -> str:
+    """Заменяем значения в условиях плана на «?».
+
+    Строки и числа в условиях («Index Cond: (id = '…'::uuid)») — это значения
+    параметров запроса. Оценки, время и счётчики буферов остаются.
+
+    Args:
+        - plan (str): План EXPLAIN в текстовом формате.
+
+    Returns:
+        - str: План без значений параметров.
+    """
+
+    lines = []
+    for line in plan.splitlines():
+        match = _CONDITION_LINE.match(line)
+        if match is not None:
+            condition = _NUMBER_LITERAL.sub('?', _STRING_LITERAL.sub("'?'", match[2]))
+            line = f'{match[1]}: {condition}'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+async def explain(engine: AsyncEngine, statement: str, parameters: Any, record: Dict) -> None:
+    """Выполняем запрос под EXPLAIN (ANALYZE, BUFFERS) и сохраняем план без значений.
+
+    Args:
+        - engine (AsyncEngine): Движок, на котором выполнялся запрос.
+        - statement (str): Текст запроса.
+        - parameters (Any): Параметры запроса.
+        - record (Dict): Запись журнала медленных запросов.
+    """
+
+    try:
+        async with engine.connect() as connection:
+            result = await connection.exec_driver_sql(
+                f'EXPLAIN (ANALYZE, BUFFERS) {statement}', parameters
+            )
+            record['plan'] = strip_literals('\n'.join(row[0] for row in result))
+            # Транзакция не фиксируется: соединение закрывается с ROLLBACK.
+    except Exception as error:
+        logger.warning('Не удалось получить план медленного запроса: %r', error)
+
+
+def observe(
+    conn: Connection,
+    statement: str,
+    parameters: Any,
+    executemany: bool,
+    duration: float,
+) -> None:
+    """Записываем запрос в журнал, если он медленнее порога (вызывается событием движка).
+
+    Args:
+        - conn (Connection): Соединение, в котором выполнен запрос.
+        - statement (str): Текст запроса.
+        - parameters (Any): Параметры запроса.
+        - executemany (bool): Запрос выполнен для списка наборов параметров.
+        - duration (float): Время выполнения в секундах.
+    """
+
+    if not SLOW_QUERY_THRESHOLD_MS or duration * 1000 < SLOW_QUERY_THRESHOLD_MS:
+        return
+    if statement.lstrip().upper().startswith('EXPLAIN'):
+        return
+
+    record: Dict[str, Any] = {
+        'statement': statement,
+        'parameters': parameter_shapes(parameters, executemany),
+        'duration_ms': round(duration * 1000, 2),
+        'caller': calling_function(),
+        'plan': None,
+    }
+    records.append(record)
+    logger.warning(
+        'Медленный запрос: caller=%s duration_ms=%s parameters=%s statement=%s',
+        record['caller'], record['duration_ms'], record['parameters'], statement,
+        extra={key: value for key, value in record.items() if key != 'plan'},
+    )
+
+    if not executemany and _should_explain(statement):
+        # Задача создаётся в пустом контексте: запросы EXPLAIN не учитываются
+        # в статистике HTTP-запроса (instrumentation.request_stats).
+        task = contextvars.Context().run(
+            asyncio.get_running_loop().create_task,
+            explain(AsyncEngine(conn.engine), statement, parameters, record),
+        )
+        explain_tasks.add(task)
+        task.add_done_callback(explain_tasks.discard)
@@ -0,0 +1,85 @@
+"""Потоковый вывод списков (NDJSON или JSON-массив) из серверного курсора БД.
+
+Строки читаются из курсора частями по STREAM_CHUNK_SIZE и сразу отправляются клиенту,
+поэтому память не зависит от размера списка.
+
+Формат выбирается параметром «stream» (ndjson, json) или заголовком
+«Accept: application/x-ndjson».
+"""
+
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+from fastapi import Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.configs import STREAM_CHUNK_SIZE
+from src.schemas import dump_json
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+def get_stream_format(
+    request: Request,
+    stream: Optional[str] = Query(
+        None, pattern='^(ndjson|json)$',
+        description=f'Потоковый вывод: ndjson или json (или Accept: {NDJSON_MEDIA_TYPE}).',
+    ),
+) -> Optional[str]:
+    """Зависимость FastAPI: формат потокового вывода или None для обычного ответа."""
+
+    if stream is not None:
+        return stream
+    if NDJSON_MEDIA_TYPE in request.headers.get('accept', ''):
+        return 'ndjson'
+    return None
+
+
+async def _ndjson(chunks: AsyncIterator[List[bytes]]) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        yield b''.join(item + b'\n' for item in chunk)
+
+
+async def _json_array(chunks: AsyncIterator[List[bytes]]) -> AsyncIterator[bytes]:
+    prefix = b'['
+    async for chunk in chunks:
+        yield prefix + b','.join(chunk)
+        prefix = b','
+    yield b'[]' if prefix == b'[' else b']'
+
+
+def stream_response(
+        session_factory: Callable[[], AsyncSession],
+        query: Select,
+        schema: Any,
+        stream_format: str,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> StreamingResponse:
+    """Формируем потоковый ответ по запросу списка.
+
+    Args:
+        - session_factory (Callable): Фабрика сессий (сессия запроса к этому моменту закрыта).
+        - query (Select): Запрос списка ORM объектов или строк.
+        - schema (Any): Pydantic модель одного элемента списка.
+        - stream_format (str): ndjson или json.
+        - fields (Tuple[str] | None): Поля ответа, None — все поля.
+
+    Returns:
+        - StreamingResponse: Потоковый ответ.
+    """
+
+    async def chunks() -> AsyncIterator[List[bytes]]:
+        async with session_factory() as session:
+            result = await session.stream(
+                query.execution_options(yield_per=STREAM_CHUNK_SIZE)
+            )
+            if len(query.column_descriptions) == 1:
+                result = result.scalars()
+            async for partition in result.partitions():
+                # Строки не попадают в identity map (а ORM объекты хранятся в нём по
+                # слабым ссылкам): после отправки части они освобождаются.
+                yield [dump_json(obj, schema, fields) for obj in partition]
+
+    if stream_format == 'ndjson':
+        return StreamingResponse(_ndjson(chunks()), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(_json_array(chunks()), media_type='application/json')
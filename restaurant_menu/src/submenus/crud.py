@@ -1,12 +1,13 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import delete, select
+from sqlalchemy import delete, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from src import models
-from src.menus.crud import get_menu_by_id
+from src import bulk, cache, models, schemas
+from src.menus.crud import change_menu_counters, get_menu_by_id
+from src.submenus.queries import get_submenu
 
 
 async def create_submenu(
@@ -17,6 +18,8 @@ async def create_submenu(
 ) -> models.SubMenu:
     """Создаём новое подменю, для определённого, по полю «id», меню.
 
+    Подменю и счётчик подменю в меню сохраняются в одной транзакции.
+
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
         - menu_id (UUID): id меню.
@@ -31,68 +34,86 @@ async def create_submenu(
 
     try:
         db.add(new_submenu)
-        await db.commit()
-        await db.refresh(new_submenu)
+        await db.flush()
     except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Такое подменю уже зарегестрировано.'
         )
 
-    menu = await get_menu_by_id(db=db, menu_id=menu_id)
-    menu.submenus_count += 1
+    await change_menu_counters(db=db, menu_id=menu_id, submenus=1)
     await db.commit()
 
+    await cache.backend.delete(
+        cache.menus_key(), cache.menu_key(menu_id), cache.submenus_key(menu_id),
+        *cache.tree_keys(menu_id),
+    )
+
     return new_submenu
 
 
-async def get_submenu_by_id(
+async def create_submenus(
         db: AsyncSession,
         menu_id: UUID,
-        submenu_id: UUID,
-) -> Optional[models.SubMenu]:
-    """Получаем один объект из модели «SubMenu» по полю «id».
+        submenus: List[schemas.BaseMenuPyd],
+) -> Dict[str, List[Any]]:
+    """Создаём несколько подменю для определённого меню.
 
-    - Проверяем подменю на существование.
-    - Проверяем принадлежит ли подменю, к переданному id родителя(меню).
+    Подменю вставляются многострочным INSERT, счётчик подменю в меню меняется
+    один раз на весь запрос. Подменю с уже существующим названием не создаются
+    и возвращаются как конфликты, остальные сохраняются в одной транзакции.
 
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
         - menu_id (UUID): id меню.
-        - submenu_id (UUID): id подменю.
+        - submenus (List[BaseMenuPyd]): Подменю для создания.
 
     Returns:
-        - SubMenu | None: Объект подменю, если найден.
+        - Dict[str, List]: Созданные подменю (created) и конфликты (conflicts).
     """
 
-    submenu = await db.execute(select(models.SubMenu).where(models.SubMenu.id == submenu_id))
-    submenu = submenu.scalars().one_or_none()
+    try:
+        created = await bulk.insert_ignoring_conflicts(db, models.SubMenu, [
+            {**submenu.model_dump(), 'menu_id': menu_id, 'dishes_count': 0}
+            for submenu in submenus
+        ])
+    except IntegrityError:
+        # Внешний ключ: меню не существует.
+        await db.rollback()
+        await get_menu_by_id(db=db, menu_id=menu_id)
+        raise
+
+    created, conflicts = bulk.split_created(
+        submenus, created, detail='Такое подменю уже зарегестрировано.'
+    )
+    await change_menu_counters(db=db, menu_id=menu_id, submenus=len(created))
+    await db.commit()
 
-    if submenu is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='submenu not found',
-        )
-    if submenu.menu_id != menu_id:
-        raise HTTPException(
-            status_code=404,
-            detail=f'Подменю с id {submenu_id} не принадлежит к меню с id {menu_id}.'
-        )
+    await cache.backend.delete(
+        cache.menus_key(), cache.menu_key(menu_id), cache.submenus_key(menu_id),
+        *cache.tree_keys(menu_id),
+    )
 
-    return submenu
+    return {'created': created, 'conflicts': conflicts}
 
 
 async def update_submenu_by_id(
         db: AsyncSession,
-        submenu: models.SubMenu,
+        menu_id: UUID,
+        submenu_id: UUID,
         title: Optional[str],
         description: Optional[str],
 ) -> models.SubMenu:
     """Обновляем объект модели «SubMenu» (название или описание).
 
+    Проверка подменю и обновление выполняются одним запросом (UPDATE ... RETURNING).
+    Если подменю не обновлено, причину ошибки 404 выясняем отдельным запросом,
+    а если он её не нашёл — отвечаем «submenu not found».
+
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
-        - submenu (models.SubMenu): Объект подменю.
+        - menu_id (UUID): id меню.
+        - submenu_id (UUID): id подменю.
         - title (str | None): Новое название.
         - description (str | None): Новое описание.
 
@@ -100,40 +121,65 @@ async def update_submenu_by_id(
         - SubMenu : Объект подменю.
     """
 
-    if title or description:
-        if title:
-            submenu.title = title
-        if description:
-            submenu.description = description
-    else:
+    values: Dict[str, str] = {}
+    if title:
+        values['title'] = title
+    if description:
+        values['description'] = description
+
+    if not values:
+        # Проверяем подменю, чтобы сохранить порядок ошибок: сначала 404, потом 400.
+        await get_submenu(db=db, menu_id=menu_id, submenu_id=submenu_id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Ни одно из значений (title, description) не предоставлено для обновления.'
         )
 
     try:
+        updated = await db.execute(
+            update(models.SubMenu)
+            .where(models.SubMenu.id == submenu_id, models.SubMenu.menu_id == menu_id)
+            .values(**values, version=models.entity_version.next_value())
+            .returning(models.SubMenu)
+        )
+        submenu: Optional[models.SubMenu] = updated.scalar_one_or_none()
         await db.commit()
-        await db.refresh(submenu)
     except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Такое подменю уже зарегестрировано.'
         )
 
+    if submenu is None:
+        await get_submenu(db=db, menu_id=menu_id, submenu_id=submenu_id)
+        # Подменю могло появиться после UPDATE: оно всё равно не обновлено.
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='submenu not found',
+        )
+
+    await cache.backend.delete(
+        cache.submenus_key(menu_id), cache.submenu_key(menu_id, submenu_id),
+        *cache.tree_keys(menu_id),
+    )
+
     return submenu
 
 
 async def delete_submenu_by_id(
         db: AsyncSession,
-        submenu: models.SubMenu,
         menu_id: UUID,
         submenu_id: UUID,
 ) -> None:
     """Удаляем один объект из модели «SubMenu» по полю «id».
 
+    Удаление и изменение счётчиков меню выполняются в одной транзакции.
+    Количество блюд подменю берётся из удалённой строки (DELETE ... RETURNING).
+    Если подменю не удалено, причину ошибки 404 выясняем отдельным запросом,
+    а если он её не нашёл — отвечаем «submenu not found».
+
     Args:
         - db (AsyncSession): Асинхронная сессия для подключения к БД.
-        - submenu: Объект подменю.
         - menu_id (UUID): id меню.
         - submenu_id (UUID): id подменю.
 
@@ -141,10 +187,29 @@ async def delete_submenu_by_id(
         - None
     """
 
-    await db.execute(delete(models.SubMenu).where(models.SubMenu.id == submenu_id))
-    await db.commit()
+    deleted = await db.execute(
+        delete(models.SubMenu)
+        .where(models.SubMenu.id == submenu_id, models.SubMenu.menu_id == menu_id)
+        .returning(models.SubMenu.dishes_count)
+    )
+    dishes_count: Optional[int] = deleted.scalar_one_or_none()
 
-    menu = await get_menu_by_id(db=db, menu_id=menu_id)
-    menu.submenus_count -= 1
-    menu.dishes_count -= submenu.dishes_count
+    if dishes_count is None:
+        await get_submenu(db=db, menu_id=menu_id, submenu_id=submenu_id)
+        # Подменю могло появиться после DELETE: оно всё равно не удалено.
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='submenu not found',
+        )
+
+    await change_menu_counters(
+        db=db, menu_id=menu_id, submenus=-1, dishes=-dishes_count
+    )
     await db.commit()
+
+    # Сбрасываем подменю вместе с его блюдами и счётчики родительского меню.
+    await cache.backend.delete(
+        cache.menus_key(), cache.menu_key(menu_id), cache.submenus_key(menu_id),
+        *cache.tree_keys(menu_id),
+    )
+    await cache.backend.delete_prefix(cache.submenu_key(menu_id, submenu_id))
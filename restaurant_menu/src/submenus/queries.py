@@ -0,0 +1,168 @@
+"""Запросы чтения подменю для GET-ручек.
+
+Запросы выбирают только колонки ответа (SQLAlchemy Core) и возвращают строки (Row):
+ORM объекты, identity map и отслеживание изменений для чтения не нужны.
+"""
+
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row, Select, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import etags, fieldsets, models
+from src.pagination import PageParams
+
+# Колонки ответа DetailedSubmenuInfoPyd и версия строки для ETag.
+SUBMENU_COLUMNS = (
+    models.SubMenu.id,
+    models.SubMenu.title,
+    models.SubMenu.description,
+    models.SubMenu.dishes_count,
+    models.SubMenu.version,
+)
+
+
+def select_all_submenus(menu_id: UUID, fields: Optional[Tuple[str, ...]] = None) -> Select:
+    """Запрос всех подменю определённого меню (колонки полей fields), без сортировки."""
+
+    return (
+        select(*fieldsets.select_columns(SUBMENU_COLUMNS, fields))
+        .where(models.SubMenu.menu_id == menu_id)
+    )
+
+
+async def get_all_submenus(
+        db: AsyncSession,
+        menu_id: UUID,
+        page: Optional[PageParams] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> List[Row]:
+    """Получаем все подменю определённого меню, или одну страницу.
+
+    Меню проверяется тем же запросом: подменю присоединяются к меню через LEFT JOIN,
+    поэтому для существующего меню всегда есть хотя бы одна строка.
+    Подменю отсортированы по «id».
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
+        - page (PageParams | None): Параметры страницы (до limit + 1 объектов).
+        - fields (Tuple[str] | None): Поля ответа, None — все поля.
+
+    Returns:
+        - List[Row]: Строки подменю.
+    """
+
+    # Условие страницы ставим в ON, а не в WHERE, чтобы не потерять строку меню.
+    join_on = models.SubMenu.menu_id == models.Menu.id
+    if page is not None and page.after is not None:
+        join_on = and_(join_on, models.SubMenu.id > page.after)
+
+    query = (
+        select(
+            models.Menu.id.label('menu_id'), *fieldsets.select_columns(SUBMENU_COLUMNS, fields)
+        )
+        .select_from(models.Menu)
+        .outerjoin(models.SubMenu, join_on)
+        .where(models.Menu.id == menu_id)
+        .order_by(models.SubMenu.id)
+    )
+    if page is not None:
+        query = query.limit(page.limit + 1)
+
+    rows = (await db.execute(query)).all()
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='menu not found',
+        )
+
+    return [row for row in rows if row.id is not None]
+
+
+async def get_submenus_etag(db: AsyncSession, menu_id: UUID) -> Optional[str]:
+    """Получаем ETag списка подменю агрегатным запросом по версиям подменю.
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
+
+    Returns:
+        - str | None: ETag списка, None — меню не существует.
+    """
+
+    versions: Optional[Row] = (await db.execute(
+        select(*etags.version_aggregates(models.SubMenu.version))
+        .select_from(models.Menu)
+        .outerjoin(models.SubMenu, models.SubMenu.menu_id == models.Menu.id)
+        .where(models.Menu.id == menu_id)
+        .group_by(models.Menu.id)
+    )).one_or_none()
+
+    if versions is None:
+        return None
+    return etags.make_etag(*versions)
+
+
+async def get_submenu_etag(
+        db: AsyncSession,
+        menu_id: UUID,
+        submenu_id: UUID,
+) -> Optional[str]:
+    """Получаем ETag подменю по его версии.
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
+        - submenu_id (UUID): id подменю.
+
+    Returns:
+        - str | None: ETag подменю, None — подменю нет в этом меню.
+    """
+
+    version: Optional[int] = await db.scalar(
+        select(models.SubMenu.version)
+        .where(models.SubMenu.id == submenu_id, models.SubMenu.menu_id == menu_id)
+    )
+    return etags.version_etag(version)
+
+
+async def get_submenu(
+        db: AsyncSession,
+        menu_id: UUID,
+        submenu_id: UUID,
+        fields: Optional[Tuple[str, ...]] = None,
+) -> Row:
+    """Получаем подменю по «id».
+
+    - Проверяем подменю на существование.
+    - Проверяем принадлежит ли подменю, к переданному id родителя(меню).
+
+    Args:
+        - db (AsyncSession): Асинхронная сессия для подключения к БД.
+        - menu_id (UUID): id меню.
+        - submenu_id (UUID): id подменю.
+        - fields (Tuple[str] | None): Поля ответа, None — все поля.
+
+    Returns:
+        - Row: Строка подменю, если найдено.
+    """
+
+    submenu: Optional[Row] = (await db.execute(
+        select(models.SubMenu.menu_id, *fieldsets.select_columns(SUBMENU_COLUMNS, fields))
+        .where(models.SubMenu.id == submenu_id)
+    )).one_or_none()
+
+    if submenu is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='submenu not found',
+        )
+    if submenu.menu_id != menu_id:
+        raise HTTPException(
+            status_code=404,
+            detail=f'Подменю с id {submenu_id} не принадлежит к меню с id {menu_id}.'
+        )
+
+    return submenu
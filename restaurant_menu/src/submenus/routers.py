@@ -1,11 +1,14 @@
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Body, Depends, Path, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from src import models, schemas
-from src.database import get_db
-from src.submenus import crud
+from sqlalchemy.orm import sessionmaker
+from src import cache, etags, fieldsets, models, pagination, schemas, streaming
+from src.configs import BULK_MAX_ITEMS
+from src.database import get_db, get_read_db, get_read_session_factory
+from src.menus.crud import get_menu_by_id
+from src.submenus import crud, queries
 
 submenu_router = APIRouter()
 
@@ -24,18 +27,62 @@ async def new_submenu(
     return await crud.create_submenu(db=db, menu_id=menu_id, **submenu_data)
 
 
+@submenu_router.post('/api/v1/menus/{menu_id}/submenus/bulk',
+                     response_model=schemas.BulkSubmenusPyd,
+                     status_code=201, summary='Создать несколько подменю', tags=['Подменю'])
+async def new_submenus(
+    submenus: List[schemas.BaseMenuPyd] = Body(..., min_length=1, max_length=BULK_MAX_ITEMS),
+    menu_id: UUID = Path(..., description='id меню'),
+    db: AsyncSession = Depends(get_db),
+) -> Dict[str, List]:
+    """Создаём несколько подменю, для определённого меню. Повторы названий — конфликты."""
+
+    return await crud.create_submenus(db=db, menu_id=menu_id, submenus=submenus)
+
+
 @submenu_router.get('/api/v1/menus/{menu_id}/submenus',
                     response_model=List[schemas.DetailedSubmenuInfoPyd],
                     summary='Список подменю', tags=['Подменю'])
 async def all_submenus(
     menu_id: UUID = Path(..., description='id меню'),
-    db: AsyncSession = Depends(get_db),
-) -> List[Optional[models.SubMenu]]:
-    """Выводим список со всеми подменю, для определённого меню."""
-
-    menu: Optional[models.Menu] = await crud.get_menu_by_id(db=db, menu_id=menu_id)
-
-    return menu.submenus
+    page: Optional[pagination.PageParams] = Depends(pagination.get_page_params),
+    stream: Optional[str] = Depends(streaming.get_stream_format),
+    fields: Optional[Tuple[str, ...]] = Depends(
+        fieldsets.get_fields(schemas.DetailedSubmenuInfoPyd)
+    ),
+    if_none_match: Optional[str] = Depends(etags.get_if_none_match),
+    session_factory: sessionmaker = Depends(get_read_session_factory),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """Выводим список со всеми подменю, для определённого меню, страницу списка или поток."""
+
+    schema = List[schemas.DetailedSubmenuInfoPyd]
+
+    if stream is not None:
+        # Проверяем меню до начала потока, чтобы вернуть 404.
+        await get_menu_by_id(db=db, menu_id=menu_id)
+        return streaming.stream_response(
+            session_factory,
+            queries.select_all_submenus(menu_id, fields).order_by(models.SubMenu.id),
+            schemas.DetailedSubmenuInfoPyd,
+            stream,
+            fields,
+        )
+
+    if page is None:
+        return await cache.cached_response(
+            key=cache.submenus_key(menu_id),
+            loader=lambda: queries.get_all_submenus(db=db, menu_id=menu_id, fields=fields),
+            schema=schema,
+            etag_loader=lambda: queries.get_submenus_etag(db=db, menu_id=menu_id),
+            if_none_match=if_none_match,
+            fields=fields,
+        )
+
+    submenus = await queries.get_all_submenus(
+        db=db, menu_id=menu_id, page=page, fields=fields
+    )
+    return pagination.page_response(submenus, page, schema, fields)
 
 
 @submenu_router.get('/api/v1/menus/{menu_id}/submenus/{submenu_id}',
@@ -44,16 +91,27 @@ async def all_submenus(
 async def get_submenu(
     menu_id: UUID = Path(..., description='id меню'),
     submenu_id: UUID = Path(..., description='id подменю'),
-    db: AsyncSession = Depends(get_db),
-) -> Optional[models.SubMenu]:
+    fields: Optional[Tuple[str, ...]] = Depends(
+        fieldsets.get_fields(schemas.DetailedSubmenuInfoPyd)
+    ),
+    if_none_match: Optional[str] = Depends(etags.get_if_none_match),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
     """Выводим определённое подменю."""
 
-    submenu: Optional[models.SubMenu] = await crud.get_submenu_by_id(
-        db=db, menu_id=menu_id, submenu_id=submenu_id
+    return await cache.cached_response(
+        key=cache.submenu_key(menu_id, submenu_id),
+        loader=lambda: queries.get_submenu(
+            db=db, menu_id=menu_id, submenu_id=submenu_id, fields=fields
+        ),
+        schema=schemas.DetailedSubmenuInfoPyd,
+        etag_loader=lambda: queries.get_submenu_etag(
+            db=db, menu_id=menu_id, submenu_id=submenu_id
+        ),
+        if_none_match=if_none_match,
+        fields=fields,
     )
 
-    return submenu
-
 
 @submenu_router.patch('/api/v1/menus/{menu_id}/submenus/{submenu_id}',
                       response_model=schemas.DetailedSubmenuInfoPyd,
@@ -66,12 +124,8 @@ async def update_submenu(
 ) -> models.SubMenu:
     """Обновляем информацию о подменю."""
 
-    submenu: Optional[models.SubMenu] = await crud.get_submenu_by_id(
-        db=db, menu_id=menu_id, submenu_id=submenu_id
-    )
-
     updated_submenu: models.SubMenu = await crud.update_submenu_by_id(
-        db=db, submenu=submenu, **update_data.model_dump()
+        db=db, menu_id=menu_id, submenu_id=submenu_id, **update_data.model_dump()
     )
 
     return updated_submenu
@@ -87,12 +141,6 @@ async def delete_submenu(
 ) -> Dict[str, Union[bool, str]]:
     """Удалаяем подменю."""
 
-    submenu: Optional[models.SubMenu] = await crud.get_submenu_by_id(
-        db=db, menu_id=menu_id, submenu_id=submenu_id
-    )
-
-    await crud.delete_submenu_by_id(
-        db=db, submenu=submenu, menu_id=menu_id, submenu_id=submenu_id
-    )
+    await crud.delete_submenu_by_id(db=db, menu_id=menu_id, submenu_id=submenu_id)
 
     return {"status": True, "message": "The submenu has been deleted"}
@@ -1,14 +1,18 @@
-from typing import AsyncGenerator
+import asyncio
+from typing import Any, AsyncGenerator, Callable, Iterator
 
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
+from src import cache
 from src.configs import (DB_HOST_TEST, DB_NAME, DB_PORT, POSTGRES_PASSWORD,
                          POSTGRES_USER)
-from src.database import Base, get_db
+from src.database import (Base, get_primary_read_session_factory,
+                          get_session_factory)
 from src.main import app
+from src.service import routers as service_routers
 
 DATABASE_URL_TEST = (
     f'postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@'
@@ -22,15 +26,18 @@ async_session_maker = sessionmaker(
     class_=AsyncSession,
     expire_on_commit=False,
 )
+async_session_maker_readonly = sessionmaker(
+    async_engine_test.execution_options(postgresql_readonly=True),
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 Base.bind = async_engine_test
 
 
-async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_maker() as session:
-        yield session
-
-
-app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides.update({
+    get_session_factory: lambda: async_session_maker,
+    get_primary_read_session_factory: lambda: async_session_maker_readonly,
+})
 
 
 @pytest.fixture(scope='session', autouse=True)
@@ -42,12 +49,73 @@ async def prepare_database():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+async def clear_cache():
+    """Очищаем кэш перед каждым тестом: фикстуры меняют БД в обход CRUD-функций."""
+
+    await cache.backend.clear()
+
+
 @pytest.fixture(scope='session', autouse=True)
 async def async_client() -> AsyncGenerator[AsyncClient, None]:
     async with AsyncClient(app=app, base_url='http://test') as ac:
         yield ac
 
 
+@pytest.fixture(scope='module')
+def catalog(request: pytest.FixtureRequest) -> Iterator[Any]:
+    """Каталог модуля тестов (tests.handlers.Catalog), удаляется после его тестов.
+
+    Каталог задаётся в модуле аргументами Catalog.create:
+        CATALOG = {'name': 'ETag', 'shape': ((2,),)}
+
+    Асинхронная фикстура с областью module из conftest в pytest-asyncio 0.23
+    привязывается к циклу событий первого модуля, поэтому каталог создаётся
+    и удаляется в своём цикле (соединения с БД не переиспользуются — NullPool).
+    """
+
+    from .handlers import Catalog, MenuHandler
+
+    loop = asyncio.new_event_loop()
+    try:
+        created: Catalog = loop.run_until_complete(Catalog.create(**request.module.CATALOG))
+        yield created
+        for menu in created.menus:
+            loop.run_until_complete(MenuHandler().delete_menu(menu.id))
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def service_token(
+    monkeypatch: pytest.MonkeyPatch,
+    async_client: AsyncClient,
+) -> Iterator[str]:
+    """Включаем служебные ручки: токен в SERVICE_TOKEN и в заголовке async_client."""
+
+    token = 'service-token-for-tests'
+    monkeypatch.setattr(service_routers, 'SERVICE_TOKEN', token)
+    async_client.headers['Authorization'] = f'Bearer {token}'
+    yield token
+    del async_client.headers['Authorization']
+
+
+@pytest.fixture
+def query_budget() -> Callable[..., Any]:
+    """Бюджет SQL-запросов для запросов через async_client (tests.handlers.QueryBudget).
+
+    Пример:
+        with query_budget(queries=1, rows=10):
+            await async_client.get('/api/v1/menus')
+    """
+
+    from .handlers import QueryBudget
+
+    return lambda queries, rows=None, label='': QueryBudget(
+        async_engine_test, queries, rows, label
+    )
+
+
 @pytest.fixture(scope='session')
 def menu_data():
     return {
@@ -1,6 +1,8 @@
+from typing import Any, List, Optional, Sequence
 from uuid import UUID, uuid4
 
-from sqlalchemy import delete
+from sqlalchemy import delete, event, update
+from sqlalchemy.ext.asyncio import AsyncEngine
 from src import models
 
 from .conftest import async_session_maker
@@ -65,6 +67,12 @@ class SubMenuHandler:
                 description=description
             )
             session.add(submenu)
+            # Счётчики меню меняем так же, как это делают ручки API.
+            await session.execute(
+                update(models.Menu)
+                .where(models.Menu.id == menu_id)
+                .values(submenus_count=models.Menu.submenus_count + 1)
+            )
             await session.commit()
             return submenu
 
@@ -76,7 +84,217 @@ class SubMenuHandler:
         """
 
         async with async_session_maker() as session:
+            deleted = await session.execute(
+                delete(models.SubMenu)
+                .where(models.SubMenu.id == submenu_id)
+                .returning(models.SubMenu.menu_id, models.SubMenu.dishes_count)
+            )
+            for menu_id, dishes_count in deleted.all():
+                await session.execute(
+                    update(models.Menu)
+                    .where(models.Menu.id == menu_id)
+                    .values(
+                        submenus_count=models.Menu.submenus_count - 1,
+                        dishes_count=models.Menu.dishes_count - dishes_count,
+                    )
+                )
+            await session.commit()
+
+
+class DishHandler:
+    """Класс для выполнения операций, связанных с блюдами."""
+
+    async def create_dish(self, submenu_id: UUID, title: str, description: str, price: float):
+        """Создаём новое блюдо.
+
+        Args:
+            - submenu_id (UUID): ID подменю.
+            - title (str): Заголовок блюда.
+            - description (str): Описание блюда.
+            - price (float): Цена блюда.
+
+        Returns:
+            - models.Dish: Объект созданного блюда.
+        """
+
+        async with async_session_maker() as session:
+            dish = models.Dish(
+                id=uuid4(),
+                submenu_id=submenu_id,
+                title=title,
+                description=description,
+                price=price
+            )
+            session.add(dish)
+            # Счётчики подменю и меню меняем так же, как это делают ручки API.
+            menu_id = (await session.execute(
+                update(models.SubMenu)
+                .where(models.SubMenu.id == submenu_id)
+                .values(dishes_count=models.SubMenu.dishes_count + 1)
+                .returning(models.SubMenu.menu_id)
+            )).scalar_one()
             await session.execute(
-                delete(models.SubMenu).where(models.SubMenu.id == submenu_id)
+                update(models.Menu)
+                .where(models.Menu.id == menu_id)
+                .values(dishes_count=models.Menu.dishes_count + 1)
             )
             await session.commit()
+            return dish
+
+
+class Catalog:
+    """Меню, подменю и блюда тестового каталога в порядке создания."""
+
+    def __init__(self) -> None:
+        self.menus: List[models.Menu] = []
+        self.submenus: List[models.SubMenu] = []
+        self.dishes: List[models.Dish] = []
+
+    @property
+    def menu(self) -> models.Menu:
+        """Первое меню."""
+
+        return self.menus[0]
+
+    @property
+    def submenu(self) -> models.SubMenu:
+        """Первое подменю."""
+
+        return self.submenus[0]
+
+    @classmethod
+    async def create(
+        cls,
+        name: str,
+        shape: Sequence[Sequence[int]] = ((1,),),
+        description: str = '',
+        prices: Sequence[float] = (),
+    ) -> 'Catalog':
+        """Создаём каталог: по меню на каждый элемент shape.
+
+        Args:
+            - name (str): Часть названий: «Меню для {name} 0», «Подменю для {name} 0-0»,
+              «Блюдо для {name} 0-0-0».
+            - shape (Sequence[Sequence[int]]): Количество блюд в каждом подменю каждого
+              меню: ((2, 0), ()) — два подменю в первом меню (с двумя блюдами и пустое)
+              и второе меню без подменю.
+            - description (str): Описание меню, подменю и блюд.
+            - prices (Sequence[float]): Цены блюд подменю по порядку, без них — номер блюда.
+
+        Returns:
+            - Catalog: Созданные объекты.
+        """
+
+        catalog = cls()
+        for m, dishes_counts in enumerate(shape):
+            menu = await MenuHandler().create_menu(f'Меню для {name} {m}', description)
+            catalog.menus.append(menu)
+            for s, dishes_count in enumerate(dishes_counts):
+                submenu = await SubMenuHandler().create_submenu(
+                    menu.id, f'Подменю для {name} {m}-{s}', description
+                )
+                catalog.submenus.append(submenu)
+                for d in range(dishes_count):
+                    catalog.dishes.append(await DishHandler().create_dish(
+                        submenu.id, f'Блюдо для {name} {m}-{s}-{d}', description,
+                        prices[d] if prices else d,
+                    ))
+        return catalog
+
+
+class QueryCounter:
+    """Контекстный менеджер для подсчёта SQL-запросов и строк, полученных из БД.
+
+    Пример:
+        with QueryCounter(async_engine_test) as counter:
+            await async_client.get('/api/v1/menus')
+        assert counter.count == 1
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.statements: List[str] = []
+        self.parameters: List[Any] = []
+        self.statement_rows: List[int] = []
+        self.rows: int = 0
+
+    @property
+    def count(self) -> int:
+        """Количество выполненных SQL-запросов."""
+
+        return len(self.statements)
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+        self.statement_rows.append(max(cursor.rowcount, 0))
+        self.rows += self.statement_rows[-1]
+
+    def __enter__(self) -> 'QueryCounter':
+        event.listen(
+            self.engine.sync_engine, 'after_cursor_execute', self._after_cursor_execute
+        )
+        return self
+
+    def __exit__(self, *args) -> None:
+        event.remove(
+            self.engine.sync_engine, 'after_cursor_execute', self._after_cursor_execute
+        )
+
+
+class QueryBudget(QueryCounter):
+    """Контекстный менеджер, который проверяет бюджет SQL-запросов и строк.
+
+    При превышении бюджета тест падает с перечнем всех запросов и их строк.
+
+    Пример:
+        with QueryBudget(async_engine_test, queries=1, rows=10, label='GET /api/v1/menus'):
+            await async_client.get('/api/v1/menus')
+    """
+
+    # Длина запроса в отчёте о превышении бюджета.
+    STATEMENT_LENGTH = 160
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        queries: int,
+        rows: Optional[int] = None,
+        label: str = '',
+    ):
+        super().__init__(engine)
+        self.max_queries = queries
+        self.max_rows = rows
+        self.label = label
+
+    def __exit__(self, exc_type, *args) -> None:
+        super().__exit__(exc_type, *args)
+        if exc_type is None:
+            self.check()
+
+    def report(self) -> str:
+        """Бюджет, фактические значения и перечень запросов."""
+
+        lines = [
+            f'Бюджет запросов превышен{f" ({self.label})" if self.label else ""}:',
+            f'  запросов: {self.count} (бюджет {self.max_queries})',
+        ]
+        if self.max_rows is not None:
+            lines.append(f'  строк:    {self.rows} (бюджет {self.max_rows})')
+        for number, (statement, rows) in enumerate(
+            zip(self.statements, self.statement_rows), start=1
+        ):
+            statement = ' '.join(statement.split())
+            if len(statement) > self.STATEMENT_LENGTH:
+                statement = statement[:self.STATEMENT_LENGTH] + '...'
+            lines.append(f'  {number:>3}. [{rows} строк] {statement}')
+        return '\n'.join(lines)
+
+    def check(self) -> None:
+        """Проверяем, что запросов и строк не больше бюджета."""
+
+        over_rows = self.max_rows is not None and self.rows > self.max_rows
+        if self.count > self.max_queries or over_rows:
+            raise AssertionError(self.report())
@@ -0,0 +1,161 @@
+"""Тест массового создания подменю и блюд."""
+
+from typing import Any, Dict, List
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.exc import IntegrityError
+from src import bulk, models
+
+from .conftest import async_engine_test
+from .handlers import Catalog, QueryCounter
+
+MISSING_ID = '497f6eca-6276-4993-bfeb-53cbbbba6f08'
+
+
+CATALOG = {'name': 'массового создания', 'shape': ((0,), ())}
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_bulk_dishes(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Блюда создаются частями многострочного INSERT, счётчики меняются один раз."""
+
+    # Вставляем по 2 строки, чтобы запрос состоял из нескольких INSERT.
+    monkeypatch.setattr(bulk, 'BULK_INSERT_CHUNK_SIZE', 2)
+    menu: models.Menu = catalog.menus[0]
+    submenu: models.SubMenu = catalog.submenu
+    url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+    dishes = [
+        {'title': f'Блюдо для массового создания {i}', 'description': '', 'price': i}
+        for i in range(5)
+    ]
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.post(f'{url}/bulk', json=dishes)
+    assert response.status_code == 201
+    # Три INSERT и один UPDATE счётчиков подменю и меню.
+    assert counter.count == 3 + 1
+
+    result: Dict = response.json()
+    assert result['conflicts'] == []
+    assert [dish['title'] for dish in result['created']] == [dish['title'] for dish in dishes]
+    assert result['created'][3]['price'] == '3.0'
+    assert sorted(result['created'], key=lambda dish: dish['id']) == (
+        await async_client.get(url)
+    ).json()
+
+    # Повторы с уже созданными блюдами и внутри запроса не прерывают создание.
+    response = await async_client.post(f'{url}/bulk', json=[
+        dishes[0],
+        {'title': 'Новое блюдо для массового создания', 'description': '', 'price': 1},
+        {'title': 'Новое блюдо для массового создания', 'description': '', 'price': 2},
+    ])
+    assert response.status_code == 201
+    result = response.json()
+    assert [dish['price'] for dish in result['created']] == ['1.0']
+    detail = 'Такое блюдо уже зарегестрировано.'
+    assert result['conflicts'] == [
+        {'index': 0, 'title': dishes[0]['title'], 'detail': detail},
+        {'index': 2, 'title': 'Новое блюдо для массового создания', 'detail': detail},
+    ]
+
+    submenu_info: Dict = (
+        await async_client.get(f'/api/v1/menus/{menu.id}/submenus/{submenu.id}')
+    ).json()
+    menu_info: Dict = (await async_client.get(f'/api/v1/menus/{menu.id}')).json()
+    assert submenu_info['dishes_count'] == menu_info['dishes_count'] == 6
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_bulk_submenus(async_client: AsyncClient, catalog: Catalog):
+    """Подменю создаются одним INSERT, конфликты возвращаются по каждому подменю."""
+
+    menu: models.Menu = catalog.menus[1]
+    url = f'/api/v1/menus/{menu.id}/submenus'
+    submenus = [
+        {'title': catalog.submenu.title, 'description': ''},
+        {'title': 'Новое подменю для массового создания 1', 'description': ''},
+        {'title': 'Новое подменю для массового создания 2', 'description': ''},
+    ]
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.post(f'{url}/bulk', json=submenus)
+    assert response.status_code == 201
+    assert counter.count == 2
+
+    result: Dict = response.json()
+    assert [submenu['title'] for submenu in result['created']] == [
+        submenu['title'] for submenu in submenus[1:]
+    ]
+    assert all(submenu['dishes_count'] == 0 for submenu in result['created'])
+    assert result['conflicts'] == [{
+        'index': 0,
+        'title': submenus[0]['title'],
+        'detail': 'Такое подменю уже зарегестрировано.',
+    }]
+    assert len((await async_client.get(url)).json()) == 2
+    assert (await async_client.get(f'/api/v1/menus/{menu.id}')).json()['submenus_count'] == 2
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_bulk_errors(async_client: AsyncClient, catalog: Catalog):
+    """Несуществующие и чужие родители — ошибка 404, пустой список — ошибка 422."""
+
+    menu, other_menu = catalog.menus
+    submenu: models.SubMenu = catalog.submenu
+    dishes = [{'title': 'Блюдо в чужом подменю', 'description': '', 'price': 1}]
+
+    response = await async_client.post(f'/api/v1/menus/{MISSING_ID}/submenus/bulk', json=[
+        {'title': 'Подменю несуществующего меню', 'description': ''}
+    ])
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'menu not found'}
+
+    response = await async_client.post(
+        f'/api/v1/menus/{menu.id}/submenus/{MISSING_ID}/dishes/bulk', json=dishes
+    )
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'submenu not found'}
+
+    response = await async_client.post(
+        f'/api/v1/menus/{other_menu.id}/submenus/{submenu.id}/dishes/bulk', json=dishes
+    )
+    assert response.status_code == 404
+    assert response.json() == {
+        'detail': f'Подменю с id {submenu.id} не принадлежит к меню с id {other_menu.id}.'
+    }
+    dishes_url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+    created: List[Dict] = (await async_client.get(dishes_url)).json()
+    assert all(dish['title'] != dishes[0]['title'] for dish in created)
+
+    response = await async_client.post(f'/api/v1/menus/{menu.id}/submenus/bulk', json=[])
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_bulk_dishes_foreign_key_race(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """INSERT не нашёл подменю, которое есть при проверке, — ошибка 409 без изменений."""
+
+    async def foreign_key_violation(*args: Any) -> None:
+        raise IntegrityError('INSERT INTO dish', None, Exception('foreign key'))
+
+    monkeypatch.setattr(bulk, 'insert_ignoring_conflicts', foreign_key_violation)
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenu
+    url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}'
+    before: Dict = (await async_client.get(url)).json()
+
+    response = await async_client.post(f'{url}/dishes/bulk', json=[
+        {'title': 'Блюдо в появившемся подменю', 'description': '', 'price': 1}
+    ])
+    assert response.status_code == 409
+    assert response.json() == {'detail': 'Блюда не созданы, повторите запрос.'}
+    assert (await async_client.get(url)).json() == before
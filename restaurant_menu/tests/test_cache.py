@@ -0,0 +1,181 @@
+"""Тест кэша GET-ручек и его сброса при изменении данных."""
+
+import asyncio
+from typing import Dict, List
+
+import pytest
+from fakeredis import aioredis
+from httpx import AsyncClient
+from src import cache, schemas
+
+from .conftest import async_engine_test
+from .handlers import QueryCounter
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_lru_cache_eviction():
+    """LRU-кэш вытесняет давно не использованные записи."""
+
+    lru = cache.LRUCache(maxsize=2, ttl=60)
+    await lru.set('a', b'1')
+    await lru.set('b', b'2')
+    await lru.get('a')
+    await lru.set('c', b'3')
+
+    assert await lru.get('a') == b'1'
+    assert await lru.get('b') is None
+    assert await lru.get('c') == b'3'
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_lru_cache_ttl():
+    """Записи LRU-кэша истекают по времени жизни."""
+
+    lru = cache.LRUCache(maxsize=10, ttl=0.01)
+    await lru.set('a', b'1')
+    await asyncio.sleep(0.02)
+
+    assert await lru.get('a') is None
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_redis_cache():
+    """Redis-бэкенд: запись, чтение и удаление по ключу и по префиксу."""
+
+    redis_cache = cache.RedisCache(aioredis.FakeRedis(), ttl=60)
+    await redis_cache.set('menu:1', b'menu')
+    await redis_cache.set('menu:1:submenus', b'submenus')
+    await redis_cache.set('menu:2', b'other menu')
+
+    assert await redis_cache.get('menu:1') == b'menu'
+
+    await redis_cache.delete_prefix('menu:1')
+    assert await redis_cache.get('menu:1') is None
+    assert await redis_cache.get('menu:1:submenus') is None
+    assert await redis_cache.get('menu:2') == b'other menu'
+
+    await redis_cache.delete('menu:2')
+    assert await redis_cache.get('menu:2') is None
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_cache_generation():
+    """Запись с поколением до сброса не попадает в кэш (память и Redis)."""
+
+    for backend in (cache.LRUCache(maxsize=10, ttl=60),
+                    cache.RedisCache(aioredis.FakeRedis(), ttl=60)):
+        generation: int = await backend.generation()
+        await backend.set('menus', b'old', generation=generation)
+        assert await backend.get('menus') == b'old'
+
+        await backend.delete('menus')
+        await backend.set('menus', b'stale', generation=generation)
+        assert await backend.get('menus') is None
+
+        await backend.clear()
+        generation = await backend.generation()
+        await backend.set('menus', b'new', generation=generation)
+        assert await backend.get('menus') == b'new'
+
+        await backend.delete_prefix('menu:1')
+        await backend.set('tree', b'stale', expire=False, generation=generation)
+        assert await backend.get('tree') is None
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_snapshot_ttl():
+    """Снимки (expire=False) истекают через CACHE_SNAPSHOT_TTL."""
+
+    lru = cache.LRUCache(maxsize=10, ttl=60, snapshot_ttl=0.01)
+    await lru.set('tree', b'snapshot', expire=False)
+    await asyncio.sleep(0.02)
+    assert await lru.get('tree') is None
+
+    redis = aioredis.FakeRedis()
+    await cache.RedisCache(redis, ttl=60, snapshot_ttl=3600).set('tree', b'1', expire=False)
+    assert 0 < await redis.ttl('restaurant_menu:tree') <= 3600
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_cached_response_invalidated_during_load(monkeypatch: pytest.MonkeyPatch):
+    """Сброс между чтением из БД и записью в кэш: старый ответ не кэшируется."""
+
+    monkeypatch.setattr(cache, 'backend', cache.LRUCache(maxsize=10, ttl=60))
+
+    async def load_and_invalidate() -> List:
+        # Запись другого запроса фиксируется и сбрасывает кэш во время чтения.
+        await cache.backend.delete(cache.tree_key())
+        return []
+
+    response = await cache.cached_response(
+        cache.tree_key(), load_and_invalidate, List[schemas.MenuTreePyd], expire=False
+    )
+    assert response.body == b'[]'
+    assert await cache.backend.get(cache.tree_key()) is None
+
+    async def load() -> List:
+        return []
+
+    await cache.cached_response(cache.tree_key(), load, List[schemas.MenuTreePyd])
+    assert await cache.backend.get(cache.tree_key()) == b'[]'
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_cached_get_skips_database(async_client: AsyncClient):
+    """Повторный GET отдаётся из кэша, без запросов в БД."""
+
+    await cache.backend.clear()
+    await async_client.get('/api/v1/menus')
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get('/api/v1/menus')
+    assert response.status_code == 200
+    assert response.json() == []
+    assert counter.count == 0
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_cache_invalidation(async_client: AsyncClient):
+    """Создание, обновление и удаление сбрасывают закэшированные ответы и счётчики."""
+
+    response = await async_client.post('/api/v1/menus', json={
+        'title': 'Меню для теста кэша', 'description': 'Описание'
+    })
+    menu: Dict = response.json()
+    menu_url = f'/api/v1/menus/{menu["id"]}'
+    assert (await async_client.get('/api/v1/menus')).json() == [menu]
+    assert (await async_client.get(menu_url)).json()['submenus_count'] == 0
+
+    response = await async_client.post(f'{menu_url}/submenus', json={
+        'title': 'Подменю для теста кэша', 'description': 'Описание'
+    })
+    submenu_url = f'{menu_url}/submenus/{response.json()["id"]}'
+    assert (await async_client.get(f'{submenu_url}/dishes')).json() == []
+    assert (await async_client.get(menu_url)).json()['submenus_count'] == 1
+    assert (await async_client.get('/api/v1/menus')).json()[0]['submenus_count'] == 1
+
+    response = await async_client.post(f'{submenu_url}/dishes', json={
+        'title': 'Блюдо для теста кэша', 'description': 'Описание', 'price': 10
+    })
+    dish_url = f'{submenu_url}/dishes/{response.json()["id"]}'
+    assert len((await async_client.get(f'{submenu_url}/dishes')).json()) == 1
+    assert (await async_client.get(submenu_url)).json()['dishes_count'] == 1
+    assert (await async_client.get(f'{menu_url}/submenus')).json()[0]['dishes_count'] == 1
+    assert (await async_client.get(menu_url)).json()['dishes_count'] == 1
+
+    await async_client.patch(dish_url, json={'title': 'Новое блюдо для теста кэша'})
+    assert (await async_client.get(dish_url)).json()['title'] == 'Новое блюдо для теста кэша'
+    assert (await async_client.get(f'{submenu_url}/dishes')).json()[0]['price'] == '10.0'
+
+    await async_client.delete(dish_url)
+    assert (await async_client.get(dish_url)).status_code == 404
+    assert (await async_client.get(menu_url)).json()['dishes_count'] == 0
+
+    await async_client.delete(submenu_url)
+    assert (await async_client.get(submenu_url)).status_code == 404
+    assert (await async_client.get(f'{menu_url}/submenus')).json() == []
+    assert (await async_client.get(menu_url)).json()['submenus_count'] == 0
+
+    await async_client.delete(menu_url)
+    assert (await async_client.get(menu_url)).status_code == 404
+    assert (await async_client.get('/api/v1/menus')).json() == []
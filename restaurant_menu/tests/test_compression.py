@@ -0,0 +1,214 @@
+"""Тест сжатия ответов и сжатых копий ответов в кэше."""
+
+import asyncio
+import json
+import zlib
+from typing import Any, Dict, List
+
+import pytest
+import zstandard
+from httpx import AsyncClient
+from src import cache, compression, models, streaming
+from src.main import app
+
+from .handlers import Catalog
+
+# Список блюд длиннее порога сжатия.
+CATALOG = {
+    'name': 'сжатия',
+    'shape': ((30,),),
+    'description': 'Длинное описание блюда для сжатия',
+}
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_choose_encoding(monkeypatch: pytest.MonkeyPatch):
+    """Кодировка выбирается по Accept-Encoding в порядке предпочтения сервера."""
+
+    monkeypatch.setattr(compression, 'ENCODINGS', ['zstd', 'gzip'])
+
+    assert compression.choose_encoding('gzip, deflate') == 'gzip'
+    assert compression.choose_encoding('gzip, zstd') == 'zstd'
+    assert compression.choose_encoding('zstd;q=0, gzip;q=0.5') == 'gzip'
+    assert compression.choose_encoding('*') == 'zstd'
+    assert compression.choose_encoding('identity') is None
+    assert compression.choose_encoding('') is None
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_cached_response_compressed_once(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Сжатая копия ответа кэшируется: повторные запросы не сжимают ответ заново."""
+
+    calls: List[str] = []
+    compress = compression.compress
+
+    def counting_compress(body: bytes, encoding: str) -> bytes:
+        calls.append(encoding)
+        return compress(body, encoding)
+
+    monkeypatch.setattr(compression, 'compress', counting_compress)
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenu
+    url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+
+    plain = await async_client.get(url, headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in plain.headers
+    assert len(plain.content) >= compression.COMPRESSION_MIN_SIZE
+
+    for _ in range(3):
+        response = await async_client.get(url, headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['content-encoding'] == 'gzip'
+        assert response.headers['vary'] == 'Accept-Encoding'
+        assert response.num_bytes_downloaded < len(plain.content)
+        assert response.content == plain.content
+
+    assert calls == ['gzip']
+    key = cache.variant_key(cache.dishes_key(menu.id, submenu.id), 'gzip')
+    assert await cache.backend.get(key) is not None
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_small_response_not_compressed(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Ответы короче порога отдаются без сжатия."""
+
+    menu: models.Menu = catalog.menu
+
+    response = await async_client.get(
+        f'/api/v1/menus/{menu.id}', headers={'Accept-Encoding': 'gzip'}
+    )
+    assert response.status_code == 200
+    assert 'content-encoding' not in response.headers
+    assert response.json()['title'] == catalog.menu.title
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_middleware_compresses_pages_and_streams(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Страницы (без кэша) и потоковые ответы сжимает middleware."""
+
+    monkeypatch.setattr(streaming, 'STREAM_CHUNK_SIZE', 7)
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenu
+    url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+    dishes: List[Dict] = (
+        await async_client.get(url, headers={'Accept-Encoding': 'identity'})
+    ).json()
+
+    page = await async_client.get(
+        url, params={'limit': 30}, headers={'Accept-Encoding': 'gzip'}
+    )
+    assert page.headers['content-encoding'] == 'gzip'
+    assert int(page.headers['content-length']) == page.num_bytes_downloaded
+    assert page.json() == dishes
+
+    stream = await async_client.get(
+        url, headers={'Accept': streaming.NDJSON_MEDIA_TYPE, 'Accept-Encoding': 'gzip'}
+    )
+    assert stream.headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in stream.headers
+    assert [json.loads(line) for line in stream.text.splitlines()] == dishes
+
+
+async def stream_chunks(url: str, encoding: str) -> List[bytes]:
+    """Части тела потокового ответа приложения (ASGI, без буферизации клиента)."""
+
+    chunks: List[bytes] = []
+    requested = asyncio.Event()
+
+    async def receive() -> Dict:
+        if requested.is_set():
+            # Клиент не отключается: ждём, пока приложение не отменит ожидание.
+            await asyncio.Event().wait()
+        requested.set()
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: Dict) -> None:
+        if message['type'] == 'http.response.start':
+            headers = dict(message['headers'])
+            assert message['status'] == 200
+            assert headers[b'content-encoding'] == encoding.encode()
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await app({
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'server': ('test', 80), 'client': None,
+        'path': url, 'raw_path': url.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [
+            (b'host', b'test'),
+            (b'accept', streaming.NDJSON_MEDIA_TYPE.encode()),
+            (b'accept-encoding', encoding.encode()),
+        ],
+    }, receive, send)
+    return chunks
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_stream_compressed_by_each_encoding(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Каждая часть потокового ответа распаковывается сразу, в каждой кодировке."""
+
+    monkeypatch.setattr(streaming, 'STREAM_CHUNK_SIZE', 7)
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenu
+    url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+    dishes: List[Dict] = (
+        await async_client.get(url, headers={'Accept-Encoding': 'identity'})
+    ).json()
+    decompressobjs = {
+        'gzip': lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+        'zstd': lambda: zstandard.ZstdDecompressor().decompressobj(),
+    }
+
+    for encoding in compression.SUPPORTED_ENCODINGS:
+        monkeypatch.setattr(compression, 'ENCODINGS', [encoding])
+        chunks: List[bytes] = await stream_chunks(url, encoding)
+        assert len(chunks) > 1
+
+        decompressobj: Any = decompressobjs[encoding]()
+        lines: List[Dict] = []
+        for chunk in chunks:
+            text: str = decompressobj.decompress(chunk).decode()
+            # Часть сброшена целиком: строки не обрываются на границе частей.
+            assert not text or text.endswith('\n')
+            lines.extend(json.loads(line) for line in text.splitlines())
+        assert lines == dishes
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_compressed_cache_invalidated(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Изменение блюда сбрасывает и сжатую копию списка блюд."""
+
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenu
+    url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+
+    dishes: List[Dict] = (
+        await async_client.get(url, headers={'Accept-Encoding': 'gzip'})
+    ).json()
+    response = await async_client.patch(
+        f'{url}/{dishes[0]["id"]}',
+        json={'title': 'Изменённое блюдо', 'description': '', 'price': 1},
+    )
+    assert response.status_code == 200
+
+    response = await async_client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'Изменённое блюдо' in [dish['title'] for dish in response.json()]
@@ -0,0 +1,75 @@
+"""Стресс-тест счётчиков блюд и подменю при параллельных запросах."""
+
+import asyncio
+from typing import List
+
+import pytest
+from httpx import AsyncClient, Response
+from sqlalchemy import func, select
+from src import models
+
+from .conftest import async_session_maker
+from .handlers import MenuHandler, SubMenuHandler
+
+# Количество одновременно выполняемых запросов (не больше max_connections в PostgreSQL).
+CONCURRENCY = 50
+
+
+async def gather_limited(*coroutines) -> List[Response]:
+    """Выполняем корутины параллельно, не больше CONCURRENCY одновременно."""
+
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run(coroutine) for coroutine in coroutines))
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_parallel_dishes_counters(async_client: AsyncClient):
+    """Сотни параллельных созданий и удалений блюд не теряют изменения счётчиков."""
+
+    menu: models.Menu = await MenuHandler().create_menu(
+        'Меню для стресс-теста', 'Описание меню для стресс-теста'
+    )
+    submenus: List[models.SubMenu] = [
+        await SubMenuHandler().create_submenu(menu.id, f'Подменю для стресс-теста {i}', '')
+        for i in range(2)
+    ]
+    urls = [f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes' for submenu in submenus]
+
+    def create(i: int):
+        return async_client.post(urls[i % 2], json={
+            'title': f'Блюдо для стресс-теста {i}', 'description': '', 'price': 1
+        })
+
+    created = await gather_limited(*(create(i) for i in range(200)))
+    assert all(response.status_code == 201 for response in created)
+
+    # Удаляем половину созданных блюд одновременно с созданием новых.
+    deleted = await gather_limited(
+        *(async_client.delete(f'{urls[i % 2]}/{created[i].json()["id"]}') for i in range(100)),
+        *(create(i) for i in range(200, 300)),
+    )
+    assert all(response.status_code in (200, 201) for response in deleted)
+
+    async with async_session_maker() as session:
+        for submenu in submenus:
+            dishes_count = await session.scalar(
+                select(func.count(models.Dish.id)).where(models.Dish.submenu_id == submenu.id)
+            )
+            stored = await session.get(models.SubMenu, submenu.id)
+            assert dishes_count == stored.dishes_count == 100
+
+        stored_menu = await session.get(models.Menu, menu.id)
+        assert stored_menu.dishes_count == 200
+
+    response = await async_client.delete(f'/api/v1/menus/{menu.id}/submenus/{submenus[0].id}')
+    assert response.status_code == 200
+    response = await async_client.get(f'/api/v1/menus/{menu.id}')
+    assert response.json()['submenus_count'] == 1
+    assert response.json()['dishes_count'] == 100
+
+    await MenuHandler().delete_menu(menu.id)
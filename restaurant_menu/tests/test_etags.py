@@ -0,0 +1,169 @@
+"""Тест ETag и условных GET-запросов (If-None-Match, ответ 304)."""
+
+from typing import Dict, List
+
+import pytest
+from httpx import AsyncClient
+from src import cache, compression, etags
+
+from .conftest import async_engine_test
+from .handlers import Catalog, MenuHandler, QueryCounter
+
+CATALOG = {'name': 'ETag', 'shape': ((2,),)}
+
+
+def etag_urls(catalog: Catalog) -> List[str]:
+    """Все GET-ручки с ETag."""
+
+    menu_url = f'/api/v1/menus/{catalog.menu.id}'
+    submenu_url = f'{menu_url}/submenus/{catalog.submenu.id}'
+    return [
+        '/api/v1/menus',
+        menu_url,
+        f'{menu_url}/submenus',
+        submenu_url,
+        f'{submenu_url}/dishes',
+        f'{submenu_url}/dishes/{catalog.dishes[0].id}',
+        '/api/v1/tree',
+        f'{menu_url}/tree',
+    ]
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_etag_matches():
+    """If-None-Match: список ETag, слабые ETag и «*»."""
+
+    assert etags.matches('"a", "b"', '"b"')
+    assert etags.matches('W/"b"', '"b"')
+    assert etags.matches('*', '"b"')
+    assert not etags.matches('"a"', '"b"')
+    assert not etags.matches(None, '"b"')
+    # ETag сжатого ответа: совпадает с ETag данных, в ответ 304 — ETag из запроса.
+    assert etags.coded_etag('"b"', 'gzip') == '"b-gzip"'
+    assert etags.matching_etag('"a", W/"b-gzip"', '"b"') == '"b-gzip"'
+    assert etags.matching_etag('"a-zstd"', '"b"') is None
+    assert etags.matching_etag('*', '"b"') == '"b"'
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_etag_per_encoding(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """У сжатого и несжатого ответа разные ETag, 304 отдаётся по любому из них."""
+
+    monkeypatch.setattr(compression, 'COMPRESSION_MIN_SIZE', 0)
+    for url in ('/api/v1/tree', f'/api/v1/menus/{catalog.menu.id}'):
+        for encoding in ('gzip', 'identity'):
+            await cache.backend.clear()
+            for _ in range(2):  # из БД и из кэша
+                response = await async_client.get(url, headers={'Accept-Encoding': encoding})
+                assert response.status_code == 200
+                etag: str = response.headers['etag']
+                assert etag.endswith('-gzip"') == (encoding == 'gzip')
+                assert response.headers.get('content-encoding') == (
+                    'gzip' if encoding == 'gzip' else None
+                )
+
+                response = await async_client.get(
+                    url, headers={'Accept-Encoding': encoding, 'If-None-Match': etag}
+                )
+                assert response.status_code == 304
+                assert response.headers['etag'] == etag
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_not_modified_from_cache(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Ответ с ETag из кэша: 304 без запросов в БД."""
+
+    for url in etag_urls(catalog):
+        response = await async_client.get(url)
+        assert response.status_code == 200
+        etag: str = response.headers['etag']
+
+        with QueryCounter(async_engine_test) as counter:
+            response = await async_client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['etag'] == etag
+        assert response.content == b''
+        assert counter.count == 0
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_not_modified_from_database(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Без кэша ETag считается одним агрегатным запросом и совпадает с ETag ответа."""
+
+    for url in etag_urls(catalog):
+        etag: str = (await async_client.get(url)).headers['etag']
+        await cache.backend.clear()
+
+        with QueryCounter(async_engine_test) as counter:
+            response = await async_client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304, url
+        assert counter.count == 1
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_etag_changes_on_write(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Изменение, создание и удаление блюда меняют ETag всех ответов, где оно есть."""
+
+    urls: List[str] = etag_urls(catalog)
+    menu_url, submenu_url, dishes_url, dish_url = urls[1], urls[3], urls[4], urls[5]
+
+    async def get_etags() -> Dict[str, str]:
+        await cache.backend.clear()
+        return {
+            url: (await async_client.get(url)).headers.get('etag') for url in urls
+        }
+
+    before: Dict[str, str] = await get_etags()
+    response = await async_client.patch(
+        dish_url, json={'title': 'Изменённое блюдо для ETag', 'description': '', 'price': 5}
+    )
+    assert response.status_code == 200
+    after_update: Dict[str, str] = await get_etags()
+    changed = {url for url in urls if before[url] != after_update[url]}
+    assert changed == {dishes_url, dish_url, '/api/v1/tree', f'{menu_url}/tree'}
+
+    response = await async_client.get(
+        dishes_url, headers={'If-None-Match': before[dishes_url]}
+    )
+    assert response.status_code == 200
+
+    # Удаление и создание блюда: количество блюд то же, ETag всё равно меняется.
+    assert (await async_client.delete(dish_url)).status_code == 200
+    response = await async_client.post(
+        dishes_url, json={'title': 'Новое блюдо для ETag', 'description': '', 'price': 1}
+    )
+    assert response.status_code == 201
+    after_replace: Dict[str, str] = await get_etags()
+    changed = {url for url in urls if after_update[url] != after_replace[url]}
+    assert changed == set(urls)
+    assert after_replace[dish_url] is None
+    assert (await async_client.get(submenu_url)).json()['dishes_count'] == 2
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_missing_object_not_modified(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Для удалённого объекта If-None-Match: * не даёт 304, ответ — 404."""
+
+    urls: List[str] = etag_urls(catalog)
+    await MenuHandler().delete_menu(catalog.menu.id)
+
+    # Список блюд несуществующего подменю — пустой список, а не 404.
+    for url in (urls[1], urls[2], urls[3], urls[5], urls[7]):
+        response = await async_client.get(url, headers={'If-None-Match': '*'})
+        assert response.status_code == 404, url
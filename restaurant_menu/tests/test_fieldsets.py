@@ -0,0 +1,163 @@
+"""Тест выборочных полей ответа (параметр «fields»)."""
+
+import json
+from typing import Dict, List
+
+import pytest
+from httpx import AsyncClient
+from src import cache, schemas, streaming
+
+from .conftest import async_engine_test
+from .handlers import Catalog, QueryCounter
+
+CATALOG = {
+    'name': 'полей', 'shape': ((3,),), 'description': 'Длинное описание',
+    'prices': (0.5, 1.5, 2.5),
+}
+
+
+def dishes_url(catalog: Catalog) -> str:
+    """Адрес списка блюд."""
+
+    return f'/api/v1/menus/{catalog.menu.id}/submenus/{catalog.submenu.id}/dishes'
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_fields_narrow_payload_and_columns(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Ответ содержит только запрошенные поля, а SELECT — только их колонки."""
+
+    url: str = dishes_url(catalog)
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get(url, params={'fields': 'price,title'})
+    assert response.status_code == 200
+    dishes: List[Dict] = response.json()
+    assert [list(dish) for dish in dishes] == [['title', 'price']] * 3
+    assert sorted(dish['price'] for dish in dishes) == ['0.5', '1.5', '2.5']
+    assert counter.count == 1
+    assert 'description' not in counter.statements[0]
+
+    dish: Dict = (await async_client.get(
+        f'{url}/{(await async_client.get(url)).json()[0]["id"]}', params={'fields': 'id'}
+    )).json()
+    assert list(dish) == ['id']
+
+    menu_id = catalog.menu.id
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get(
+            f'/api/v1/menus/{menu_id}', params={'fields': 'title'}
+        )
+    assert response.json() == {'title': catalog.menu.title}
+    assert 'count' not in counter.statements[0]
+
+    response = await async_client.get(
+        f'/api/v1/menus/{menu_id}/submenus', params={'fields': 'dishes_count'}
+    )
+    assert response.json() == [{'dishes_count': 3}]
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_unknown_field(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Неизвестное поле или пустой список полей — ошибка 422."""
+
+    url: str = dishes_url(catalog)
+
+    response = await async_client.get(url, params={'fields': 'title,secret'})
+    assert response.status_code == 422
+    assert 'secret' in response.json()['detail']
+
+    response = await async_client.get(url, params={'fields': ','})
+    assert response.status_code == 422
+
+    response = await async_client.get('/api/v1/tree', params={'fields': 'dishes'})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_fields_pages_streams_and_modes(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Страницы и потоки учитывают поля, JSON одинаков в обоих режимах сериализации."""
+
+    url: str = dishes_url(catalog)
+    params = {'fields': 'title,price'}
+    dishes: List[Dict] = (await async_client.get(url, params=params)).json()
+
+    page = await async_client.get(url, params={**params, 'limit': 2})
+    assert page.json() == dishes[:2]
+
+    stream = await async_client.get(
+        url, params=params, headers={'Accept': streaming.NDJSON_MEDIA_TYPE}
+    )
+    assert [json.loads(line) for line in stream.text.splitlines()] == dishes
+
+    contents: Dict[bool, bytes] = {}
+    for fast in (False, True):
+        monkeypatch.setattr(schemas, 'FAST_SERIALIZATION', fast)
+        contents[fast] = (await async_client.get(url, params=params)).content
+    assert contents[True] == contents[False]
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_fields_tree_without_submenus(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Дерево без «submenus» выбирается одним запросом к меню."""
+
+    menu_id = catalog.menu.id
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get(
+            f'/api/v1/menus/{menu_id}/tree', params={'fields': 'id,title'}
+        )
+    assert response.json() == {'id': str(menu_id), 'title': catalog.menu.title}
+    assert counter.count == 1
+
+    tree: Dict = (await async_client.get(
+        f'/api/v1/menus/{menu_id}/tree', params={'fields': 'title,submenus'}
+    )).json()
+    assert list(tree) == ['title', 'submenus']
+    assert len(tree['submenus'][0]['dishes']) == 3
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_fields_not_cached_with_etag(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Ответ с полями не кэшируется, но отдаёт свой ETag и ответ 304."""
+
+    url: str = dishes_url(catalog)
+    await cache.backend.clear()
+
+    full = await async_client.get(url)
+    await cache.backend.clear()
+    response = await async_client.get(url, params={'fields': 'title'})
+    assert await cache.backend.get(
+        cache.dishes_key(
+            catalog.menu.id, catalog.submenu.id
+        )
+    ) is None
+    etag: str = response.headers['etag']
+    assert etag != full.headers['etag']
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get(
+            url, params={'fields': 'title'}, headers={'If-None-Match': etag}
+        )
+    assert response.status_code == 304
+    assert counter.count == 1
+
+    response = await async_client.get(
+        url, params={'fields': 'price'}, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 200
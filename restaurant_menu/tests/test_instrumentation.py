@@ -0,0 +1,143 @@
+"""Тест статистики SQL-запросов: заголовок «Server-Timing» и строка в логе."""
+
+import logging
+import re
+from typing import Dict, Set
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from src import instrumentation, models, streaming
+
+from .conftest import DATABASE_URL_TEST, async_engine_test
+from .handlers import Catalog, QueryCounter
+
+SERVER_TIMING = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", app;dur=[\d.]+, total;dur=[\d.]+$'
+)
+
+
+CATALOG = {'name': 'статистики', 'shape': ((2,),)}
+
+
+@pytest.fixture
+def instrumented(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Включаем статистику SQL-запросов для тестовой БД."""
+
+    monkeypatch.setattr(instrumentation, 'SQL_INSTRUMENTATION', True)
+    instrumentation.instrument_engine(async_engine_test, request_statistics=True)
+
+
+def logged(caplog: pytest.LogCaptureFixture) -> Dict:
+    """Поля последней строки лога статистики."""
+
+    records = [
+        record for record in caplog.records if record.name == instrumentation.__name__
+    ]
+    return {name: getattr(records[-1], name) for name in (
+        'method', 'route', 'status', 'queries', 'rows', 'db_ms', 'total_ms'
+    )}
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_server_timing_and_log(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    instrumented: None,
+    caplog: pytest.LogCaptureFixture,
+):
+    """Количество запросов в заголовке и в логе совпадает с выполненными запросами."""
+
+    caplog.set_level(logging.INFO, logger=instrumentation.__name__)
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenu
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get(
+            f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+        )
+    assert response.status_code == 200
+    match = SERVER_TIMING.match(response.headers['server-timing'])
+    assert match is not None
+    assert int(match.group(1)) == counter.count > 0
+
+    record: Dict = logged(caplog)
+    assert record['method'] == 'GET'
+    assert record['route'] == '/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes'
+    assert record['status'] == 200
+    assert record['queries'] == counter.count
+    assert record['rows'] == 2
+    assert 0 < record['db_ms'] <= record['total_ms']
+
+    # Ответ из кэша — без запросов в БД.
+    response = await async_client.get(
+        f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+    )
+    assert SERVER_TIMING.match(response.headers['server-timing']).group(1) == '0'
+    assert logged(caplog)['queries'] == 0
+
+    response = await async_client.get(f'/api/v1/menus/{submenu.id}')
+    assert response.status_code == 404
+    assert logged(caplog)['status'] == 404
+    assert logged(caplog)['route'] == '/api/v1/menus/{menu_id}'
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_stream_queries_logged(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    instrumented: None,
+    caplog: pytest.LogCaptureFixture,
+):
+    """Запросы потокового ответа, выполненные после заголовков, попадают в лог."""
+
+    caplog.set_level(logging.INFO, logger=instrumentation.__name__)
+
+    response = await async_client.get(
+        '/api/v1/menus', headers={'Accept': streaming.NDJSON_MEDIA_TYPE}
+    )
+    assert response.status_code == 200
+    assert logged(caplog)['queries'] >= 1
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_instrumentation_off(async_client: AsyncClient):
+    """Без SQL_INSTRUMENTATION заголовка нет."""
+
+    instrumentation.instrument_engine(async_engine_test, request_statistics=True)
+
+    response = await async_client.get('/api/v1/menus')
+    assert response.status_code == 200
+    assert 'server-timing' not in response.headers
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_only_enabled_hooks():
+    """К движку подключаются только обработчики включённых функций."""
+
+    engine = create_async_engine(DATABASE_URL_TEST)
+
+    def listeners() -> Set[str]:
+        return {
+            listener.__name__ for name in ('before_cursor_execute', 'after_cursor_execute')
+            for listener in (
+                instrumentation._before_cursor_execute,
+                instrumentation._count_request_query,
+                instrumentation._observe_query_metrics,
+                instrumentation._observe_slow_query,
+            ) if event.contains(engine.sync_engine, name, listener)
+        }
+
+    instrumentation.instrument_engine(
+        engine, request_statistics=False, query_metrics=False, slow_query_log=False
+    )
+    assert listeners() == set()
+
+    for _ in range(2):
+        instrumentation.instrument_engine(
+            engine, request_statistics=False, query_metrics=True, slow_query_log=False
+        )
+    assert listeners() == {'_before_cursor_execute', '_observe_query_metrics'}
+    assert len(engine.sync_engine.dispatch.after_cursor_execute) == 1
+    await engine.dispose()
@@ -0,0 +1,96 @@
+"""Тест источников количества подменю и блюд в меню (MENU_COUNTS_STRATEGY)."""
+
+from typing import Dict
+
+import pytest
+from httpx import AsyncClient
+from src.menus import crud, queries
+
+from .conftest import async_engine_test
+from .handlers import QueryCounter
+
+
+def use_strategy(monkeypatch: pytest.MonkeyPatch, strategy: str) -> None:
+    """Выбираем источник количества для чтения и для обновления при записи."""
+
+    monkeypatch.setattr(queries, 'MENU_COUNTS_STRATEGY', strategy)
+    monkeypatch.setattr(crud, 'MENU_COUNTS_STRATEGY', strategy)
+
+
+async def fill_menu(async_client: AsyncClient, title: str) -> Dict:
+    """Создаём через API меню с двумя подменю и тремя блюдами в первом подменю."""
+
+    menu: Dict = (await async_client.post('/api/v1/menus', json={
+        'title': title, 'description': ''
+    })).json()
+    submenus = [
+        (await async_client.post(f'/api/v1/menus/{menu["id"]}/submenus', json={
+            'title': f'{title}: подменю {i}', 'description': ''
+        })).json()
+        for i in range(2)
+    ]
+    for i in range(3):
+        await async_client.post(
+            f'/api/v1/menus/{menu["id"]}/submenus/{submenus[0]["id"]}/dishes',
+            json={'title': f'{title}: блюдо {i}', 'description': '', 'price': 1},
+        )
+    return {'menu': menu, 'submenus': submenus}
+
+
+async def get_counts(async_client: AsyncClient, menu_id: str) -> Dict:
+    """Количество подменю и блюд из меню по «id», списка меню и дерева меню."""
+
+    detail: Dict = (await async_client.get(f'/api/v1/menus/{menu_id}')).json()
+    listed: Dict = next(
+        menu for menu in (await async_client.get('/api/v1/menus')).json()
+        if menu['id'] == menu_id
+    )
+    tree: Dict = (await async_client.get(f'/api/v1/menus/{menu_id}/tree')).json()
+    counts = {
+        (menu['submenus_count'], menu['dishes_count']) for menu in (detail, listed, tree)
+    }
+    assert len(counts) == 1
+    return dict(zip(('submenus_count', 'dishes_count'), counts.pop()))
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_menu_counts_strategies(
+    async_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Каждый источник даёт одинаковые числа в меню по «id», списке и дереве меню."""
+
+    for strategy in ('stored', 'subquery', 'view'):
+        use_strategy(monkeypatch, strategy)
+        catalog = await fill_menu(async_client, f'Меню для подсчёта ({strategy})')
+        menu_url = f'/api/v1/menus/{catalog["menu"]["id"]}'
+
+        counts = await get_counts(async_client, catalog['menu']['id'])
+        assert counts == {'submenus_count': 2, 'dishes_count': 3}
+
+        await async_client.delete(f'{menu_url}/submenus/{catalog["submenus"][0]["id"]}')
+        counts = await get_counts(async_client, catalog['menu']['id'])
+        assert counts == {'submenus_count': 1, 'dishes_count': 0}
+
+        await async_client.delete(menu_url)
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_menu_counts_single_query(
+    async_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Меню по «id» читается одним запросом без COUNT(DISTINCT) по соединению таблиц."""
+
+    for strategy in ('stored', 'subquery', 'view'):
+        use_strategy(monkeypatch, strategy)
+        catalog = await fill_menu(async_client, f'Меню для одного запроса ({strategy})')
+        menu_url = f'/api/v1/menus/{catalog["menu"]["id"]}'
+
+        with QueryCounter(async_engine_test) as counter:
+            response = await async_client.get(menu_url)
+        assert response.status_code == 200
+        assert counter.count == 1
+        assert 'DISTINCT' not in counter.statements[0]
+
+        await async_client.delete(menu_url)
@@ -0,0 +1,95 @@
+"""Тест метрик Prometheus (ручка «/metrics»)."""
+
+import re
+from typing import Dict
+
+import pytest
+from httpx import AsyncClient
+from src import instrumentation, metrics, models
+
+from .conftest import async_engine_test
+from .handlers import Catalog
+
+DISHES_ROUTE = '/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes'
+UUID = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
+
+CATALOG = {'name': 'метрик'}
+
+
+async def scrape(async_client: AsyncClient) -> Dict[str, float]:
+    """Получаем метрики: значения по имени ряда с метками."""
+
+    response = await async_client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+
+    samples: Dict[str, float] = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value.replace('+Inf', 'inf'))
+    return samples
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_histogram_render():
+    """Гистограмма выводит накопительные корзины, сумму и количество."""
+
+    histogram = metrics.Histogram('test_seconds', 'Тест.', ('route',), (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, '/a')
+
+    assert histogram.render().splitlines() == [
+        '# HELP test_seconds Тест.',
+        '# TYPE test_seconds histogram',
+        'test_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_seconds_bucket{route="/a",le="1.0"} 3',
+        'test_seconds_bucket{route="/a",le="+Inf"} 4',
+        'test_seconds_sum{route="/a"} 3.65',
+        'test_seconds_count{route="/a"} 4',
+    ]
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_request_metrics(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    service_token: str,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Запросы учитываются по шаблону маршрута, вместе с кэшем и SQL-запросами."""
+
+    monkeypatch.setattr(metrics, 'METRICS_ENABLED', True)
+    instrumentation.instrument_engine(async_engine_test, query_metrics=True)
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenu
+    url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+    requests = f'http_requests_total{{method="GET",route="{DISHES_ROUTE}",status="200"}}'
+    duration = f'http_request_duration_seconds_count{{method="GET",route="{DISHES_ROUTE}"}}'
+
+    before: Dict[str, float] = await scrape(async_client)
+    for _ in range(3):
+        assert (await async_client.get(url)).status_code == 200
+    assert (await async_client.get('/api/v1/no-such-route')).status_code == 404
+    after: Dict[str, float] = await scrape(async_client)
+
+    assert after[requests] - before.get(requests, 0) == 3
+    assert after[duration] - before.get(duration, 0) == 3
+    assert after[
+        'http_requests_in_flight{method="GET",route="/metrics"}'
+    ] == 1
+    assert after[f'http_requests_in_flight{{method="GET",route="{DISHES_ROUTE}"}}'] == 0
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"}' in after
+    assert not any(UUID.search(name) for name in after)
+
+    # Первый запрос — промах кэша, остальные — попадания.
+    hits = 'cache_requests_total{result="hit"}'
+    misses = 'cache_requests_total{result="miss"}'
+    assert after[hits] - before.get(hits, 0) == 2
+    assert after[misses] - before.get(misses, 0) == 1
+
+    selects = 'db_query_duration_seconds_count{operation="SELECT"}'
+    assert after[selects] > before.get(selects, 0)
+    assert after['db_pool_size{engine="primary"}'] >= 1
+    assert 0 <= after['db_pool_utilization{engine="primary"}'] <= 1
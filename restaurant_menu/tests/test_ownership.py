@@ -0,0 +1,187 @@
+"""Тест ошибок 404 вложенных ручек: несуществующие и чужие меню, подменю и блюда."""
+
+from typing import Any, Dict
+
+import pytest
+from httpx import AsyncClient
+from src import models
+from src.dishes import crud as dish_crud
+from src.submenus import crud as submenu_crud
+
+from .handlers import Catalog
+
+MISSING_ID = '497f6eca-6276-4993-bfeb-53cbbbba6f08'
+
+
+CATALOG = {'name': 'проверки владельца', 'shape': ((1,), (0,))}
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_submenu_ownership(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Подменю чужого меню и несуществующее подменю не изменяются и не удаляются."""
+
+    menu, other_menu = catalog.menus
+    submenu: models.SubMenu = catalog.submenus[0]
+    foreign = f'Подменю с id {submenu.id} не принадлежит к меню с id {other_menu.id}.'
+
+    response = await async_client.get(f'/api/v1/menus/{MISSING_ID}/submenus')
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'menu not found'}
+
+    requests = (('PATCH', {'title': 'Чужое подменю'}), ('PATCH', {}), ('DELETE', None))
+    for method, json in requests:
+        response = await async_client.request(
+            method, f'/api/v1/menus/{other_menu.id}/submenus/{submenu.id}', json=json
+        )
+        assert response.status_code == 404
+        assert response.json() == {'detail': foreign}
+
+        response = await async_client.request(
+            method, f'/api/v1/menus/{menu.id}/submenus/{MISSING_ID}', json=json
+        )
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'submenu not found'}
+
+    response = await async_client.patch(
+        f'/api/v1/menus/{menu.id}/submenus/{submenu.id}', json={}
+    )
+    assert response.status_code == 400
+
+    menu_info: Dict = (await async_client.get(f'/api/v1/menus/{menu.id}')).json()
+    assert menu_info['submenus_count'] == 1
+    assert menu_info['dishes_count'] == 1
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_dish_ownership(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Блюдо в чужом подменю или меню не создаётся, не изменяется и не удаляется."""
+
+    menu, other_menu = catalog.menus
+    submenu, other_submenu = catalog.submenus
+    dish: models.Dish = catalog.dishes[0]
+    new_dish = {'title': 'Блюдо в чужом подменю', 'description': '', 'price': 1}
+
+    response = await async_client.post(
+        f'/api/v1/menus/{MISSING_ID}/submenus/{submenu.id}/dishes', json=new_dish
+    )
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'menu not found'}
+
+    response = await async_client.post(
+        f'/api/v1/menus/{other_menu.id}/submenus/{submenu.id}/dishes', json=new_dish
+    )
+    assert response.status_code == 404
+    assert response.json() == {
+        'detail': f'Подменю с id {submenu.id} не принадлежит к меню с id {other_menu.id}.'
+    }
+
+    for method, json in (('GET', None), ('PATCH', {'price': 2}), ('PATCH', {})):
+        response = await async_client.request(
+            method,
+            f'/api/v1/menus/{other_menu.id}/submenus/{other_submenu.id}/dishes/{dish.id}',
+            json=json,
+        )
+        assert response.status_code == 404
+        assert response.json() == {
+            'detail': f'Блюдо с id {dish.id} не принадлежит к подменю с id {other_submenu.id}.'
+        }
+
+        response = await async_client.request(
+            method, f'/api/v1/menus/{menu.id}/submenus/{MISSING_ID}/dishes/{dish.id}',
+            json=json,
+        )
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'submenu not found'}
+
+        response = await async_client.request(
+            method, f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes/{MISSING_ID}',
+            json=json,
+        )
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'dish not found'}
+
+    # Удаление блюда чужого подменю ничего не удаляет, как и удаление несуществующего.
+    response = await async_client.delete(
+        f'/api/v1/menus/{other_menu.id}/submenus/{other_submenu.id}/dishes/{dish.id}'
+    )
+    assert response.status_code == 200
+    response = await async_client.delete(
+        f'/api/v1/menus/{MISSING_ID}/submenus/{submenu.id}/dishes/{dish.id}'
+    )
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'menu not found'}
+
+    dish_url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes/{dish.id}'
+    assert (await async_client.get(dish_url)).status_code == 200
+    for menu_id in (menu.id, other_menu.id):
+        menu_info: Dict = (await async_client.get(f'/api/v1/menus/{menu_id}')).json()
+        assert menu_info['submenus_count'] == 1
+        assert menu_info['dishes_count'] == (1 if menu_id == menu.id else 0)
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_not_found_after_lookup(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Необновлённые и неудалённые объекты — ошибка 404, даже если проверка их нашла."""
+
+    async def found(**kwargs: Any) -> None:
+        """Объект появился между изменением и проверкой."""
+
+    monkeypatch.setattr(submenu_crud, 'get_submenu', found)
+    monkeypatch.setattr(dish_crud, 'get_dish', found)
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenu
+    submenu_url = f'/api/v1/menus/{menu.id}/submenus/{MISSING_ID}'
+
+    response = await async_client.patch(submenu_url, json={'title': 'Новое подменю'})
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'submenu not found'}
+
+    response = await async_client.delete(submenu_url)
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'submenu not found'}
+
+    response = await async_client.patch(
+        f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes/{MISSING_ID}',
+        json={'title': 'Новое блюдо'},
+    )
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'dish not found'}
+
+    menu_info: Dict = (await async_client.get(f'/api/v1/menus/{menu.id}')).json()
+    assert menu_info['submenus_count'] == 1
+    assert menu_info['dishes_count'] == 1
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_dishes_of_foreign_submenu(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Список блюд подменю чужого меню пуст и не устаревает после создания блюда."""
+
+    menu, other_menu = catalog.menus
+    submenu: models.SubMenu = catalog.submenu
+    url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+    foreign_url = f'/api/v1/menus/{other_menu.id}/submenus/{submenu.id}/dishes'
+
+    for params in ({}, {'limit': 10}, {'stream': 'json'}):
+        response = await async_client.get(foreign_url, params=params)
+        assert response.status_code == 200
+        assert response.json() == []
+
+    response = await async_client.post(url, json={
+        'title': 'Блюдо подменю проверки владельца', 'description': '', 'price': 1
+    })
+    assert response.status_code == 201
+    assert len((await async_client.get(url)).json()) == 2
+    assert (await async_client.get(foreign_url)).json() == []
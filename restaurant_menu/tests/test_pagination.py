@@ -0,0 +1,88 @@
+"""Тест постраничного вывода списков меню, подменю и блюд."""
+
+from typing import Dict, List
+
+import pytest
+from httpx import AsyncClient
+from src import models
+from src.pagination import NEXT_CURSOR_HEADER
+
+from .conftest import async_engine_test
+from .handlers import Catalog, QueryCounter
+
+# 5 меню, 5 подменю в первом меню и 5 блюд в первом подменю.
+CATALOG = {
+    'name': 'пагинации', 'shape': ((5, 0, 0, 0, 0), (), (), (), ()), 'description': 'Описание',
+}
+
+
+async def walk_pages(async_client: AsyncClient, url: str, limit: int) -> List[List[Dict]]:
+    """Проходим все страницы списка и возвращаем их."""
+
+    pages: List[List[Dict]] = []
+    params: Dict = {'limit': limit}
+    while True:
+        response = await async_client.get(url, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return pages
+        params['cursor'] = response.headers[NEXT_CURSOR_HEADER]
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_pages_cover_full_list(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Страницы меню, подменю и блюд вместе совпадают с полным списком."""
+
+    menu: models.Menu = catalog.menus[0]
+    submenu: models.SubMenu = catalog.submenus[0]
+
+    for url in (
+        '/api/v1/menus',
+        f'/api/v1/menus/{menu.id}/submenus',
+        f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes',
+    ):
+        full_list = (await async_client.get(url)).json()
+        pages = await walk_pages(async_client, url, limit=2)
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert [item for page in pages for item in page] == full_list
+        assert full_list == sorted(full_list, key=lambda item: item['id'])
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_deep_page_is_single_query(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Страница выбирается одним запросом по ключу, без OFFSET."""
+
+    response = await async_client.get('/api/v1/menus', params={'limit': 3})
+    cursor: str = response.headers[NEXT_CURSOR_HEADER]
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get(
+            '/api/v1/menus', params={'limit': 3, 'cursor': cursor}
+        )
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert counter.count == 1
+    assert 'OFFSET' not in counter.statements[0]
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_pagination_errors(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Некорректные limit и cursor возвращают ошибку 422."""
+
+    response = await async_client.get('/api/v1/menus', params={'cursor': 'не курсор'})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'invalid cursor'}
+
+    response = await async_client.get('/api/v1/menus', params={'limit': 0})
+    assert response.status_code == 422
@@ -0,0 +1,64 @@
+"""Тест пула соединений: прогрев и состояние пула."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from src.database import create_engine, get_engine, warm_up_pool
+from src.main import app
+from src.service import routers as service_routers
+
+from .conftest import DATABASE_URL_TEST
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_pool_status(async_client: AsyncClient, service_token: str):
+    """Прогретый пул отдаёт свободные соединения, выдачи и ожидание считаются."""
+
+    engine = create_engine(DATABASE_URL_TEST, pool_size=3, max_overflow=1, pool_timeout=0.1)
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        await warm_up_pool(engine, 5)
+        status = (await async_client.get('/api/v1/pool')).json()
+        assert status['pool_size'] == 3
+        assert status['max_overflow'] == 1
+        assert status['idle'] == 3
+        assert status['checked_out'] == status['overflow'] == 0
+        assert status['checkouts'] == 3
+
+        connections = [await engine.connect() for _ in range(4)]
+        status = (await async_client.get('/api/v1/pool')).json()
+        assert status['checked_out'] == 4
+        assert status['idle'] == 0
+        assert status['overflow'] == 1
+
+        # Пул и лимит сверх него исчерпаны: соединение не выдаётся дольше pool_timeout.
+        with pytest.raises(PoolTimeoutError):
+            await engine.connect()
+        for connection in connections:
+            await connection.close()
+
+        status = (await async_client.get('/api/v1/pool')).json()
+        assert status['checked_out'] == 0
+        assert status['checkouts'] == 3 + 4
+        assert status['checkout_timeouts'] == 1
+        assert 0 <= status['checkout_wait_avg_ms'] <= status['checkout_wait_max_ms']
+    finally:
+        del app.dependency_overrides[get_engine]
+        await engine.dispose()
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_service_routes_auth(async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    """Служебные ручки без SERVICE_TOKEN выключены, с ним — только по токену."""
+
+    for url in ('/api/v1/pool', '/api/v1/slow-queries', '/metrics'):
+        assert (await async_client.get(url)).status_code == 404
+
+    monkeypatch.setattr(service_routers, 'SERVICE_TOKEN', 'token')
+    for url in ('/api/v1/pool', '/api/v1/slow-queries', '/metrics'):
+        for headers in ({}, {'Authorization': 'Bearer wrong'}, {'Authorization': 'token'}):
+            response = await async_client.get(url, headers=headers)
+            assert response.status_code == 401
+            assert response.headers['www-authenticate'] == 'Bearer'
+        response = await async_client.get(url, headers={'Authorization': 'Bearer token'})
+        assert response.status_code == 200
@@ -0,0 +1,120 @@
+"""Тест профилирования отдельных запросов (заголовок «X-Profile»)."""
+
+import os
+import pstats
+import re
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from src import models, profiling
+from src.main import app
+
+from .handlers import Catalog
+
+SECRET = 'секрет для тестов'
+
+
+CATALOG = {'name': 'профилирования'}
+
+
+def profiling_client(directory: str = '') -> AsyncClient:
+    """Клиент приложения с подключённым ProfilingMiddleware."""
+
+    return AsyncClient(
+        app=profiling.ProfilingMiddleware(app, secret=SECRET, directory=directory),
+        base_url='http://test',
+    )
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_token():
+    """Подпись действует для своего метода и пути до истечения срока."""
+
+    token: str = profiling.sign_token('GET', '/api/v1/menus', secret=SECRET)
+    assert profiling.verify_token(token, 'GET', '/api/v1/menus', SECRET)
+    assert not profiling.verify_token(token, 'POST', '/api/v1/menus', SECRET)
+    assert not profiling.verify_token(token, 'GET', '/api/v1/tree', SECRET)
+    assert not profiling.verify_token(token, 'GET', '/api/v1/menus', 'другой ключ')
+    assert not profiling.verify_token(token, 'GET', '/api/v1/menus', '')
+    expired: str = profiling.sign_token('GET', '/api/v1/menus', ttl=-1, secret=SECRET)
+    assert not profiling.verify_token(expired, 'GET', '/api/v1/menus', SECRET)
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_profile_in_response(
+    catalog: Catalog,
+    tmp_path: Path,
+):
+    """Профиль pstats вместо ответа: обработчик, схемы и запросы SQLAlchemy."""
+
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenu
+    url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+
+    async with profiling_client() as client:
+        response = await client.get(url, headers={
+            'X-Profile': profiling.sign_token('GET', url, secret=SECRET),
+            'X-Profile-Format': 'pstats',
+        })
+    assert response.status_code == 200
+    assert response.headers['x-profile-status'] == '200'
+    assert response.headers['content-type'] == 'application/octet-stream'
+
+    path = tmp_path / 'dishes.prof'
+    path.write_bytes(response.content)
+    functions = {
+        (os.path.basename(filename), name)
+        for filename, _, name in pstats.Stats(str(path)).stats
+    }
+    assert ('routers.py', 'all_dishes') in functions
+    assert ('schemas.py', 'dump_json') in functions
+    assert ('session.py', 'execute') in functions
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_profile_to_directory(
+    catalog: Catalog,
+    tmp_path: Path,
+):
+    """Профиль collapsed записывается в каталог, клиент получает обычный ответ."""
+
+    menu: models.Menu = catalog.menu
+    url = f'/api/v1/menus/{menu.id}'
+
+    async with profiling_client(str(tmp_path)) as client:
+        response = await client.get(url, headers={
+            'X-Profile': profiling.sign_token('GET', url, secret=SECRET),
+        })
+    assert response.status_code == 200
+    assert response.json()['id'] == str(menu.id)
+
+    path = Path(response.headers['x-profile-path'])
+    assert path.parent == tmp_path
+    assert path.name.endswith('-GET-api_v1_menus_menu_id.collapsed')
+    for line in path.read_text().splitlines():
+        assert re.fullmatch(r'[^ ]+(;[^ ]+)* \d+', line)
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_profile_rejected(
+    catalog: Catalog,
+    tmp_path: Path,
+):
+    """Без подписи или с чужой подписью запрос выполняется без профилирования."""
+
+    menu: models.Menu = catalog.menu
+    url = f'/api/v1/menus/{menu.id}'
+
+    async with profiling_client(str(tmp_path)) as client:
+        for headers in (
+            {},
+            {'X-Profile': '1.signature'},
+            {'X-Profile': profiling.sign_token('GET', '/api/v1/menus', secret=SECRET)},
+            {'X-Profile': profiling.sign_token('GET', url, secret=SECRET),
+             'X-Profile-Format': 'html'},
+        ):
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 200
+            assert 'x-profile-path' not in response.headers
+    assert not list(tmp_path.iterdir())
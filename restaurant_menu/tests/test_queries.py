@@ -0,0 +1,187 @@
+"""Тест количества SQL-запросов и строк, которые выполняют ручки."""
+
+import pytest
+from httpx import AsyncClient
+from src import models
+
+from .conftest import async_engine_test
+from .handlers import Catalog, QueryCounter
+
+CATALOG = {
+    'name': 'подсчёта запросов', 'shape': ((3, 0),), 'description': 'Описание',
+    'prices': (10.5,) * 3,
+}
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_queries_all_menus(async_client: AsyncClient, catalog: Catalog):
+    """Список меню не подгружает подменю и блюда."""
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get('/api/v1/menus')
+    assert response.status_code == 200
+    assert counter.count == 1
+    assert counter.rows == len(response.json()) == 1
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_queries_get_menu(async_client: AsyncClient, catalog: Catalog):
+    """Определённое меню выбирается одним запросом."""
+
+    menu: models.Menu = catalog.menu
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get(f'/api/v1/menus/{menu.id}')
+    assert response.status_code == 200
+    assert counter.count == 1
+    assert counter.rows == 1
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_queries_all_submenus(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Список подменю: проверка меню и выборка подменю одним запросом, без блюд."""
+
+    menu: models.Menu = catalog.menu
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get(f'/api/v1/menus/{menu.id}/submenus')
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert counter.count == 1
+    assert counter.rows == 2
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_queries_get_submenu(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Определённое подменю выбирается без связанных блюд и меню."""
+
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenus[0]
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get(f'/api/v1/menus/{menu.id}/submenus/{submenu.id}')
+    assert response.status_code == 200
+    assert counter.count == 1
+    assert counter.rows == 1
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_queries_all_dishes(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Список блюд выбирается одним запросом, без подменю."""
+
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenus[0]
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get(
+            f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+        )
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert counter.count == 1
+    assert counter.rows == 3
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_queries_get_dish(async_client: AsyncClient, catalog: Catalog):
+    """Определённое блюдо: проверка подменю и выборка блюда одним запросом."""
+
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenus[0]
+    dish: models.Dish = catalog.dishes[0]
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.get(
+            f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes/{dish.id}'
+        )
+    assert response.status_code == 200
+    assert counter.count == 1
+    assert counter.rows == 1
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_queries_nested_writes(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Изменение подменю и блюд проверяет родителей тем же запросом, что и пишет."""
+
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenus[1]
+    submenu_url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}'
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.patch(submenu_url, json={'description': 'Новое'})
+    assert response.status_code == 200
+    assert counter.count == 1
+
+    # UPDATE счётчиков подменю и меню (CTE) и INSERT блюда.
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.post(f'{submenu_url}/dishes', json={
+            'title': 'Блюдо для подсчёта запросов 3', 'description': '', 'price': 1
+        })
+    assert response.status_code == 201
+    assert counter.count == 2
+    dish_url = f'{submenu_url}/dishes/{response.json()["id"]}'
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.patch(dish_url, json={'price': 2})
+    assert response.status_code == 200
+    assert counter.count == 1
+
+    # DELETE блюда и UPDATE счётчиков подменю и меню (CTE).
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.delete(dish_url)
+    assert response.status_code == 200
+    assert counter.count == 2
+
+    # DELETE подменю и UPDATE счётчиков меню.
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.delete(submenu_url)
+    assert response.status_code == 200
+    assert counter.count == 2
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_queries_update_menu(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Обновление меню не подгружает подменю и блюда."""
+
+    menu: models.Menu = catalog.menu
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.patch(
+            f'/api/v1/menus/{menu.id}', json={'description': 'Новое описание'}
+        )
+    assert response.status_code == 200
+    # UPDATE ... RETURNING.
+    assert counter.count == 1
+    assert counter.rows == 1
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_queries_delete_menu(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Удаление меню не подгружает подменю и блюда."""
+
+    menu: models.Menu = catalog.menu
+
+    with QueryCounter(async_engine_test) as counter:
+        response = await async_client.delete(f'/api/v1/menus/{menu.id}')
+    assert response.status_code == 200
+    # DELETE ... RETURNING.
+    assert counter.count == 1
+    assert counter.rows == 1
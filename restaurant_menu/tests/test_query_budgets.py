@@ -0,0 +1,236 @@
+"""Бюджеты SQL-запросов ручек меню, подменю и блюд (защита от N+1).
+
+У каждой ручки роутеров меню, подменю и блюд есть бюджет: сколько SQL-запросов
+она выполняет и сколько строк получает из БД на каталоге из фикстуры
+(меню, два подменю, по три блюда). Ответы GET проверяются без кэша.
+
+Бюджеты записаны для MENU_COUNTS_STRATEGY=stored; при view запись, которая меняет
+количество подменю или блюд, добавляет запрос REFRESH MATERIALIZED VIEW.
+"""
+
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+from httpx import AsyncClient
+from src import cache, streaming
+from src.configs import MENU_COUNTS_STRATEGY
+from src.dishes.routers import dish_router
+from src.menus.routers import menu_router
+from src.submenus.routers import submenu_router
+
+from .handlers import Catalog
+
+MENUS = '/api/v1/menus'
+MENU = '/api/v1/menus/{menu_id}'
+SUBMENUS = '/api/v1/menus/{menu_id}/submenus'
+SUBMENU = '/api/v1/menus/{menu_id}/submenus/{submenu_id}'
+DISHES = '/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes'
+DISH = '/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}'
+
+# (метод, шаблон маршрута) -> (запросов, строк).
+BUDGETS: Dict[Tuple[str, str], Tuple[int, int]] = {
+    ('POST', MENUS): (2, 2),
+    ('GET', MENUS): (1, 2),
+    ('GET', MENU): (1, 1),
+    ('PATCH', MENU): (1, 1),
+    ('DELETE', MENU): (1, 1),
+    ('GET', '/api/v1/tree'): (3, 10),
+    ('GET', '/api/v1/menus/{menu_id}/tree'): (3, 9),
+    ('POST', SUBMENUS): (2, 2),
+    ('POST', f'{SUBMENUS}/bulk'): (2, 4),
+    ('GET', SUBMENUS): (2, 6),
+    ('GET', SUBMENU): (1, 1),
+    ('PATCH', SUBMENU): (1, 1),
+    ('DELETE', SUBMENU): (2, 2),
+    ('POST', DISHES): (2, 2),
+    ('POST', f'{DISHES}/bulk'): (2, 4),
+    ('GET', DISHES): (1, 7),
+    ('GET', DISH): (1, 1),
+    ('PATCH', DISH): (1, 1),
+    ('DELETE', DISH): (2, 2),
+}
+
+# Ручки, после которых при MENU_COUNTS_STRATEGY=view обновляется представление menu_stats.
+VIEW_REFRESHES = {
+    ('POST', SUBMENUS), ('POST', f'{SUBMENUS}/bulk'), ('DELETE', SUBMENU),
+    ('POST', DISHES), ('POST', f'{DISHES}/bulk'), ('DELETE', DISH),
+}
+
+
+CATALOG = {'name': 'бюджетов', 'shape': ((3, 3),)}
+
+
+@pytest.fixture
+def budget(query_budget: Callable[..., Any]) -> Callable[..., Any]:
+    """Бюджет запросов ручки по методу и шаблону маршрута из BUDGETS."""
+
+    def route_budget(method: str, route: str) -> Any:
+        queries, rows = BUDGETS[(method, route)]
+        if MENU_COUNTS_STRATEGY == 'view' and (method, route) in VIEW_REFRESHES:
+            queries += 1
+        return query_budget(queries, rows, f'{method} {route}')
+
+    return route_budget
+
+
+async def get(async_client: AsyncClient, url: str, **kwargs: Any) -> Any:
+    """GET-запрос без кэша ответов."""
+
+    await cache.backend.clear()
+    response = await async_client.get(url, **kwargs)
+    assert response.status_code == 200, response.text
+    return response
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_every_route_has_budget():
+    """Бюджет задан для каждой ручки роутеров меню, подменю и блюд."""
+
+    routes = {
+        (method, route.path)
+        for router in (menu_router, submenu_router, dish_router)
+        for route in router.routes
+        for method in route.methods
+    }
+    assert routes == set(BUDGETS)
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_budget_report(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    query_budget: Callable[..., Any],
+):
+    """Превышение бюджета выводит бюджет, фактические значения и все запросы."""
+
+    with pytest.raises(AssertionError) as error:
+        with query_budget(queries=0, rows=0, label='GET /api/v1/menus'):
+            await get(async_client, MENUS)
+
+    report: List[str] = str(error.value).splitlines()
+    assert report[0] == 'Бюджет запросов превышен (GET /api/v1/menus):'
+    assert report[1] == '  запросов: 1 (бюджет 0)'
+    assert report[2].startswith('  строк:    ')
+    assert report[3].startswith('    1. [')
+    assert 'SELECT' in report[3] and 'FROM menus' in report[3]
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_menu_budgets(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    budget: Callable[..., Any],
+):
+    """Ручки меню и дерева меню."""
+
+    menu_url = f'{MENUS}/{catalog.menu.id}'
+
+    with budget('POST', MENUS):
+        response = await async_client.post(MENUS, json={'title': 'Новое', 'description': ''})
+    assert response.status_code == 201
+    new_menu_url = f'{MENUS}/{response.json()["id"]}'
+
+    for params, headers in (({}, {}), ({'limit': 1}, {}),
+                            ({}, {'Accept': streaming.NDJSON_MEDIA_TYPE})):
+        with budget('GET', MENUS):
+            await get(async_client, MENUS, params=params, headers=headers)
+    with budget('GET', MENU):
+        await get(async_client, menu_url)
+    with budget('GET', '/api/v1/tree'):
+        await get(async_client, '/api/v1/tree')
+    with budget('GET', '/api/v1/menus/{menu_id}/tree'):
+        await get(async_client, f'{menu_url}/tree')
+
+    with budget('PATCH', MENU):
+        response = await async_client.patch(
+            new_menu_url, json={'title': 'Изменённое', 'description': ''}
+        )
+    assert response.status_code == 200
+    with budget('DELETE', MENU):
+        response = await async_client.delete(new_menu_url)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_submenu_budgets(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    budget: Callable[..., Any],
+):
+    """Ручки подменю."""
+
+    submenus_url = f'{MENUS}/{catalog.menu.id}/submenus'
+    submenu_url = f'{submenus_url}/{catalog.submenus[0].id}'
+
+    with budget('POST', SUBMENUS):
+        response = await async_client.post(
+            submenus_url, json={'title': 'Новое подменю', 'description': ''}
+        )
+    assert response.status_code == 201
+    new_submenu_url = f'{submenus_url}/{response.json()["id"]}'
+
+    with budget('POST', f'{SUBMENUS}/bulk'):
+        response = await async_client.post(f'{submenus_url}/bulk', json=[
+            {'title': f'Пакетное подменю {i}', 'description': ''} for i in range(3)
+        ])
+    assert response.status_code == 201
+
+    for params, headers in (({}, {}), ({'limit': 1}, {}),
+                            ({}, {'Accept': streaming.NDJSON_MEDIA_TYPE})):
+        with budget('GET', SUBMENUS):
+            await get(async_client, submenus_url, params=params, headers=headers)
+    with budget('GET', SUBMENU):
+        await get(async_client, submenu_url)
+
+    with budget('PATCH', SUBMENU):
+        response = await async_client.patch(
+            new_submenu_url, json={'title': 'Изменённое подменю', 'description': ''}
+        )
+    assert response.status_code == 200
+    with budget('DELETE', SUBMENU):
+        response = await async_client.delete(new_submenu_url)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_dish_budgets(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    budget: Callable[..., Any],
+):
+    """Ручки блюд."""
+
+    dishes_url = (
+        f'{MENUS}/{catalog.menu.id}'
+        f'/submenus/{catalog.submenus[0].id}/dishes'
+    )
+    dish_url = f'{dishes_url}/{catalog.dishes[0].id}'
+
+    with budget('POST', DISHES):
+        response = await async_client.post(
+            dishes_url, json={'title': 'Новое блюдо', 'description': '', 'price': 1}
+        )
+    assert response.status_code == 201
+    new_dish_url = f'{dishes_url}/{response.json()["id"]}'
+
+    with budget('POST', f'{DISHES}/bulk'):
+        response = await async_client.post(f'{dishes_url}/bulk', json=[
+            {'title': f'Пакетное блюдо {i}', 'description': '', 'price': i} for i in range(3)
+        ])
+    assert response.status_code == 201
+
+    for params, headers in (({}, {}), ({'limit': 1}, {}),
+                            ({}, {'Accept': streaming.NDJSON_MEDIA_TYPE})):
+        with budget('GET', DISHES):
+            await get(async_client, dishes_url, params=params, headers=headers)
+    with budget('GET', DISH):
+        await get(async_client, dish_url)
+
+    with budget('PATCH', DISH):
+        response = await async_client.patch(
+            new_dish_url, json={'title': 'Изменённое блюдо', 'description': '', 'price': 2}
+        )
+    assert response.status_code == 200
+    with budget('DELETE', DISH):
+        response = await async_client.delete(new_dish_url)
+    assert response.status_code == 200
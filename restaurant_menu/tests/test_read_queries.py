@@ -0,0 +1,43 @@
+"""Тест запросов чтения (queries.py): строки колонок ответа без ORM объектов."""
+
+import pytest
+from sqlalchemy import Row
+from src import models
+from src.dishes import queries as dish_queries
+from src.menus import queries as menu_queries
+from src.submenus import queries as submenu_queries
+
+from .conftest import async_session_maker
+from .handlers import Catalog
+
+CATALOG = {'name': 'запросов чтения', 'shape': ((2,),)}
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_read_queries_skip_identity_map(catalog: Catalog):
+    """Запросы чтения возвращают строки и не наполняют identity map сессии."""
+
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenu
+    dish: models.Dish = catalog.dishes[0]
+
+    async with async_session_maker() as session:
+        rows = [
+            *await menu_queries.get_all_menus(db=session),
+            await menu_queries.get_menu(db=session, menu_id=menu.id),
+            *await submenu_queries.get_all_submenus(db=session, menu_id=menu.id),
+            await submenu_queries.get_submenu(
+                db=session, menu_id=menu.id, submenu_id=submenu.id
+            ),
+            *await dish_queries.get_all_dishes(
+                db=session, menu_id=menu.id, submenu_id=submenu.id
+            ),
+            await dish_queries.get_dish(
+                db=session, menu_id=menu.id, submenu_id=submenu.id, dish_id=dish.id
+            ),
+        ]
+        tree = await menu_queries.get_menus_tree(db=session, menu_id=menu.id)
+
+        assert all(isinstance(row, Row) for row in rows)
+        assert len(tree[0]['submenus'][0]['dishes']) == 2
+        assert len(session.identity_map) == 0
@@ -0,0 +1,66 @@
+"""Тест сверки и исправления счётчиков подменю и блюд."""
+
+from typing import Dict, List
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from src import models, reconciliation
+
+from .conftest import async_session_maker
+from .handlers import Catalog
+
+CATALOG = {'name': 'сверки', 'shape': ((2, 2),) * 3, 'prices': (1, 1)}
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_reconcile_counters(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Расхождения находятся частями по ключу, исправляются и попадают в отчёт."""
+
+    menus: List[models.Menu] = catalog.menus
+    submenus: List[models.SubMenu] = catalog.submenus
+
+    # Счётчики других тестов уже верны, поэтому повторная сверка ничего не меняет.
+    report = await reconciliation.reconcile_counters(async_session_maker, batch_size=2)
+    assert report['submenus_fixed'] == report['menus_fixed'] == 0
+    assert report['menus_checked'] >= 3
+    assert report['submenus_checked'] >= 6
+
+    # Ответ кэшируется до порчи счётчиков и должен сброситься после исправления.
+    menu_url = f'/api/v1/menus/{menus[0].id}'
+    assert (await async_client.get(menu_url)).json()['dishes_count'] == 4
+
+    async with async_session_maker() as session:
+        await session.execute(
+            update(models.SubMenu)
+            .where(models.SubMenu.id == submenus[0].id)
+            .values(dishes_count=5)
+        )
+        await session.execute(
+            update(models.Menu)
+            .where(models.Menu.id.in_([menus[0].id, menus[2].id]))
+            .values(submenus_count=0, dishes_count=10)
+        )
+        await session.commit()
+
+    report = await reconciliation.reconcile_counters(async_session_maker, batch_size=2)
+    assert report['submenus_fixed'] == 1
+    assert report['submenu_dishes_drift'] == 3
+    assert report['menus_fixed'] == 2
+    assert report['menu_submenus_drift'] == 4
+    assert report['menu_dishes_drift'] == 12
+
+    for menu in menus:
+        menu_info: Dict = (await async_client.get(f'/api/v1/menus/{menu.id}')).json()
+        assert menu_info['submenus_count'] == 2
+        assert menu_info['dishes_count'] == 4
+    submenu_info: Dict = (
+        await async_client.get(f'{menu_url}/submenus/{submenus[0].id}')
+    ).json()
+    assert submenu_info['dishes_count'] == 2
+
+    report = await reconciliation.reconcile_counters(async_session_maker)
+    assert report['submenus_fixed'] == report['menus_fixed'] == 0
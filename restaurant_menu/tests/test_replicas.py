@@ -0,0 +1,148 @@
+"""Тест чтения с реплик: распределение GET-запросов, read-your-writes, проверка реплик.
+
+Реплика — вторая БД из DB_REPLICA_HOST_TEST (например, второй контейнер PostgreSQL)
+или, если она не задана, та же тестовая БД через отдельный движок.
+"""
+
+import time
+from typing import AsyncIterator, Dict
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src import cache, database
+from src.configs import (DB_NAME, DB_REPLICA_HOST_TEST, DB_REPLICA_PORT_TEST,
+                         POSTGRES_PASSWORD, POSTGRES_USER)
+from src.database import READ_PRIMARY_COOKIE, Base, create_engine
+from src.replicas import ReplicaSet
+
+from .conftest import DATABASE_URL_TEST, async_engine_test
+from .handlers import MenuHandler, QueryCounter
+
+DATABASE_URL_REPLICA_TEST = (
+    f'postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@'
+    f'{DB_REPLICA_HOST_TEST}:{DB_REPLICA_PORT_TEST}/{DB_NAME}'
+)
+# Порт, на котором нет PostgreSQL: реплика всегда недоступна.
+DATABASE_URL_BROKEN = (
+    f'postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@'
+    f'{DB_REPLICA_HOST_TEST}:1/{DB_NAME}'
+)
+
+
+@pytest.fixture
+async def replica_engines(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[Dict]:
+    """Подключаем приложение к реплике и к недоступной реплике."""
+
+    replica: AsyncEngine = create_engine(DATABASE_URL_REPLICA_TEST)
+    broken: AsyncEngine = create_engine(DATABASE_URL_BROKEN)
+    separate = DATABASE_URL_REPLICA_TEST != DATABASE_URL_TEST
+    if separate:
+        async with replica.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    monkeypatch.setattr(database, 'replicas', ReplicaSet([replica, broken]))
+    yield {'replica': replica, 'broken': broken}
+
+    if separate:
+        async with replica.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+    await database.replicas.dispose()
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_replica_routing(async_client: AsyncClient, replica_engines: Dict):
+    """GET-запросы идут на доступную реплику, после записи — на основную БД."""
+
+    await database.replicas.check_health()
+    assert database.replicas.healthy == [replica_engines['replica']]
+
+    async_client.cookies.clear()
+    with QueryCounter(async_engine_test) as primary:
+        with QueryCounter(replica_engines['replica']) as replica:
+            assert (await async_client.get('/api/v1/menus')).status_code == 200
+    assert (primary.count, replica.count) == (0, 1)
+
+    # Запись: клиент получает cookie и следующие чтения идут на основную БД.
+    response = await async_client.post(
+        '/api/v1/menus', json={'title': 'Меню для реплики', 'description': ''}
+    )
+    assert response.status_code == 201
+    assert READ_PRIMARY_COOKIE in response.cookies
+    menu_url = f'/api/v1/menus/{response.json()["id"]}'
+
+    with QueryCounter(async_engine_test) as primary:
+        with QueryCounter(replica_engines['replica']) as replica:
+            assert (await async_client.get(menu_url)).status_code == 200
+    assert (primary.count, replica.count) == (1, 0)
+
+    # Окно read-your-writes истекло: чтение снова идёт на реплику.
+    async_client.cookies.set(READ_PRIMARY_COOKIE, '0')
+    await cache.backend.clear()
+    with QueryCounter(async_engine_test) as primary:
+        with QueryCounter(replica_engines['replica']) as replica:
+            await async_client.get(menu_url)
+    assert (primary.count, replica.count) == (0, 1)
+
+    async_client.cookies.clear()
+    await MenuHandler().delete_menu(response.json()['id'])
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_replica_health_checks(async_client: AsyncClient, replica_engines: Dict):
+    """Недоступные реплики исключаются: без реплик чтение идёт на основную БД."""
+
+    replicas: ReplicaSet = database.replicas
+    replicas.engines.remove(replica_engines['replica'])
+    await replicas.check_health()
+    assert replicas.healthy == []
+    assert replicas.session_factory() is None
+
+    async_client.cookies.clear()
+    with QueryCounter(async_engine_test) as primary:
+        assert (await async_client.get('/api/v1/menus')).status_code == 200
+    assert primary.count == 1
+
+    replicas.engines.append(replica_engines['replica'])
+    await replicas.check_health()
+    assert replicas.healthy == [replica_engines['replica']]
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_replica_reads_not_cached(async_client: AsyncClient, replica_engines: Dict):
+    """Ответы с реплики не записываются в кэш, ответы с основной БД — записываются."""
+
+    await database.replicas.check_health()
+    menu = await MenuHandler().create_menu('Меню для кэша реплики', '')
+    menu_url = f'/api/v1/menus/{menu.id}'
+
+    async_client.cookies.clear()
+    await cache.backend.clear()
+    with QueryCounter(replica_engines['replica']) as replica:
+        assert (await async_client.get(menu_url)).status_code == 200
+        assert (await async_client.get(menu_url)).status_code == 200
+    assert replica.count == 2
+    assert await cache.backend.get(cache.menu_key(menu.id)) is None
+
+    # Клиент недавно писал: чтение с основной БД заполняет кэш.
+    async_client.cookies.set(READ_PRIMARY_COOKIE, str(time.time() + 60))
+    assert (await async_client.get(menu_url)).status_code == 200
+    assert await cache.backend.get(cache.menu_key(menu.id)) is not None
+
+    # Из кэша отдаётся и чтение, которое направлено на реплику.
+    async_client.cookies.clear()
+    with QueryCounter(replica_engines['replica']) as replica:
+        assert (await async_client.get(menu_url)).status_code == 200
+    assert replica.count == 0
+
+    await MenuHandler().delete_menu(menu.id)
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_replicas_require_shared_cache(monkeypatch: pytest.MonkeyPatch):
+    """С репликами кэш в памяти процесса не создаётся."""
+
+    monkeypatch.setattr(cache, 'DB_REPLICA_URLS', [DATABASE_URL_REPLICA_TEST])
+    with pytest.raises(ValueError):
+        cache.create_cache('memory')
+    assert isinstance(cache.create_cache('none'), cache.NullCache)
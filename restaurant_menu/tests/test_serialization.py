@@ -0,0 +1,57 @@
+"""Тест быстрой сериализации ответов: JSON совпадает с JSON Pydantic до байта."""
+
+from typing import Dict, List
+
+import pytest
+from httpx import AsyncClient
+from src import cache, models, schemas
+
+from .handlers import Catalog
+
+# Блюда с разными ценами в первом подменю, второе подменю пустое.
+CATALOG = {
+    'name': 'сериализации',
+    'shape': ((5, 0),),
+    'description': 'Описание с "кавычками", \\ обратной чертой\nи переводом строки',
+    'prices': (0, 1.005, 12.5, 99.999, 123456.789),
+}
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_fast_serialization_matches_pydantic(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Списки, объекты, страницы и дерево меню одинаковы в обоих режимах."""
+
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenus[0]
+    dishes_url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+    dishes: List[Dict] = (await async_client.get(dishes_url)).json()
+    urls = (
+        '/api/v1/menus',
+        f'/api/v1/menus/{menu.id}',
+        f'/api/v1/menus/{menu.id}/submenus',
+        f'/api/v1/menus/{menu.id}/submenus/{submenu.id}',
+        dishes_url,
+        f'{dishes_url}?limit=2',
+        f'{dishes_url}/{dishes[0]["id"]}',
+        f'/api/v1/menus/{menu.id}/tree',
+        '/api/v1/tree',
+    )
+
+    contents: Dict[bool, List[bytes]] = {}
+    for fast in (False, True):
+        monkeypatch.setattr(schemas, 'FAST_SERIALIZATION', fast)
+        await cache.backend.clear()
+        contents[fast] = []
+        for url in urls:
+            response = await async_client.get(url)
+            assert response.status_code == 200
+            contents[fast].append(response.content)
+
+    assert contents[True] == contents[False]
+    assert sorted(dish['price'] for dish in dishes) == [
+        '0.0', '1.0', '100.0', '12.5', '123456.79'
+    ]
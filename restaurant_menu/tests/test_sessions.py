@@ -0,0 +1,69 @@
+"""Тест ленивых сессий: соединение берётся только при обращении к БД."""
+
+from typing import List
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database import LazySession, get_primary_read_session_factory
+from src.main import app
+
+from .conftest import async_session_maker_readonly
+from .handlers import MenuHandler
+
+
+@pytest.fixture
+def created_sessions() -> List[AsyncSession]:
+    """Подменяем фабрику сессий для чтения на фабрику, которая запоминает сессии."""
+
+    sessions: List[AsyncSession] = []
+
+    def session_factory() -> AsyncSession:
+        sessions.append(async_session_maker_readonly())
+        return sessions[-1]
+
+    overrides = app.dependency_overrides
+    default = overrides[get_primary_read_session_factory]
+    overrides[get_primary_read_session_factory] = lambda: session_factory
+    yield sessions
+    overrides[get_primary_read_session_factory] = default
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_cached_and_rejected_requests_skip_session(
+    async_client: AsyncClient,
+    created_sessions: List[AsyncSession],
+):
+    """Ответ из кэша и отклонённый запрос не создают сессию."""
+
+    menu = await MenuHandler().create_menu('Меню для ленивой сессии', '')
+
+    assert (await async_client.get(f'/api/v1/menus/{menu.id}')).status_code == 200
+    assert len(created_sessions) == 1
+
+    assert (await async_client.get(f'/api/v1/menus/{menu.id}')).status_code == 200
+    response = await async_client.get('/api/v1/menus', params={'cursor': 'не курсор'})
+    assert response.status_code == 422
+    assert len(created_sessions) == 1
+
+    await MenuHandler().delete_menu(menu.id)
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_read_only_session():
+    """Сессия для чтения создаётся при первом обращении и не пишет в БД."""
+
+    session = LazySession(async_session_maker_readonly)
+    assert not session.started
+
+    assert await session.scalar(text('SELECT 1')) == 1
+    assert session.started
+    await session.rollback()
+
+    with pytest.raises(DBAPIError, match='read-only transaction'):
+        await session.execute(
+            text("INSERT INTO menus VALUES (gen_random_uuid(), 'x', 'x', 0, 0)")
+        )
+    await session.close()
@@ -0,0 +1,124 @@
+"""Тест журнала медленных SQL-запросов и захвата планов EXPLAIN (ANALYZE)."""
+
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from src import cache, instrumentation, models, slow_queries
+
+from .conftest import async_engine_test
+from .handlers import Catalog
+
+CATALOG = {'name': 'медленных запросов', 'shape': ((),)}
+
+
+@pytest.fixture
+def all_queries_slow(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Любой запрос медленнее порога, журнал пуст."""
+
+    instrumentation.instrument_engine(async_engine_test, slow_query_log=True)
+    monkeypatch.setattr(slow_queries, 'SLOW_QUERY_THRESHOLD_MS', 1e-6)
+    slow_queries.records.clear()
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_parameter_shapes():
+    """Вместо значений параметров записываются их типы."""
+
+    parameters = (uuid4(), 'секрет', 3, Decimal('1.5'), None, datetime.now())
+    assert slow_queries.parameter_shapes(parameters) == (
+        '(UUID, str, int, Decimal, NoneType, datetime)'
+    )
+    assert slow_queries.parameter_shapes({'title': 'секрет'}) == '{title: str}'
+    assert slow_queries.parameter_shapes([('a', 1), ('b', 2)], executemany=True) == (
+        '2 x (str, int)'
+    )
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_strip_literals():
+    """Из условий плана удаляются значения, оценки и счётчики остаются."""
+
+    plan = '\n'.join((
+        'Index Scan using dishes_pkey on dishes  (cost=0.15..8.17 rows=1 width=88)',
+        "  Index Cond: (id = '3f1c…'::uuid)",
+        "  Filter: (((title)::text = 'O''Brien'::text) AND (price > 10.5) AND (id = $1))",
+        '  Rows Removed by Filter: 3',
+        'Buffers: shared hit=3',
+    ))
+    assert slow_queries.strip_literals(plan).splitlines() == [
+        'Index Scan using dishes_pkey on dishes  (cost=0.15..8.17 rows=1 width=88)',
+        "  Index Cond: (id = '?'::uuid)",
+        "  Filter: (((title)::text = '?'::text) AND (price > ?) AND (id = $1))",
+        '  Rows Removed by Filter: 3',
+        'Buffers: shared hit=3',
+    ]
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_slow_query_logged(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    all_queries_slow: None,
+    caplog: pytest.LogCaptureFixture,
+):
+    """Медленный запрос попадает в журнал с функцией CRUD-слоя, без значений параметров."""
+
+    menu: models.Menu = catalog.menu
+
+    response = await async_client.get(f'/api/v1/menus/{menu.id}')
+    assert response.status_code == 200
+
+    records: List[Dict] = list(slow_queries.records)
+    assert [record['caller'] for record in records] == ['src.menus.queries.get_menu']
+    assert records[0]['statement'].lstrip().startswith('SELECT')
+    assert 'UUID' in records[0]['parameters']
+    assert str(menu.id) not in records[0]['parameters']
+    assert records[0]['plan'] is None
+    assert any(
+        getattr(record, 'caller', None) == 'src.menus.queries.get_menu'
+        for record in caplog.records
+    )
+
+    response = await async_client.patch(
+        f'/api/v1/menus/{menu.id}', json={'title': 'Изменённое меню', 'description': ''}
+    )
+    assert response.status_code == 200
+    callers = {record['caller'] for record in slow_queries.records}
+    assert 'src.menus.crud.update_menu_by_id' in callers
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_slow_query_explain(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    all_queries_slow: None,
+    monkeypatch: pytest.MonkeyPatch,
+    service_token: str,
+):
+    """План медленного SELECT сохраняется в журнал, EXPLAIN ограничен по частоте."""
+
+    monkeypatch.setattr(slow_queries, 'SLOW_QUERY_EXPLAIN', True)
+    monkeypatch.setattr(slow_queries, 'SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 1)
+    monkeypatch.setattr(slow_queries, '_last_explain', float('-inf'))
+    menu: models.Menu = catalog.menu
+
+    for _ in range(2):
+        await cache.backend.clear()
+        assert (await async_client.get(f'/api/v1/menus/{menu.id}')).status_code == 200
+    await asyncio.gather(*slow_queries.explain_tasks)
+
+    plans = [record['plan'] for record in slow_queries.records]
+    assert len(plans) == 2
+    assert 'actual time' in plans[0] and 'Execution Time' in plans[0]
+    assert "'?'::uuid" in plans[0] and str(menu.id) not in plans[0]
+    # Второй EXPLAIN раньше SLOW_QUERY_EXPLAIN_INTERVAL не запускается.
+    assert plans[1] is None
+
+    response = await async_client.get('/api/v1/slow-queries')
+    assert response.status_code == 200
+    assert response.json()[-1]['plan'] == plans[0]
@@ -0,0 +1,72 @@
+"""Тест потокового вывода списков меню, подменю и блюд."""
+
+import json
+from typing import Dict, List
+
+import pytest
+from httpx import AsyncClient
+from src import models, streaming
+
+from .handlers import Catalog
+
+CATALOG = {'name': 'потокового вывода', 'shape': ((5,),)}
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_stream_ndjson(
+    async_client: AsyncClient,
+    catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """NDJSON по заголовку Accept: по одному объекту в строке, как в обычном списке."""
+
+    # Читаем курсор по 2 строки, чтобы ответ состоял из нескольких частей.
+    monkeypatch.setattr(streaming, 'STREAM_CHUNK_SIZE', 2)
+    menu: models.Menu = catalog.menu
+    submenu: models.SubMenu = catalog.submenu
+    url = f'/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes'
+
+    response = await async_client.get(url, headers={'Accept': streaming.NDJSON_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == streaming.NDJSON_MEDIA_TYPE
+
+    dishes: List[Dict] = [json.loads(line) for line in response.text.splitlines()]
+    assert len(dishes) == 5
+    assert dishes == (await async_client.get(url)).json()
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_stream_json(async_client: AsyncClient, catalog: Catalog):
+    """JSON-массив по параметру stream=json совпадает с обычным списком."""
+
+    menu: models.Menu = catalog.menu
+
+    for url in ('/api/v1/menus', f'/api/v1/menus/{menu.id}/submenus'):
+        response = await async_client.get(url, params={'stream': 'json'})
+        assert response.status_code == 200
+        assert response.json() == (await async_client.get(url)).json()
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_stream_empty_and_errors(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Пустой поток — пустой массив, несуществующее меню — ошибка 404."""
+
+    menu: models.Menu = catalog.menu
+    missing_id = '497f6eca-6276-4993-bfeb-53cbbbba6f08'
+
+    response = await async_client.get(
+        f'/api/v1/menus/{menu.id}/submenus/{missing_id}/dishes', params={'stream': 'json'}
+    )
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = await async_client.get(
+        f'/api/v1/menus/{missing_id}/submenus', params={'stream': 'ndjson'}
+    )
+    assert response.status_code == 404
+
+    response = await async_client.get('/api/v1/menus', params={'stream': 'xml'})
+    assert response.status_code == 422
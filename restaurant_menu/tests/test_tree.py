@@ -0,0 +1,112 @@
+"""Тест вывода дерева меню (меню → подменю → блюда)."""
+
+from typing import Any, Dict, List
+
+import pytest
+from httpx import AsyncClient
+from src import models
+from src.menus import queries
+
+from .conftest import async_engine_test, async_session_maker
+from .handlers import (Catalog, DishHandler, MenuHandler, QueryCounter,
+                       SubMenuHandler)
+
+# Меню с двумя подменю без блюд.
+CATALOG = {'name': 'дерева', 'shape': ((0, 0),), 'description': 'Описание'}
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_menu_tree(async_client: AsyncClient, catalog: Catalog):
+    """Дерево меню собирается фиксированным числом запросов и кэшируется как снимок."""
+
+    menu_url = f'/api/v1/menus/{catalog.menu.id}'
+    submenus = (await async_client.get(f'{menu_url}/submenus')).json()
+
+    for count in (1, 10):
+        for i in range(count):
+            await async_client.post(f'{menu_url}/submenus/{submenus[0]["id"]}/dishes', json={
+                'title': f'Блюдо для дерева {count}-{i}', 'description': '', 'price': 1.5
+            })
+
+        with QueryCounter(async_engine_test) as counter:
+            response = await async_client.get(f'{menu_url}/tree')
+        assert response.status_code == 200
+        assert counter.count == 3
+
+    tree: Dict = response.json()
+    assert tree['id'] == str(catalog.menu.id)
+    assert tree['submenus_count'] == 2
+    assert tree['dishes_count'] == 11
+    assert [submenu['id'] for submenu in tree['submenus']] == [
+        submenu['id'] for submenu in sorted(submenus, key=lambda submenu: submenu['id'])
+    ]
+    dishes = (await async_client.get(f'{menu_url}/submenus/{submenus[0]["id"]}/dishes')).json()
+    tree_dishes = next(
+        submenu['dishes'] for submenu in tree['submenus'] if submenu['id'] == submenus[0]['id']
+    )
+    assert tree_dishes == dishes
+
+    with QueryCounter(async_engine_test) as counter:
+        assert (await async_client.get(f'{menu_url}/tree')).json() == tree
+    assert counter.count == 0
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_tree_concurrent_insert(catalog: Catalog):
+    """Меню и подменю, созданные между запросами дерева, не ломают его сборку."""
+
+    created: List[models.Menu] = []
+
+    async with async_session_maker() as session:
+        execute = session.execute
+
+        async def execute_and_insert(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await execute(*args, **kwargs)
+            finally:
+                # После каждого запроса дерева другой клиент создаёт меню с подменю и блюдом.
+                menu = await MenuHandler().create_menu(f'Параллельное меню {len(created)}', '')
+                submenu = await SubMenuHandler().create_submenu(
+                    menu.id, f'Параллельное подменю {len(created)}', ''
+                )
+                await DishHandler().create_dish(
+                    submenu.id, f'Параллельное блюдо {len(created)}', '', 1
+                )
+                created.append(menu)
+
+        session.execute = execute_and_insert
+        assert [
+            str(menu['id']) for menu in await queries.get_menus_tree(db=session)
+        ] == [str(catalog.menu.id)]
+    assert len(created) == 3
+
+    for menu in created:
+        await MenuHandler().delete_menu(menu.id)
+
+
+@pytest.mark.asyncio(scope='function')
+async def test_tree_snapshot_invalidation(
+    async_client: AsyncClient,
+    catalog: Catalog,
+):
+    """Изменение подменю пересобирает снимки дерева меню и всех меню."""
+
+    menu_url = f'/api/v1/menus/{catalog.menu.id}'
+    assert len((await async_client.get('/api/v1/tree')).json()) == 1
+    submenu: Dict = (await async_client.get(f'{menu_url}/tree')).json()['submenus'][1]
+
+    await async_client.patch(
+        f'{menu_url}/submenus/{submenu["id"]}', json={'title': 'Новое подменю для дерева'}
+    )
+
+    tree: Dict = (await async_client.get(f'{menu_url}/tree')).json()
+    assert tree['submenus'][1]['title'] == 'Новое подменю для дерева'
+    assert (await async_client.get('/api/v1/tree')).json() == [tree]
+
+    missing_id = '497f6eca-6276-4993-bfeb-53cbbbba6f08'
+    response = await async_client.get(f'/api/v1/menus/{missing_id}/tree')
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'menu not found'}
+
+    await async_client.delete(menu_url)
+    assert (await async_client.get('/api/v1/tree')).json() == []